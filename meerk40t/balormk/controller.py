@@ -5,11 +5,14 @@ The balor controller takes low level lmc galvo commands and converts them into l
 to the hardware controller.
 """
 
+import queue
 import struct
 import threading
 import time
 from copy import copy
 
+import numpy as np
+
 from meerk40t.balormk.mock_connection import MockConnection
 from meerk40t.balormk.usb_connection import USBConnection
 
@@ -205,6 +208,9 @@ BUSY = 0x04
 READY = 0x20
 AXIS = 0x40
 
+# Number of finished list packets which may wait for the sender thread.
+LIST_QUEUE_SIZE = 8
+
 
 def _bytes_to_words(r):
     b0 = r[1] << 8 | r[0]
@@ -279,6 +285,9 @@ class GalvoController:
 
         self.mode = DRIVER_STATE_RAPID
         self._list_lock = threading.RLock()
+        self._send_lock = threading.RLock()
+        self._list_queue = queue.Queue(maxsize=LIST_QUEUE_SIZE)
+        self._list_sender_thread = None
         self._active_list = None
         self._active_index = 0
         self._list_executing = False
@@ -317,6 +326,8 @@ class GalvoController:
 
     def shutdown(self, *args, **kwargs):
         self.is_shutdown = True
+        self._list_discard()
+        self._list_flush()
 
     @property
     def connected(self):
@@ -396,17 +407,19 @@ class GalvoController:
     def send(self, data, read=True):
         if self.is_shutdown:
             return -1, -1, -1, -1
-        self.connect_if_needed()
-        try:
-            self.connection.write(self._machine_index, data)
-        except ConnectionError:
-            return -1, -1, -1, -1
-        if read:
+        with self._send_lock:
+            # List sender thread and command calls share the connection, write and read are paired.
+            self.connect_if_needed()
             try:
-                r = self.connection.read(self._machine_index)
-                return struct.unpack("<4H", r)
+                self.connection.write(self._machine_index, data)
             except ConnectionError:
                 return -1, -1, -1, -1
+            if read:
+                try:
+                    r = self.connection.read(self._machine_index)
+                    return struct.unpack("<4H", r)
+                except ConnectionError:
+                    return -1, -1, -1, -1
 
     def status(self):
         b0, b1, b2, b3 = self.get_version()
@@ -424,6 +437,7 @@ class GalvoController:
             return
         self.list_end_of_list()  # Ensure at least one list_end_of_list
         self._list_end()
+        self._list_flush()
         if not self._list_executing and self._number_of_list_packets:
             # If we never ran the list, and we sent some lists.
             self.execute_list()
@@ -446,6 +460,7 @@ class GalvoController:
         if self.mode == DRIVER_STATE_PROGRAM:
             return
         if self.mode == DRIVER_STATE_LIGHT:
+            self._list_flush()
             self.mode = DRIVER_STATE_PROGRAM
             self.light_off()
             self.port_on(bit=0)
@@ -481,6 +496,7 @@ class GalvoController:
         if self.mode == DRIVER_STATE_LIGHT:
             return
         if self.mode == DRIVER_STATE_PROGRAM:
+            self._list_flush()
             if self.source == "fiber":
                 self.set_fiber_mo(0)
             self.port_off(bit=0)
@@ -519,19 +535,102 @@ class GalvoController:
             if not self._active_list or not self._active_index:
                 # Double-gated syntax, make sure there's still that list needing ending.
                 return
-            self.wait_ready()
-            while self.paused:
-                time.sleep(0.3)
-            self.send(self._active_list, False)
-            if self.mode != DRIVER_STATE_RAW:
-                self.set_end_of_list(0)
-            self._number_of_list_packets += 1
+            packet = self._active_list
             self._active_list = None
             self._active_index = 0
-            if self._number_of_list_packets > 2 and not self._list_executing:
-                if self.mode != DRIVER_STATE_RAW:
+            if self.mode == DRIVER_STATE_RAW:
+                # Raw mode interleaves lists and commands, these are sent in order.
+                self.send(packet, False)
+                self._number_of_list_packets += 1
+                if self._number_of_list_packets > 2:
+                    self._list_executing = True
+                return
+            if (
+                self._list_sender_thread is None
+                or not self._list_sender_thread.is_alive()
+            ):
+                self._list_sender_thread = self.service.threaded(
+                    self._list_sender,
+                    thread_name=f"GalvoList({self.service.path}:{id(self):x})",
+                    daemon=True,
+                )
+                self._list_sender_thread.stop = self._list_flush
+            # Blocks while the queue is full, building never runs ahead of sending by more than the queue.
+            self._list_queue.put(packet)
+
+    def _list_sender(self):
+        """
+        Sender thread for list packets. Packets built by _list_end() are sent as soon as the controller has space for
+        another list, while the next packets are being built.
+
+        A None packet ends the thread.
+
+        @return:
+        """
+        while True:
+            packet = self._list_queue.get()
+            try:
+                if packet is None:
+                    return
+                self._list_wait_space()
+                while self.paused and not self.is_shutdown:
+                    time.sleep(0.3)
+                self.send(packet, False)
+                self.set_end_of_list(0)
+                self._number_of_list_packets += 1
+                if self._number_of_list_packets > 2 and not self._list_executing:
                     self.execute_list()
-                self._list_executing = True
+                    self._list_executing = True
+            finally:
+                self._list_queue.task_done()
+
+    def _list_wait_space(self):
+        """
+        Waits until the controller reports it is ready to accept another list packet. The first status reads follow
+        each other closely, as space usually frees quickly, then the wait between reads doubles up to 20ms so a busy
+        controller is not flooded with status requests.
+
+        @return:
+        """
+        delay = 0.0005
+        while not self.is_shutdown:
+            status = self.status()
+            if status == -1:
+                # Connection failed, sending will also fail.
+                return
+            if status & READY:
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, 0.02)
+
+    def _list_flush(self):
+        """
+        Waits for all queued list packets to be sent and ends the sender thread.
+
+        @return:
+        """
+        thread = self._list_sender_thread
+        if thread is None:
+            return
+        if thread is threading.current_thread():
+            return
+        if thread.is_alive():
+            self._list_queue.put(None)
+            thread.join()
+        self._list_sender_thread = None
+
+    def _list_discard(self):
+        """
+        Removes all list packets which have not yet been sent.
+
+        @return:
+        """
+        while True:
+            try:
+                self._list_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._list_queue.task_done()
 
     def _list_new(self):
         with self._list_lock:
@@ -550,6 +649,32 @@ class GalvoController:
             )
             self._active_index += 12
 
+    def _list_write_bulk(self, rows):
+        """
+        Writes many list commands at once. Rows are an (N, 6) array of command, v1, v2, v3, v4, v5 values. These are
+        packed as little-endian shorts in one operation and copied into the list packets, ending each packet as it
+        fills.
+
+        @param rows: (N, 6) array of list command values.
+        @return:
+        """
+        data = np.asarray(rows).astype("<u2").tobytes()
+        total = len(data)
+        position = 0
+        with self._list_lock:
+            while position < total:
+                if self._active_index >= 0xC00:
+                    self._list_end()
+                if self._active_list is None:
+                    self._list_new()
+                index = self._active_index
+                length = min(0xC00 - index, total - position)
+                self._active_list[index : index + length] = data[
+                    position : position + length
+                ]
+                self._active_index += length
+                position += length
+
     def _command(self, command, v1=0, v2=0, v3=0, v4=0, v5=0, read=True):
         cmd = struct.pack(
             "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
@@ -645,6 +770,83 @@ class GalvoController:
             self.list_mark_speed(self._mark_speed)
         self.list_mark(x, y)
 
+    def mark_bulk(self, x, y, power=None):
+        """
+        Marks to each of the points given by the x and y arrays. This writes the same list commands as calling mark()
+        for each point, and power() before each point marked, but the list commands are built as array operations and
+        packed into the list in bulk.
+
+        Points out of range or equal to the previous point are skipped. Power, if given, is the percent power for
+        each point, power commands are only written before marks where the power changes.
+
+        @param x: array of x positions
+        @param y: array of y positions
+        @param power: array of percent power values or None
+        @return:
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        valid = (x >= 0) & (x <= 0xFFFF) & (y >= 0) & (y <= 0xFFFF)
+        x = x[valid]
+        y = y[valid]
+        if power is not None:
+            power = np.broadcast_to(np.asarray(power, dtype=float), valid.shape)
+            power = power[valid]
+
+        # Skip the leading points at the last position, which may be fractional after a goto_xy().
+        same = (x == self._last_x) & (y == self._last_y)
+        start = len(x) if np.all(same) else int(np.argmin(same))
+        x = x[start:]
+        y = y[start:]
+        if power is not None:
+            power = power[start:]
+
+        # Like mark(), each point is compared with the truncated previous point, so any later repeat is integral.
+        ix = x.astype(np.int64)
+        iy = y.astype(np.int64)
+        last_x = np.append(self._last_x, ix[:-1])
+        last_y = np.append(self._last_y, iy[:-1])
+        moved = (x != last_x) | (y != last_y)
+        count = int(np.count_nonzero(moved))
+        if count == 0:
+            return
+        if power is not None:
+            power = power[moved]
+
+        distance = np.hypot(x[moved] - last_x[moved], y[moved] - last_y[moved])
+        ix = ix[moved]
+        iy = iy[moved]
+        rows = np.zeros((count, 6), dtype=np.int64)
+        rows[:, 0] = listMarkTo
+        rows[:, 1] = ix
+        rows[:, 2] = iy
+        rows[:, 4] = np.minimum(distance.astype(np.int64), 0xFFFF)
+
+        if power is not None and self.source in ("fiber", "co2"):
+            last_power = np.nan if self._power is None else self._power
+            changed = power != np.append(last_power, power[:-1])
+            if np.any(changed):
+                if self.source == "co2":
+                    command = listMarkPowerRatio
+                    values = np.round(200 * power[changed] / self._frequency)
+                else:
+                    command = listMarkCurrent
+                    values = np.round(power[changed] * 0xFFF / 100.0)
+                # Each mark shifts forward by the number of power commands at or before it.
+                positions = np.arange(count) + np.cumsum(changed)
+                merged = np.zeros((count + len(values), 6), dtype=np.int64)
+                merged[positions] = rows
+                merged[positions[changed] - 1, 0] = command
+                merged[positions[changed] - 1, 1] = values
+                rows = merged
+            self._power = float(power[-1])
+
+        if self._mark_speed is not None:
+            self.list_mark_speed(self._mark_speed)
+        self._list_write_bulk(rows)
+        self._last_x = int(ix[-1])
+        self._last_y = int(iy[-1])
+
     def goto(self, x, y, long=None, short=None, distance_limit=None):
         if x == self._last_x and y == self._last_y:
             return
@@ -713,6 +915,8 @@ class GalvoController:
     def wait_finished(self):
         if self.mode == DRIVER_STATE_RAW:
             return
+        # Queued list packets are not yet known to the controller, which may report it is ready and not busy.
+        self._list_flush()
         while not self.is_ready_and_not_busy():
             time.sleep(0.01)
             if self.is_shutdown:
@@ -747,12 +951,15 @@ class GalvoController:
             return
         self.stop_execute()
         self.paused = False
+        self._list_discard()
+        self._list_flush()
         self.set_fiber_mo(0)
         self.reset_list()
         if dummy_packet:
             self._list_new()
             self.list_end_of_list()  # Ensure packet is sent on end.
             self._list_end()
+            self._list_flush()
             if not self._list_executing:
                 self.execute_list()
         self._list_executing = False
@@ -6,6 +6,8 @@ driver.
 """
 import time
 
+import numpy as np
+
 from meerk40t.balormk.controller import GalvoController
 from meerk40t.core.cutcode.cubiccut import CubicCut
 from meerk40t.core.cutcode.dwellcut import DwellCut
@@ -175,15 +177,18 @@ class BalorDriver:
 
                 g.clear()
                 g.quad(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                # LOOP CHECKS
+                if self._aborting:
+                    con.abort()
+                    self._aborting = False
+                    return
+                while self.paused:
+                    time.sleep(0.05)
+                con.mark_bulk(points.real, points.imag)
             elif segment_type == "cubic":
                 last_x, last_y = con.get_last_xy()
                 x, y = start.real, start.imag
@@ -193,15 +198,18 @@ class BalorDriver:
 
                 g.clear()
                 g.cubic(start, c1, c2, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                # LOOP CHECKS
+                if self._aborting:
+                    con.abort()
+                    self._aborting = False
+                    return
+                while self.paused:
+                    time.sleep(0.05)
+                con.mark_bulk(points.real, points.imag)
             elif segment_type == "arc":
                 last_x, last_y = con.get_last_xy()
                 x, y = start.real, start.imag
@@ -211,15 +219,18 @@ class BalorDriver:
 
                 g.clear()
                 g.arc(start, c1, end)
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                # LOOP CHECKS
+                if self._aborting:
+                    con.abort()
+                    self._aborting = False
+                    return
+                while self.paused:
+                    time.sleep(0.05)
+                con.mark_bulk(points.real, points.imag)
             elif segment_type == "point":
                 function = sets.get("function")
                 if function == "dwell":
@@ -347,15 +358,18 @@ class BalorDriver:
 
                 g = Geomstr()
                 g.quad(complex(*q.start), complex(*q.c()), complex(*q.end))
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    # LOOP CHECKS
-                    if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
-                    while self.paused:
-                        time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                # LOOP CHECKS
+                if self._aborting:
+                    con.abort()
+                    self._aborting = False
+                    return
+                while self.paused:
+                    time.sleep(0.05)
+                con.mark_bulk(points.real, points.imag)
             elif isinstance(q, CubicCut):
                 last_x, last_y = con.get_last_xy()
                 x, y = q.start
@@ -370,7 +384,31 @@ class BalorDriver:
                     complex(*q.c2()),
                     complex(*q.end),
                 )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                # LOOP CHECKS
+                if self._aborting:
+                    con.abort()
+                    self._aborting = False
+                    return
+                while self.paused:
+                    time.sleep(0.05)
+                con.mark_bulk(points.real, points.imag)
+            elif isinstance(q, PlotCut) and not self.value_penbox:
+                last_x, last_y = con.get_last_xy()
+                x, y = q.start
+                if last_x != x or last_y != y:
+                    con.goto(x, y)
+                plot = np.array(
+                    [(x, y, on) for ox, oy, on, x, y in q.plot], dtype=float
+                ).reshape((-1, 3))
+                # Max power is the percent max power, scaled by the pixel power.
+                max_power = float(q.settings.get("power", self.service.default_power))
+                percent_power = max_power / 10.0
+                # Points are sent in chunks of one list packet.
+                for i in range(0, len(plot), 0x100):
                     # LOOP CHECKS
                     if self._aborting:
                         con.abort()
@@ -378,7 +416,12 @@ class BalorDriver:
                         return
                     while self.paused:
                         time.sleep(0.05)
-                    con.mark(p.real, p.imag)
+                    chunk = plot[i : i + 0x100]
+                    con.mark_bulk(
+                        chunk[:, 0], chunk[:, 1], percent_power * chunk[:, 2]
+                    )
+                if len(plot):
+                    last_on = plot[-1, 2]
             elif isinstance(q, PlotCut):
                 last_x, last_y = con.get_last_xy()
                 x, y = q.start
@@ -395,28 +438,18 @@ class BalorDriver:
 
                     # q.plot can have different on values, these are parsed
                     if last_on is None or on != last_on:
-                        # No power change.
                         last_on = on
-                        if self.value_penbox:
-                            # There is an active value_penbox
-                            settings = dict(q.settings)
-                            limit = len(self.value_penbox) - 1
-                            m = int(round(on * limit))
-                            try:
-                                pen = self.value_penbox[m]
-                                settings.update(pen)
-                            except IndexError:
-                                pass
-                            # Power scaling is exclusive to this penbox. on is used as a lookup and does not scale power.
-                            con.set_settings(settings)
-                        else:
-                            # We are using traditional power-scaling
-                            max_power = float(
-                                q.settings.get("power", self.service.default_power)
-                            )
-                            percent_power = max_power / 10.0
-                            # Max power is the percent max power, scaled by the pixel power.
-                            con.power(percent_power * on)
+                        # There is an active value_penbox
+                        settings = dict(q.settings)
+                        limit = len(self.value_penbox) - 1
+                        m = int(round(on * limit))
+                        try:
+                            pen = self.value_penbox[m]
+                            settings.update(pen)
+                        except IndexError:
+                            pass
+                        # Power scaling is exclusive to this penbox. on is used as a lookup and does not scale power.
+                        con.set_settings(settings)
                     con.mark(x, y)
             elif isinstance(q, DwellCut):
                 start = q.start
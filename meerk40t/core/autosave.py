@@ -0,0 +1,123 @@
+"""
+Autosave
+
+The autosave keeps a project file of the tree, written in the background. It counts the changes notified by the tree,
+and the property edits signalled by the gui, and saves once a number of changes were made or once the oldest unsaved
+change is some time old.
+
+The tree is snapshotted on the main thread with the shared node copies of the undo states, so only the nodes changed
+since the previous snapshot are copied. The snapshot is then written on a background thread. Images which were saved
+before are written from their encoded bytes, without encoding them again.
+"""
+import os
+import time
+
+from .project_io import ProjectWriter
+
+
+class Autosave:
+    def __init__(self, service, tree, undo, filename):
+        self.service = service
+        self.tree = tree
+        self.undo = undo
+        self.filename = filename
+        self.changes = 0
+        self._first_change = None
+        self._writing = False
+        self.tree.listen(self)
+        # Properties are often edited without notifying the tree, only signalling the edit.
+        service.listen("element_property_reload", self._property_changed)
+        service.listen("element_property_update", self._property_changed)
+        self.job = service.kernel.add_job(
+            self.check,
+            name=f"autosave_{service.path}",
+            interval=1.0,
+            run_main=True,
+            conditional=lambda: self.changes and self.service.autosave_enabled,
+        )
+
+    def __str__(self):
+        return f"Autosave({self.filename}, {self.changes} unsaved changes)"
+
+    # ==========
+    # TREE LISTENER
+    # ==========
+
+    def _changed(self, node=None, *args, **kwargs):
+        if self.changes == 0:
+            self._first_change = time.time()
+        self.changes += 1
+
+    node_attached = _changed
+    node_detached = _changed
+    node_changed = _changed
+    modified = _changed
+    altered = _changed
+    translated = _changed
+    scaled = _changed
+    update = _changed
+    nodes_added = _changed
+
+    def _property_changed(self, origin, *args):
+        self._changed()
+
+    # ==========
+    # SAVING
+    # ==========
+
+    def check(self):
+        """
+        Saves the tree if enough changes were made, or the oldest unsaved change is old enough.
+
+        @return: thread writing the snapshot, None if not saved.
+        """
+        if not self.changes:
+            return None
+        if (
+            self.changes < self.service.autosave_changes
+            and time.time() - self._first_change < self.service.autosave_interval
+        ):
+            return None
+        return self.save()
+
+    def save(self):
+        """
+        Snapshots the tree and writes it on a background thread. While a previous save is still being written no
+        snapshot is taken, the changes are saved by a later check.
+
+        @return: thread writing the snapshot, None if not saved.
+        """
+        if self._writing:
+            return None
+        try:
+            branches = self.undo.snapshot()
+        except KeyError:
+            # Hit a concurrent issue.
+            return None
+        self.changes = 0
+        self._first_change = None
+        self._writing = True
+        return self.service.kernel.threaded(
+            self._write,
+            branches,
+            self.service.note,
+            thread_name=f"autosave_{self.service.path}",
+            daemon=True,
+        )
+
+    def _write(self, branches, note):
+        temp = f"{self.filename}.tmp"
+        try:
+            ProjectWriter.write_file(temp, branches, note)
+            # The previous autosave is only replaced once the new one is complete.
+            os.replace(temp, self.filename)
+        except OSError as e:
+            self.service.kernel.channel("console")(f"Autosave failed: {e}")
+        finally:
+            self._writing = False
+
+    def shutdown(self):
+        self.tree.unlisten(self)
+        self.service.unlisten("element_property_reload", self._property_changed)
+        self.service.unlisten("element_property_update", self._property_changed)
+        self.service.kernel.unschedule(self.job)
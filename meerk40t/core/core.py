@@ -44,4 +44,8 @@ def plugin(kernel, lifecycle=None):
 
         plugins.append(svg_io.plugin)
 
+        from . import project_io
+
+        plugins.append(project_io.plugin)
+
         return plugins
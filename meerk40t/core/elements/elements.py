@@ -10,6 +10,9 @@ import os.path
 from copy import copy
 from time import time
 
+import numpy as np
+
+from meerk40t.core.autosave import Autosave
 from meerk40t.core.exceptions import BadFileError
 from meerk40t.core.node.node import Node
 from meerk40t.core.node.op_cut import CutOpNode
@@ -422,6 +425,68 @@ def plugin(kernel, lifecycle=None):
             },
         ]
         kernel.register_choices("preferences", choices)
+        choices = [
+            {
+                "attr": "undo_levels",
+                "object": elements,
+                "default": 50,
+                "type": int,
+                "label": _("Undo levels"),
+                "tip": _("Maximum number of undo states kept, 0 for no limit"),
+                "page": "Scene",
+                "section": "_95_Undo",
+            },
+            {
+                "attr": "undo_memory",
+                "object": elements,
+                "default": 512,
+                "type": int,
+                "label": _("Undo memory (MB)"),
+                "tip": _(
+                    "Maximum estimated memory used by the undo states, 0 for no limit. The oldest states are dropped first."
+                ),
+                "page": "Scene",
+                "section": "_95_Undo",
+            },
+        ]
+        kernel.register_choices("preferences", choices)
+        choices = [
+            {
+                "attr": "autosave_enabled",
+                "object": elements,
+                "default": False,
+                "type": bool,
+                "label": _("Autosave"),
+                "tip": _(
+                    "Save the project in the background to autosave.mkp in the configuration directory"
+                ),
+                "page": "Scene",
+                "section": "_96_Autosave",
+            },
+            {
+                "attr": "autosave_changes",
+                "object": elements,
+                "default": 50,
+                "type": int,
+                "label": _("Changes"),
+                "tip": _("Save once this number of changes were made"),
+                "page": "Scene",
+                "section": "_96_Autosave",
+            },
+            {
+                "attr": "autosave_interval",
+                "object": elements,
+                "default": 60.0,
+                "type": float,
+                "label": _("Interval (s)"),
+                "tip": _(
+                    "Save once the oldest unsaved change is this number of seconds old"
+                ),
+                "page": "Scene",
+                "section": "_96_Autosave",
+            },
+        ]
+        kernel.register_choices("preferences", choices)
         choices = [
             {
                 "attr": "default_ops_display_mode",
@@ -522,6 +587,8 @@ class Elemental(Service):
         self.points = list()
         self.segments = list()
 
+        self.setting(int, "undo_levels", 50)
+        self.setting(int, "undo_memory", 512)
         self.undo = Undo(self, self._tree)
         self.do_undo = True
         self.suppress_updates = False
@@ -554,6 +621,13 @@ class Elemental(Service):
 
         direct = os.path.dirname(self.op_data._config_file)
         self.mywordlist = Wordlist(self.kernel.version, direct)
+
+        self.setting(bool, "autosave_enabled", False)
+        self.setting(int, "autosave_changes", 50)
+        self.setting(float, "autosave_interval", 60.0)
+        self.autosave = Autosave(
+            self, self._tree, self.undo, os.path.join(direct, "autosave.mkp")
+        )
         with self.undofree():
             self.load_persistent_operations("previous")
 
@@ -1202,6 +1276,7 @@ class Elemental(Service):
         self.listen_tree(self)
 
     def shutdown(self, *args, **kwargs):
+        self.autosave.shutdown()
         # No need for an opinfo dict
         self.save_persistent_operations("previous")
         self.op_data.write_configuration()
@@ -1628,7 +1703,8 @@ class Elemental(Service):
 
     def prepare_undo(self):
         if self.do_undo:
-            self.schedule(self._save_restore_job)
+            # Within a kernel batch the undo state is saved once the batch ends.
+            self.kernel.batch_call(self.schedule, self._save_restore_job)
 
     def emphasized(self, *args):
         self._emphasized_bounds_dirty = True
@@ -1671,6 +1747,9 @@ class Elemental(Service):
     def node_detached(self, node, **kwargs):
         self.prepare_undo()
 
+    def nodes_added(self, nodes):
+        self.prepare_undo()
+
     def listen_tree(self, listener):
         self._tree.listen(listener)
 
@@ -1952,6 +2031,8 @@ class Elemental(Service):
         """
         Returns whether any element is emphasized
         """
+        if not self._tree.has_flagged("emphasized"):
+            return False
         for _ in self.elems_nodes(emphasized=True):
             return True
         return False
@@ -2185,48 +2266,59 @@ class Elemental(Service):
         else:
             return self._emphasized_bounds
 
-    def validate_selected_area(self):
-        boundary_points = []
-        boundary_points_painted = []
-        for e in self.elem_branch.flat(
-            types=elem_nodes,
-            emphasized=True,
-        ):
-            if e.bounds is None:
+    def emphasized_elements(self):
+        """
+        Element nodes within the elements branch which are emphasized, or are within an emphasized node. These are the
+        nodes of elems(emphasized=True), found from the emphasized nodes of the tree rather than the whole tree.
+
+        @return: list of element nodes, in no particular order
+        """
+        elem_branch = self.elem_branch
+        found = {}
+        for node in self._tree.flagged("emphasized"):
+            if node in found or not node.emphasized:
+                continue
+            parent = node
+            while parent is not None and parent is not elem_branch:
+                parent = parent._parent
+            if parent is None:
                 continue
+            for e in node._flatten(node):
+                if e.type in elem_nodes:
+                    found[e] = None
+        return list(found)
+
+    def validate_selected_area(self):
+        boxes = []
+        boxes_painted = []
+        for e in self.emphasized_elements():
             box = e.bounds
-            top_left = [box[0], box[1]]
-            top_right = [box[2], box[1]]
-            bottom_left = [box[0], box[3]]
-            bottom_right = [box[2], box[3]]
-            boundary_points.append(top_left)
-            boundary_points.append(top_right)
-            boundary_points.append(bottom_left)
-            boundary_points.append(bottom_right)
-            box = e.paint_bounds
-            top_left = [box[0], box[1]]
-            top_right = [box[2], box[1]]
-            bottom_left = [box[0], box[3]]
-            bottom_right = [box[2], box[3]]
-            boundary_points_painted.append(top_left)
-            boundary_points_painted.append(top_right)
-            boundary_points_painted.append(bottom_left)
-            boundary_points_painted.append(bottom_right)
+            if box is None:
+                continue
+            boxes.append(box)
+            box_painted = e.paint_bounds
+            boxes_painted.append(box if box_painted is None else box_painted)
 
-        if len(boundary_points) == 0:
+        if len(boxes) == 0:
             new_bounds = None
             new_bounds_painted = None
         else:
-            xmin = min([e[0] for e in boundary_points])
-            ymin = min([e[1] for e in boundary_points])
-            xmax = max([e[0] for e in boundary_points])
-            ymax = max([e[1] for e in boundary_points])
-            new_bounds = [xmin, ymin, xmax, ymax]
-            xmin = min([e[0] for e in boundary_points_painted])
-            ymin = min([e[1] for e in boundary_points_painted])
-            xmax = max([e[0] for e in boundary_points_painted])
-            ymax = max([e[1] for e in boundary_points_painted])
-            new_bounds_painted = [xmin, ymin, xmax, ymax]
+            bounds = np.array(boxes, dtype=float)
+            new_bounds = [
+                bounds[:, 0::2].min(),
+                bounds[:, 1::2].min(),
+                bounds[:, 0::2].max(),
+                bounds[:, 1::2].max(),
+            ]
+            bounds = np.array(boxes_painted, dtype=float)
+            new_bounds_painted = [
+                bounds[:, 0::2].min(),
+                bounds[:, 1::2].min(),
+                bounds[:, 0::2].max(),
+                bounds[:, 1::2].max(),
+            ]
+            new_bounds = [float(v) for v in new_bounds]
+            new_bounds_painted = [float(v) for v in new_bounds_painted]
         self._emphasized_bounds_dirty = False
         if self._emphasized_bounds != new_bounds:
             self._emphasized_bounds = new_bounds
@@ -2265,14 +2357,10 @@ class Elemental(Service):
         """
         Selected is the sublist of specifically selected nodes.
         """
-        for s in self._tree.flat():
-            in_list = selected is not None and s in selected
-            if s.selected:
-                if not in_list:
-                    s.selected = False
-            else:
-                if in_list:
-                    s.selected = True
+        selected_set = set() if selected is None else set(selected)
+        for s in self._tree.flagged("selected"):
+            if s not in selected_set:
+                s.selected = False
         if selected is not None:
             for e in selected:
                 e.selected = True
@@ -2283,23 +2371,21 @@ class Elemental(Service):
         If any element is emphasized, all references are highlighted.
         If any element is emphasized, all operations a references to that element are 'targeted'.
         """
-        for s in self._tree.flat():
-            if s.highlighted:
-                s.highlighted = False
-            if s.targeted:
-                s.targeted = False
-            if s.selected:
-                s.selected = False
-            if not s.can_emphasize:
-                continue
-            in_list = emphasize is not None and s in emphasize
-            if s.emphasized:
-                if not in_list:
-                    s.emphasized = False
-            else:
-                if in_list:
-                    s.emphasized = True
-                    s.selected = True
+        tree = self._tree
+        for s in tree.flagged("highlighted"):
+            s.highlighted = False
+        for s in tree.flagged("selected"):
+            s.selected = False
+        for s in tree.flagged("targeted"):
+            s.targeted = False
+        emphasize_set = {} if emphasize is None else dict.fromkeys(emphasize)
+        for s in tree.flagged("emphasized"):
+            if s.can_emphasize and s.emphasized and s not in emphasize_set:
+                s.emphasized = False
+        for s in emphasize_set:
+            if s._root is tree and s.can_emphasize and not s.emphasized:
+                s.emphasized = True
+                s.selected = True
         if emphasize is not None:
             # Validate emphasize
             old_first = self.first_emphasized
@@ -2529,13 +2615,44 @@ class Elemental(Service):
         if add_op_function is None:
             # add_op_function = self.add_op
             add_op_function = self.add_classify_op
+        black = Color("black")
+        white = Color("white")
+        # Operations chosen for the first element of each signature, reused for all later elements of that signature.
+        classified_signatures = {}
         for node in elements:
-            node_desc = f"[{node.type}]{'' if node.id is None else node.id + '-'}{'<none>' if node.label is None else node.label}"
             # Following lines added to handle 0.7 special ops added to ops list
             if hasattr(node, "operation"):
                 add_op_function(node)
                 continue
+            signature = self._classify_signature(node)
+            classified_ops = classified_signatures.get(signature)
+            if classified_ops is not None:
+                for op in classified_ops:
+                    if node._parent is op or any(
+                        ref._parent is op for ref in node._references
+                    ):
+                        continue
+                    op.add_reference(node)
+                continue
+            node_desc = None
+            if debug:
+                node_desc = f"[{node.type}]{'' if node.id is None else node.id + '-'}{'<none>' if node.label is None else node.label}"
+            references = set(map(id, node._references))
             classif_info = [False, False]
+            is_black = False
+            if (
+                hasattr(node, "stroke")
+                and node.stroke is not None
+                and node.stroke.argb is not None
+                and node.type != "elem text"
+            ):
+                if fuzzy:
+                    is_black = (
+                        Color.distance(black, node.stroke) <= fuzzydistance
+                        or Color.distance(white, node.stroke) <= fuzzydistance
+                    )
+                else:
+                    is_black = black == node.stroke or white == node.stroke
             # Even for fuzzy we check first a direct hit
             if fuzzy:
                 fuzzy_param = (False, True)
@@ -2559,24 +2676,7 @@ class Elemental(Service):
                         continue
                     if not do_fill and op.type in ("op raster", "op image"):
                         continue
-                    is_black = False
                     whisperer = True
-                    if (
-                        hasattr(node, "stroke")
-                        and node.stroke is not None
-                        and node.stroke.argb is not None
-                        and node.type != "elem text"
-                    ):
-                        if fuzzy:  # No need to distinguish tempfuzzy here
-                            is_black = (
-                                Color.distance("black", node.stroke) <= fuzzydistance
-                                or Color.distance("white", node.stroke) <= fuzzydistance
-                            )
-                        else:
-                            is_black = (
-                                Color("black") == node.stroke
-                                or Color("white") == node.stroke
-                            )
                     if (
                         not self.classify_black_as_raster
                         and is_black
@@ -2608,15 +2708,15 @@ class Elemental(Service):
                         if feedback is not None and "fill" in feedback:
                             classif_info[1] = True
                         was_classified = True
-                        if hasattr(node, "stroke"):
-                            sstroke = f"s={getattr(node, 'stroke')},"
-                        else:
-                            sstroke = ""
-                        if hasattr(node, "fill"):
-                            sfill = f"s={getattr(node, 'fill')},"
-                        else:
-                            sfill = ""
                         if debug:
+                            if hasattr(node, "stroke"):
+                                sstroke = f"s={getattr(node, 'stroke')},"
+                            else:
+                                sstroke = ""
+                            if hasattr(node, "fill"):
+                                sfill = f"s={getattr(node, 'fill')},"
+                            else:
+                                sfill = ""
                             debug(
                                 f"{node_desc} was classified: {sstroke} {sfill} matching operation: {type(op).__name__}, break={should_break}"
                             )
@@ -2671,6 +2771,21 @@ class Elemental(Service):
                 # let's iterate through the default ops and add them
                 if debug:
                     debug("Pass 2 (wasn't classified), looking for default ops")
+                is_black = False
+                if (
+                    hasattr(node, "stroke")
+                    and node.stroke is not None
+                    and node.stroke.argb is not None
+                    and node.type != "elem text"
+                ):
+                    plain_stroke = abs(node.stroke)
+                    if fuzzy:
+                        is_black = (
+                            Color.distance(black, plain_stroke) <= fuzzydistance
+                            or Color.distance(white, plain_stroke) <= fuzzydistance
+                        )
+                    else:
+                        is_black = black == plain_stroke or white == plain_stroke
                 for op in operations:
                     if classif_info[0] and op.type in (
                         "op engrave",
@@ -2680,25 +2795,7 @@ class Elemental(Service):
                         continue
                     if classif_info[1] and op.type in ("op raster", "op image"):
                         continue
-                    is_black = False
                     whisperer = True
-                    if (
-                        hasattr(node, "stroke")
-                        and node.stroke is not None
-                        and node.stroke.argb is not None
-                        and node.type != "elem text"
-                    ):
-                        if fuzzy:
-                            is_black = (
-                                Color.distance("black", abs(node.stroke))
-                                <= fuzzydistance
-                                or Color.distance("white", abs(node.stroke))
-                                <= fuzzydistance
-                            )
-                        else:
-                            is_black = Color("black") == abs(node.stroke) or Color(
-                                "white"
-                            ) == abs(node.stroke)
                     if (
                         not self.classify_black_as_raster
                         and is_black
@@ -3026,11 +3123,36 @@ class Elemental(Service):
 
                     if not existing:
                         op.add_reference(node)
+            classified_signatures[signature] = [
+                ref._parent for ref in node._references if id(ref) not in references
+            ]
 
         self.remove_unused_default_copies()
         if new_operations_added:
             self.signal("tree_changed")
 
+    @staticmethod
+    def _classify_signature(node):
+        """
+        Everything about a node its classification depends on: its type, stroke and fill colors and the operations
+        which already reference it. Nodes with the same signature are classified into the same operations.
+
+        @param node: node to classify
+        @return: hashable signature
+        """
+        stroke = getattr(node, "stroke", False)
+        if isinstance(stroke, Color):
+            stroke = ("argb", stroke.argb)
+        fill = getattr(node, "fill", False)
+        if isinstance(fill, Color):
+            fill = ("argb", fill.argb)
+        return (
+            node.type,
+            stroke,
+            fill,
+            tuple(id(ref._parent) for ref in node._references),
+        )
+
     def add_classify_op(self, op):
         """
         Ops are added as part of classify as elements are iterated that need a new op.
@@ -3818,7 +3940,7 @@ class Elemental(Service):
                 if valid:
                     self.set_start_time("load")
                     self.set_start_time("full_load")
-                    with self.static("load elements"):
+                    with self.static("load elements"), self._tree.bulk():
                         try:
                             # We could stop the attachment to shadowtree for the duration
                             # of the load to avoid unnecessary actions, this will provide
@@ -22,23 +22,23 @@ class PathNode(Node, Stroked, FunctionalParameter):
                 kwargs["geometry"] = args[0]
             else:
                 kwargs["path"] = args[0]
-        if "geometry" not in kwargs:
-            shape = kwargs.get("path")
-            if shape is not None:
-                # path is type Path.
-                if "stroke" not in kwargs:
-                    kwargs["stroke"] = shape.stroke
-                if "stroke_width" not in kwargs:
-                    kwargs["stroke_width"] = shape.implicit_stroke_width
-                if "fill" not in kwargs:
-                    kwargs["fill"] = shape.fill
-                if "matrix" not in kwargs:
-                    kwargs["matrix"] = shape.transform
-                if "stroke_scale" not in kwargs:
-                    kwargs["stroke_scale"] = (
-                        shape.values.get(SVG_ATTR_VECTOR_EFFECT)
-                        != SVG_VALUE_NON_SCALING_STROKE
-                    )
+        shape = kwargs.pop("path", None)
+        if shape is not None:
+            # path is type Path, the geometry is the path unless given.
+            if "stroke" not in kwargs:
+                kwargs["stroke"] = shape.stroke
+            if "stroke_width" not in kwargs:
+                kwargs["stroke_width"] = shape.implicit_stroke_width
+            if "fill" not in kwargs:
+                kwargs["fill"] = shape.fill
+            if "matrix" not in kwargs:
+                kwargs["matrix"] = shape.transform
+            if "stroke_scale" not in kwargs:
+                kwargs["stroke_scale"] = (
+                    shape.values.get(SVG_ATTR_VECTOR_EFFECT)
+                    != SVG_VALUE_NON_SCALING_STROKE
+                )
+            if "geometry" not in kwargs:
                 self.geometry = Geomstr.svg(shape)
         self.matrix = None
         self.fill = None
@@ -183,6 +183,8 @@ class Node:
     @targeted.setter
     def targeted(self, value):
         self._target = value
+        if self._root is not None:
+            self._root._index_flag(self, "targeted", value)
         self.notify_targeted(self)
 
     @property
@@ -192,6 +194,8 @@ class Node:
     @highlighted.setter
     def highlighted(self, value):
         self._highlighted = value
+        if self._root is not None:
+            self._root._index_flag(self, "highlighted", value)
         self.notify_highlighted(self)
 
     @property
@@ -245,6 +249,8 @@ class Node:
         if value != self._emphasized:
             self._emphasized = value
             self._emphasized_time = time() if value else None
+            if self._root is not None:
+                self._root._index_flag(self, "emphasized", value)
         self.notify_emphasized(self)
 
     @property
@@ -281,6 +287,8 @@ class Node:
     @selected.setter
     def selected(self, value):
         self._selected = value
+        if self._root is not None:
+            self._root._index_flag(self, "selected", value)
         self.notify_selected(self)
 
     @property
@@ -400,6 +408,26 @@ class Node:
             self._points_dirty = False
         return self._points
 
+    def _index_flag(self, node, flag, value):
+        """
+        Called on the root of a node when the node was flagged or unflagged as emphasized, selected, highlighted or
+        targeted.
+        Only the RootNode keeps an index of the flagged nodes.
+        """
+        pass
+
+    def _index_node(self, node):
+        """
+        Called on the root a node is given by set_root().
+        """
+        pass
+
+    def _unindex_node(self, node):
+        """
+        Called on the root a node is taken from by set_root().
+        """
+        pass
+
     def restore_tree(self, tree_data):
         self._children.clear()
         self._children.extend(tree_data)
@@ -1007,7 +1035,13 @@ class Node:
         @param root:
         @return:
         """
-        self._root = root
+        old_root = self._root
+        if old_root is not root:
+            if old_root is not None:
+                old_root._unindex_node(self)
+            self._root = root
+            if root is not None:
+                root._index_node(self)
         for c in self._children:
             c.set_root(root)
 
@@ -1032,6 +1066,49 @@ class Node:
             yield child
             yield from self._flatten_children(child)
 
+    def _tree_ordered(self, nodes):
+        """
+        Sorts the given nodes into the depth first order of this node and its descendants. Nodes which are not this
+        node or one of its descendants are dropped.
+
+        @param nodes: nodes to sort
+        @return: sorted list of nodes
+        """
+        positions = {}
+        keyed = []
+        for node in nodes:
+            key = []
+            c = node
+            while c is not self:
+                parent = c._parent
+                if parent is None:
+                    break
+                position = positions.get(id(parent))
+                if position is None:
+                    position = {id(n): i for i, n in enumerate(parent._children)}
+                    positions[id(parent)] = position
+                index = position.get(id(c))
+                if index is None:
+                    break
+                key.append(index)
+                c = parent
+            else:
+                key.reverse()
+                keyed.append((key, node))
+        keyed.sort(key=lambda e: e[0])
+        return [node for key, node in keyed]
+
+    def typed_nodes(self, types, within=None):
+        """
+        Nodes within the tree of the given types, if the tree keeps an index of its node types. Only the RootNode
+        keeps this index.
+
+        @param types: node types
+        @param within: node the query is made for, which must be within the tree
+        @return: list of nodes in no particular order, or None if not indexed
+        """
+        return None
+
     def flat(
         self,
         types=None,
@@ -1059,6 +1136,30 @@ class Node:
         @return:
         """
         node = self
+        root = node._root
+        if root is not None and (
+            (emphasized and not root.has_flagged("emphasized"))
+            or (selected and not root.has_flagged("selected"))
+            or (highlighted and not root.has_flagged("highlighted"))
+            or (targeted and not root.has_flagged("targeted"))
+        ):
+            # No node within the tree is flagged.
+            return
+        if (
+            root is not None
+            and types is not None
+            and cascade
+            and targeted is None
+            and emphasized is None
+            and selected is None
+            and highlighted is None
+            and lock is None
+        ):
+            # Every descendant of a matching type, found by the type index of the root.
+            nodes = root.typed_nodes(types, within=self)
+            if nodes is not None:
+                yield from self._tree_ordered(nodes)
+                return
         if (
             (targeted is None or targeted == node.targeted)
             and (emphasized is None or emphasized == node.emphasized)
@@ -1088,6 +1189,13 @@ class Node:
                 types, cascade, depth, selected, emphasized, targeted, highlighted, lock
             )
 
+    def has_flagged(self, flag):
+        """
+        Whether any node within this tree may be flagged as emphasized, selected, highlighted or targeted. Only the
+        RootNode keeps an index of the flagged nodes, for any other node this is always True.
+        """
+        return True
+
     def count_children(self):
         return len(self._children)
 
@@ -1146,9 +1254,11 @@ class Node:
                 ref._parent = node
                 # Don't call attach / detach, as the tree
                 # doesn't know about the new node yet...
+            # The children moved and keep their root.
+            self._children = []
         self._item = None
         self._parent = None
-        self._root = None
+        self.set_root(None)
         self.unregister()
         return node
 
@@ -1233,7 +1343,7 @@ class Node:
                 ref.remove_node(fast=fast)
         self._item = None
         self._parent = None
-        self._root = None
+        self.set_root(None)
         self.unregister()
 
     def remove_all_children(self, fast=False, destroy=True):
@@ -1,3 +1,5 @@
+import contextlib
+
 from meerk40t.core.node.node import Node
 
 
@@ -6,14 +8,31 @@ class RootNode(Node):
     RootNode is one of the few directly declarable node-types and serves as the base type for all Node classes.
 
     The notifications are shallow. They refer *only* to the node in question, not to any children or parents.
+
+    The root keeps an index of the nodes within the tree by type, and of the nodes which are flagged as emphasized,
+    selected, highlighted or targeted.
+
+    Within bulk(), the nodes added to the tree are notified together once the bulk ends, see bulk().
     """
 
     def __init__(self, context, **kwargs):
         _ = context._
         super().__init__(type="root", **kwargs)
+        self._flagged = {
+            "emphasized": {},
+            "selected": {},
+            "highlighted": {},
+            "targeted": {},
+        }
+        self._types = {}
         self._root = self
         self.context = context
         self.listeners = []
+        self._bulk_depth = 0
+        # Nodes created and attached within the bulk, and ids of the added nodes and their descendants.
+        self._bulk_created = []
+        self._bulk_attached = []
+        self._bulk_nodes = set()
         self.add(type="branch ops", label=_("Operations"))
         self.add(type="branch elems", label=_("Elements"))
         self.add(type="branch reg", label=_("Regmarks"))
@@ -27,6 +46,142 @@ class RootNode(Node):
     def is_draggable(self):
         return False
 
+    def _index_flag(self, node, flag, value):
+        if value:
+            self._flagged[flag][node] = None
+        else:
+            self._flagged[flag].pop(node, None)
+
+    def _index_node(self, node):
+        self._types.setdefault(node.type, {})[node] = None
+        if node._emphasized:
+            self._flagged["emphasized"][node] = None
+        if node._selected:
+            self._flagged["selected"][node] = None
+        if node._highlighted:
+            self._flagged["highlighted"][node] = None
+        if node._target:
+            self._flagged["targeted"][node] = None
+
+    def _unindex_node(self, node):
+        nodes = self._types.get(node.type)
+        if nodes is not None:
+            nodes.pop(node, None)
+        for nodes in self._flagged.values():
+            nodes.pop(node, None)
+
+    def _reindex(self):
+        self._types.clear()
+        for nodes in self._flagged.values():
+            nodes.clear()
+        for node in self._flatten_children(self):
+            self._index_node(node)
+
+    def restore_tree(self, tree_data):
+        super().restore_tree(tree_data)
+        self._reindex()
+
+    def typed_nodes(self, types, within=None):
+        index = self._types
+        if isinstance(types, str):
+            return None
+        if within is not None and within is not self:
+            if within not in index.get(within.type, ()):
+                # Not within this tree.
+                return None
+        nodes = []
+        for t in types:
+            typed = index.get(t)
+            if typed:
+                nodes.extend(typed)
+        if len(nodes) * 4 > sum(len(typed) for typed in index.values()):
+            # Walking the tree is as quick.
+            return None
+        return nodes
+
+    def has_flagged(self, flag):
+        return len(self._flagged[flag]) != 0
+
+    def flagged(self, flag):
+        """
+        Nodes within the tree flagged as emphasized, selected, highlighted or targeted, in the order they were flagged.
+
+        Emphasized nodes which are not visible are included, see Node.emphasized.
+
+        @param flag: "emphasized", "selected", "highlighted" or "targeted"
+        @return: list of nodes
+        """
+        return list(self._flagged[flag])
+
+    @contextlib.contextmanager
+    def bulk(self):
+        """
+        Bulk insertion of nodes. Within the bulk, creating and attaching nodes is not notified node by node. When the
+        outermost bulk ends the listeners are notified once, with nodes_added(nodes) where nodes are the added nodes
+        whose parents were not added with them. Listeners without nodes_added are notified of each created and
+        attached node as usual, at the end of the bulk.
+
+        Changes to the added nodes are not notified, the listeners are given the nodes as they are at the end of the
+        bulk. Detaching or destroying any node, or selecting, emphasizing or focusing an added node, first notifies
+        the nodes added so far.
+        """
+        self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            self._bulk_depth -= 1
+            if not self._bulk_depth:
+                self._bulk_flush()
+
+    @staticmethod
+    def insert_order(nodes):
+        """
+        Orders nodes added together, see bulk(), for insertion into a view of the tree. Each node is given with its
+        position within its parent, after the added siblings before it. Inserting them in turn, each node finds its
+        earlier siblings already in place.
+
+        @param nodes: nodes added together
+        @return: list of (node, position) tuples
+        """
+        positions = {}
+        for parent in {id(node._parent): node._parent for node in nodes}.values():
+            for i, child in enumerate(parent.children):
+                positions[id(child)] = i
+        return [
+            (node, positions[id(node)])
+            for node in sorted(nodes, key=lambda n: positions[id(n)])
+        ]
+
+    def _bulk_flush(self):
+        created = self._bulk_created
+        attached = self._bulk_attached
+        if not created and not attached:
+            return
+        added = [
+            node
+            for node, kwargs in attached
+            if node._parent is None or id(node._parent) not in self._bulk_nodes
+        ]
+        self._bulk_created = []
+        self._bulk_attached = []
+        self._bulk_nodes = set()
+        for listen in self.listeners:
+            if hasattr(listen, "nodes_added"):
+                listen.nodes_added(added)
+                continue
+            if hasattr(listen, "node_created"):
+                for node in created:
+                    listen.node_created(node)
+            if hasattr(listen, "node_attached"):
+                for node, kwargs in attached:
+                    listen.node_attached(node, **kwargs)
+
+    def _bulk_pending(self, node):
+        """
+        Whether the node was added within the bulk and is not notified yet.
+        """
+        return self._bulk_depth and id(node) in self._bulk_nodes
+
     def listen(self, listener):
         self.listeners.append(listener)
 
@@ -36,6 +191,9 @@ class RootNode(Node):
     def notify_created(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_depth:
+            self._bulk_created.append(node)
+            return
         for listen in self.listeners:
             if hasattr(listen, "node_created"):
                 listen.node_created(node, **kwargs)
@@ -43,6 +201,7 @@ class RootNode(Node):
     def notify_destroyed(self, node=None, **kwargs):
         if node is None:
             node = self
+        self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "node_destroyed"):
                 listen.node_destroyed(node, **kwargs)
@@ -50,6 +209,10 @@ class RootNode(Node):
     def notify_attached(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_depth:
+            self._bulk_attached.append((node, kwargs))
+            self._bulk_nodes.update(id(n) for n in self._flatten(node))
+            return
         for listen in self.listeners:
             if hasattr(listen, "node_attached"):
                 listen.node_attached(node, **kwargs)
@@ -57,6 +220,7 @@ class RootNode(Node):
     def notify_detached(self, node=None, **kwargs):
         if node is None:
             node = self
+        self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "node_detached"):
                 listen.node_detached(node, **kwargs)
@@ -64,6 +228,8 @@ class RootNode(Node):
     def notify_changed(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "node_changed"):
                 listen.node_changed(node, **kwargs)
@@ -71,6 +237,8 @@ class RootNode(Node):
     def notify_selected(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "selected"):
                 listen.selected(node, **kwargs)
@@ -78,6 +246,8 @@ class RootNode(Node):
     def notify_emphasized(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "emphasized"):
                 listen.emphasized(node, **kwargs)
@@ -85,6 +255,8 @@ class RootNode(Node):
     def notify_targeted(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "targeted"):
                 listen.targeted(node, **kwargs)
@@ -92,6 +264,8 @@ class RootNode(Node):
     def notify_highlighted(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "highlighted"):
                 listen.highlighted(node, **kwargs)
@@ -107,6 +281,8 @@ class RootNode(Node):
         if node is None:
             node = self
         self._bounds = None
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "modified"):
                 listen.modified(node, **kwargs)
@@ -130,6 +306,8 @@ class RootNode(Node):
                 self._bounds[2] + dx,
                 self._bounds[3] + dy,
             ]
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "translated"):
                 listen.translated(node, dx=dx, dy=dy)  # , **kwargs)
@@ -163,6 +341,8 @@ class RootNode(Node):
                 y1 = oy + sy * d2
             self._bounds = [min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)]
 
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "scaled"):
                 listen.scaled(node, sx=sx, sy=sy, ox=ox, oy=oy)  # , **kwargs)
@@ -179,6 +359,8 @@ class RootNode(Node):
         """
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "altered"):
                 listen.altered(node, **kwargs)
@@ -186,6 +368,8 @@ class RootNode(Node):
     def notify_expand(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "expand"):
                 listen.expand(node, **kwargs)
@@ -193,6 +377,8 @@ class RootNode(Node):
     def notify_collapse(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "collapse"):
                 listen.collapse(node, **kwargs)
@@ -200,6 +386,8 @@ class RootNode(Node):
     def notify_reorder(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "reorder"):
                 listen.reorder(node, **kwargs)
@@ -207,6 +395,8 @@ class RootNode(Node):
     def notify_update(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            return
         for listen in self.listeners:
             if hasattr(listen, "update"):
                 listen.update(node, **kwargs)
@@ -214,6 +404,8 @@ class RootNode(Node):
     def notify_focus(self, node=None, **kwargs):
         if node is None:
             node = self
+        if self._bulk_pending(node):
+            self._bulk_flush()
         for listen in self.listeners:
             if hasattr(listen, "focus"):
                 listen.focus(node, **kwargs)
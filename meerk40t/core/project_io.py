@@ -0,0 +1,320 @@
+"""
+Native project files.
+
+A project file is a zip archive of the node tree. The tree is stored as json in "tree.json", with the geometries of
+all nodes stored together as one raw numpy array in "geometry.npy" and every image stored as an encoded image file of
+its own. None of these need to be converted to or from text, and images are read as encoded bytes which are only
+decoded when the image is used.
+
+Node attributes are stored as json values. Values json has no type for are stored as single key objects naming their
+type, such as {"matrix": [a, b, c, d, e, f]}, references to other nodes store the position of the node within the
+tree.
+"""
+
+import json
+import weakref
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import PIL.Image
+
+from meerk40t.core.elements.element_types import elem_nodes
+from meerk40t.core.exceptions import BadFileError
+from meerk40t.core.node.node import Node
+from meerk40t.svgelements import Color, Matrix
+from meerk40t.tools.geomstr import Geomstr
+
+PROJECT_VERSION = 1
+PROJECT_TREE = "tree.json"
+PROJECT_GEOMETRY = "geometry.npy"
+
+
+def plugin(kernel, lifecycle=None):
+    if lifecycle == "register":
+        kernel.register("load/ProjectLoader", ProjectLoader)
+        kernel.register("save/ProjectWriter", ProjectWriter)
+
+
+# Encoded file of the images saved or loaded, by id of the image. Images are not changed in place, an altered image
+# is a new image, so an image which was saved before is saved again without encoding it.
+_image_payloads = {}
+
+
+def _image_payload(image):
+    """
+    Encoded file of the image, as file extension and bytes.
+    """
+    payload = _image_payloads.get(id(image))
+    if payload is None:
+        stream = BytesIO()
+        try:
+            image.save(stream, format="PNG", compress_level=1)
+        except OSError:
+            # CMYK images can't be encoded as PNG.
+            stream = BytesIO()
+            image.convert("RGBA").save(stream, format="PNG", compress_level=1)
+        payload = ("png", stream.getvalue())
+        _remember_payload(image, payload)
+    return payload
+
+
+def _remember_payload(image, payload):
+    _image_payloads[id(image)] = payload
+    weakref.finalize(image, _image_payloads.pop, id(image), None)
+
+
+def tree_snapshot(tree):
+    """
+    Snapshot of the tree, structured as the snapshots of the undo states, without copying the nodes. Branches are
+    nested lists of (node, children, reference), where reference is the position of the referenced node in the
+    depth-first order of the snapshot.
+
+    @param tree: root node
+    @return: snapshot branches
+    """
+
+    def walk(node):
+        for c in node.children:
+            yield c
+            yield from walk(c)
+
+    positions = {id(node): i for i, node in enumerate(walk(tree))}
+
+    def build(node):
+        return [
+            (
+                c,
+                build(c),
+                positions[id(c.node)] if c.type == "reference" else None,
+            )
+            for c in node.children
+        ]
+
+    return build(tree)
+
+
+class ProjectWriter:
+    @staticmethod
+    def save_types():
+        yield "MeerK40t Project", "mkp", "application/zip", "default"
+
+    @staticmethod
+    def save(context, f, version="default"):
+        elements = context.elements
+        elements.validate_ids()
+        ProjectWriter.write_file(f, tree_snapshot(elements._tree), elements.note)
+
+    @staticmethod
+    def write_file(f, branches, note=None):
+        """
+        Writes the project file of the given snapshot. See tree_snapshot() and Undo.snapshot().
+
+        @param f: filename or file
+        @param branches: snapshot of the tree
+        @param note: note of the project
+        """
+        with zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as archive:
+            ProjectWriter(archive).write(branches, note)
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.geometry = []
+        self.geometry_size = 0
+        self.images = 0
+
+    def write(self, branches, note=None):
+        """
+        Writes the snapshot of the tree to the archive.
+        """
+        project = {
+            "version": PROJECT_VERSION,
+            "note": note,
+            "branches": [self._node(*entry) for entry in branches],
+        }
+        if self.geometry:
+            segments = np.concatenate(self.geometry)
+        else:
+            segments = np.zeros((0, 5), dtype=complex)
+        with self.archive.open(PROJECT_GEOMETRY, "w") as f:
+            np.save(f, segments)
+        self.archive.writestr(
+            PROJECT_TREE, json.dumps(project), compress_type=zipfile.ZIP_DEFLATED
+        )
+
+    def _node(self, node, children, reference):
+        attributes = {k: self._value(v) for k, v in node.node_dict.items()}
+        if reference is not None:
+            attributes["node"] = {"node": reference}
+        return {
+            "type": node.type,
+            "attributes": attributes,
+            "children": [self._node(*entry) for entry in children],
+        }
+
+    def _value(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, list):
+            return [self._value(v) for v in value]
+        if isinstance(value, tuple):
+            return {"tuple": [self._value(v) for v in value]}
+        if isinstance(value, dict):
+            return {
+                "dict": [[self._value(k), self._value(v)] for k, v in value.items()]
+            }
+        if isinstance(value, Color):
+            return {"color": value.hexa}
+        if isinstance(value, Matrix):
+            return {"matrix": [value.a, value.b, value.c, value.d, value.e, value.f]}
+        if isinstance(value, Geomstr):
+            start = self.geometry_size
+            self.geometry.append(value.segments[: value.index])
+            self.geometry_size += value.index
+            return {
+                "geometry": [start, self.geometry_size],
+                "settings": self._value(value._settings),
+            }
+        if isinstance(value, PIL.Image.Image):
+            extension, data = _image_payload(value)
+            self.images += 1
+            name = f"images/{self.images}.{extension}"
+            self.archive.writestr(name, data)
+            return {"image": name}
+        if isinstance(value, Node):
+            # References are stored by their position, given by the snapshot.
+            return None
+        # Other values are stored as text, as node attributes given as text are evaluated by the node.
+        return str(value)
+
+
+class ProjectLoader:
+    @staticmethod
+    def load_types():
+        yield "MeerK40t Project", ("mkp",), "application/zip"
+
+    @staticmethod
+    def load(context, elements_service, pathname, **kwargs):
+        try:
+            archive = zipfile.ZipFile(pathname)
+        except zipfile.BadZipFile as e:
+            raise BadFileError(str(e)) from e
+        with archive:
+            try:
+                project = json.loads(archive.read(PROJECT_TREE))
+                with archive.open(PROJECT_GEOMETRY) as f:
+                    geometry = np.load(f)
+            except (KeyError, ValueError) as e:
+                raise BadFileError(str(e)) from e
+            if project.get("version", 0) > PROJECT_VERSION:
+                raise BadFileError("Project file of a newer version")
+            reader = ProjectReader(elements_service, archive, geometry)
+            with elements_service.kernel.batch():
+                reader.read(project, pathname)
+        return True
+
+
+class ProjectReader:
+    """
+    Adds the nodes of a project to the tree. The elements and regmarks are added to their branches, the operations of
+    the project replace the current operations.
+    """
+
+    def __init__(self, elements, archive, geometry):
+        self.elements = elements
+        self.archive = archive
+        self.geometry = geometry
+        self.nodes = {}
+        self.references = []
+        self.position = 0
+
+    def read(self, project, pathname):
+        elements = self.elements
+        if project.get("note") is not None:
+            elements.note = project["note"]
+            elements.signal("note", pathname)
+        tree = elements._tree
+        element_list = []
+        for entry in project.get("branches", ()):
+            branch = tree.get(type=entry["type"])
+            self.nodes[self.position] = branch
+            self.position += 1
+            if branch is None:
+                self._add_children(None, entry["children"])
+                continue
+            if branch.type == "branch ops" and entry["children"]:
+                for child in list(branch.children):
+                    child.remove_all_children(fast=True, destroy=True)
+                    child.remove_node(fast=True, destroy=True)
+                elements.undo.mark("op-replaced")
+                for key, value in entry["attributes"].items():
+                    if key not in ("id", "label", "lock"):
+                        setattr(branch, key, self._value(value))
+            added = self._add_children(branch, entry["children"])
+            if branch.type == "branch elems":
+                element_list.extend(added)
+        for parent, pos, attributes in self.references:
+            node = self.nodes.get(attributes.pop("node"))
+            if node is not None:
+                parent.add_reference(node, pos=pos, **attributes)
+        if not self.references and elements.classify_new:
+            elements.classify(
+                [e for node in element_list for e in node.flat(types=elem_nodes)]
+            )
+
+    def _add_children(self, parent, entries):
+        """
+        Adds the nodes of the entries to the parent. References are added once all nodes exist. Nodes which can't be
+        created are skipped, along with their children.
+
+        @return: nodes added
+        """
+        added = []
+        for pos, entry in enumerate(entries):
+            position = self.position
+            self.position += 1
+            node = None
+            if parent is not None:
+                attributes = {
+                    k: self._value(v) for k, v in entry["attributes"].items()
+                }
+                if entry["type"] == "reference":
+                    self.references.append((parent, pos, attributes))
+                else:
+                    try:
+                        node = parent.add(type=entry["type"], **attributes)
+                    except ValueError:
+                        node = None
+            if node is not None:
+                self.nodes[position] = node
+                added.append(node)
+            self._add_children(node, entry["children"])
+        return added
+
+    def _value(self, value):
+        if isinstance(value, list):
+            return [self._value(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if "tuple" in value:
+            return tuple(self._value(v) for v in value["tuple"])
+        if "dict" in value:
+            return {self._value(k): self._value(v) for k, v in value["dict"]}
+        if "color" in value:
+            return Color(value["color"])
+        if "matrix" in value:
+            return Matrix(*value["matrix"])
+        if "geometry" in value:
+            start, end = value["geometry"]
+            geometry = Geomstr(self.geometry[start:end])
+            geometry._settings = self._value(value["settings"])
+            return geometry
+        if "image" in value:
+            data = self.archive.read(value["image"])
+            # Opening the image only reads its header, it is decoded when used.
+            image = PIL.Image.open(BytesIO(data))
+            _remember_payload(image, (value["image"].rpartition(".")[2], data))
+            return image
+        if "node" in value:
+            return value["node"]
+        return value
@@ -8,7 +8,13 @@ import math
 import os
 from base64 import b64encode
 from io import BytesIO
-from xml.etree.ElementTree import Element, ElementTree, ParseError, SubElement
+from xml.etree.ElementTree import (
+    Element,
+    ElementTree,
+    ParseError,
+    SubElement,
+    iterparse,
+)
 
 from meerk40t.core.exceptions import BadFileError
 from meerk40t.core.node.node import Fillrule, Linecap, Linejoin
@@ -17,7 +23,11 @@ from ..svgelements import (
     SVG,
     SVG_ATTR_CENTER_X,
     SVG_ATTR_CENTER_Y,
+    SVG_ATTR_CLASS,
+    SVG_ATTR_CLIP_PATH,
+    SVG_ATTR_COLOR,
     SVG_ATTR_DATA,
+    SVG_ATTR_DISPLAY,
     SVG_ATTR_FILL,
     SVG_ATTR_FILL_OPACITY,
     SVG_ATTR_FONT_FAMILY,
@@ -28,11 +38,13 @@ from ..svgelements import (
     SVG_ATTR_HEIGHT,
     SVG_ATTR_ID,
     SVG_ATTR_POINTS,
+    SVG_ATTR_PRESERVEASPECTRATIO,
     SVG_ATTR_RADIUS_X,
     SVG_ATTR_RADIUS_Y,
     SVG_ATTR_STROKE,
     SVG_ATTR_STROKE_OPACITY,
     SVG_ATTR_STROKE_WIDTH,
+    SVG_ATTR_STYLE,
     SVG_ATTR_TAG,
     SVG_ATTR_TEXT_ALIGNMENT_BASELINE,
     SVG_ATTR_TEXT_ANCHOR,
@@ -54,14 +66,24 @@ from ..svgelements import (
     SVG_NAME_TAG,
     SVG_RULE_EVENODD,
     SVG_RULE_NONZERO,
+    SVG_STRUCT_ATTRIB,
+    SVG_TAG_CIRCLE,
+    SVG_TAG_CLIPPATH,
+    SVG_TAG_DEFS,
     SVG_TAG_ELLIPSE,
     SVG_TAG_GROUP,
     SVG_TAG_IMAGE,
     SVG_TAG_LINE,
     SVG_TAG_PATH,
+    SVG_TAG_PATTERN,
+    SVG_TAG_POLYGON,
     SVG_TAG_POLYLINE,
     SVG_TAG_RECT,
+    SVG_TAG_STYLE,
     SVG_TAG_TEXT,
+    SVG_TAG_TSPAN,
+    SVG_TAG_USE,
+    SVG_VALUE_CURRENT_COLOR,
     SVG_VALUE_NON_SCALING_STROKE,
     SVG_VALUE_NONE,
     SVG_VALUE_VERSION,
@@ -83,6 +105,7 @@ from ..svgelements import (
     SVGText,
     Use,
 )
+from ..tools.geomstr import Geomstr
 from .units import DEFAULT_PPI, NATIVE_UNIT_PER_INCH, Length
 
 SVG_ATTR_STROKE_JOIN = "stroke-linejoin"
@@ -120,6 +143,30 @@ def plugin(kernel, lifecycle=None):
 MEERK40T_NAMESPACE = "https://github.com/meerk40t/meerk40t/wiki/Namespace"
 MEERK40T_XMLS_ID = "meerk40t"
 
+# Tags which need the whole document to be parsed, these files are not streamed.
+SVG_STREAM_UNSUPPORTED_TAGS = (
+    SVG_TAG_USE,
+    SVG_TAG_STYLE,
+    SVG_TAG_CLIPPATH,
+    SVG_TAG_PATTERN,
+)
+SVG_STREAM_SHAPE_TAGS = {
+    SVG_TAG_PATH: Path,
+    SVG_TAG_CIRCLE: Circle,
+    SVG_TAG_ELLIPSE: Ellipse,
+    SVG_TAG_LINE: SimpleLine,
+    SVG_TAG_POLYLINE: Polyline,
+    SVG_TAG_POLYGON: Polygon,
+    SVG_TAG_RECT: Rect,
+    SVG_TAG_IMAGE: SVGImage,
+}
+
+
+class StreamUnsupported(Exception):
+    """
+    The svg file uses features which can't be streamed and must be parsed as a whole.
+    """
+
 
 def capstr(linecap):
     """
@@ -699,7 +746,8 @@ class SVGProcessor:
         file_node = context_node.add(type="file", filepath=pathname)
         file_node.focus()
 
-        self.parse(svg, file_node, self.element_list, branch="elements")
+        with self.elements.kernel.batch():
+            self.parse(svg, file_node, self.element_list, branch="elements")
 
         if self.load_operations and self.operations_replaced:
             for child in list(self.elements.op_branch.children):
@@ -726,6 +774,247 @@ class SVGProcessor:
         if self.requires_classification and self.elements.classify_new:
             self.elements.classify(self.element_list)
 
+    def process_stream(
+        self,
+        source,
+        pathname,
+        ppi=DEFAULT_PPI,
+        width=None,
+        height=None,
+        color="black",
+        transform=None,
+        parse_display_none=False,
+    ):
+        """
+        Streaming alternative to process() of the parsed svg. The file is read with iterparse and each svg element
+        is converted into nodes as it is read and then released, so the svg is never held in memory as a whole. The
+        svg values are computed as SVG.parse() would compute them, given the same parameters.
+
+        Files using the meerk40t namespace, <use>, <style>, clip paths or patterns need the whole document and are not
+        streamed. Neither are hidden elements, which are loaded as regmarks.
+
+        @param source: svg file or stream
+        @param pathname:
+        @return: True if processed, False if the file is to be parsed and processed as a whole.
+        """
+        self.pathname = pathname
+
+        context_node = self.elements.elem_branch
+        file_node = context_node.add(type="file", filepath=pathname)
+        file_node.focus()
+        try:
+            with self.elements.kernel.batch():
+                self._stream(
+                    source,
+                    file_node,
+                    ppi,
+                    width,
+                    height,
+                    color,
+                    transform,
+                    parse_display_none,
+                )
+        except (StreamUnsupported, ParseError):
+            file_node.remove_all_children(fast=True, destroy=True)
+            file_node.remove_node(fast=True, destroy=True)
+            self.element_list.clear()
+            return False
+
+        if self.elements.classify_new:
+            self.elements.classify(self.element_list)
+        return True
+
+    def _stream(
+        self,
+        source,
+        file_node,
+        ppi,
+        width,
+        height,
+        color,
+        transform,
+        parse_display_none,
+    ):
+        """
+        Streams the svg file into nodes of the file_node, see process_stream().
+
+        @raise StreamUnsupported: the file can't be streamed.
+        """
+        e_list = self.element_list
+        context_node = file_node
+        values = {
+            SVG_ATTR_COLOR: color,
+            SVG_ATTR_FILL: "black",
+            SVG_ATTR_STROKE: "none",
+        }
+        if transform is not None:
+            values[SVG_ATTR_TRANSFORM] = transform
+        # Values and context of the open elements, context_node is None within non-rendered elements.
+        stack = []
+        # Open xml elements, the children of each are released once processed.
+        open_elements = []
+        for event, elem in iterparse(source, events=("start", "end", "start-ns")):
+            if event == "start-ns":
+                if elem[1] == MEERK40T_NAMESPACE:
+                    raise StreamUnsupported
+                if elem[0] != SVG_ATTR_DATA:
+                    values[elem[0]] = elem[1]
+                continue
+            tag = elem.tag
+            if tag.startswith("{http://www.w3.org/2000/svg"):
+                tag = tag[28:]
+            if event == "start":
+                stack.append((context_node, values))
+                open_elements.append(elem)
+                if (
+                    tag in SVG_STREAM_UNSUPPORTED_TAGS
+                    or tag.lower() == "note"
+                    or "type" in elem.attrib
+                ):
+                    raise StreamUnsupported
+                if (
+                    not parse_display_none
+                    and SVG_ATTR_DISPLAY in values
+                    and values[SVG_ATTR_DISPLAY].lower() == SVG_VALUE_NONE
+                ):
+                    continue
+                values = self._stream_values(values, tag, elem.attrib)
+                display = values.get(SVG_ATTR_DISPLAY, "").lower()
+                if display == SVG_VALUE_NONE:
+                    if parse_display_none:
+                        raise StreamUnsupported
+                    continue
+                if values.get("visibility") == "hidden":
+                    raise StreamUnsupported
+                if context_node is None:
+                    continue
+                if tag == SVG_NAME_TAG:
+                    s = SVG(values)
+                    if width is None:
+                        width = s.viewbox.width if s.viewbox is not None else 1000
+                    if height is None:
+                        height = s.viewbox.height if s.viewbox is not None else 1000
+                    s.render(ppi=ppi, width=width, height=height, viewbox=s.viewbox)
+                    height, width = s.width, s.height
+                    if s.viewbox is not None:
+                        try:
+                            if s.height == 0 or s.width == 0:
+                                return
+                            viewport_transform = s.viewbox_transform
+                        except ZeroDivisionError:
+                            return
+                        if SVG_ATTR_TRANSFORM in values:
+                            values[SVG_ATTR_TRANSFORM] += " " + viewport_transform
+                        else:
+                            values[SVG_ATTR_TRANSFORM] = viewport_transform
+                        values["viewport_transform"] = values[SVG_ATTR_TRANSFORM]
+                        width, height = s.viewbox.width, s.viewbox.height
+                elif tag == SVG_TAG_GROUP:
+                    s = Group(values)
+                    s.render(ppi=ppi, width=width, height=height)
+                    label = self.get_tag_label(s)
+                    if label == "regmarks" or s.id == "regmarks":
+                        raise StreamUnsupported
+                    context_node = self._parse_group(
+                        s, s.id, label, context_node, e_list
+                    )
+                elif tag == SVG_TAG_DEFS:
+                    context_node = None
+                elif tag == SVG_TAG_PATH and self._stream_path(
+                    values, ppi, width, height, context_node, e_list
+                ):
+                    pass
+                elif tag in SVG_STREAM_SHAPE_TAGS:
+                    try:
+                        if tag == SVG_TAG_PATH:
+                            s = Path(values, pathd_loaded=True)
+                            s.parse(values.get(SVG_ATTR_DATA))
+                        else:
+                            s = SVG_STREAM_SHAPE_TAGS[tag](values)
+                    except ValueError:
+                        continue
+                    s.render(ppi=ppi, width=width, height=height)
+                    if not s.is_degenerate():
+                        self.parse(s, context_node, e_list, branch="elements")
+            else:
+                if tag in (SVG_TAG_TEXT, SVG_TAG_TSPAN) and context_node is not None:
+                    display = values.get(SVG_ATTR_DISPLAY, "").lower()
+                    if display != SVG_VALUE_NONE:
+                        s = SVGText(values, text=elem.text)
+                        s.render(ppi=ppi, width=width, height=height)
+                        self.parse(s, context_node, e_list, branch="elements")
+                context_node, values = stack.pop()
+                # Release the processed element.
+                open_elements.pop()
+                elem.clear()
+                if open_elements:
+                    parent = open_elements[-1]
+                    if len(parent) and parent[0] is elem:
+                        del parent[0]
+
+    def _stream_path(self, values, ppi, width, height, context_node, e_list):
+        """
+        Adds a streamed path whose path data the fast Geomstr parser reads, without building svgelements segments.
+        Paths which might be dots are left to parse().
+
+        @return: whether the path was added
+        """
+        try:
+            geometry = Geomstr.path_d(values.get(SVG_ATTR_DATA) or "", arc_error=0.1)
+        except ValueError:
+            return False
+        if geometry.index < 2:
+            return False
+        s = Path(values, pathd_loaded=True)
+        s.render(ppi=ppi, width=width, height=height)
+        lock = values.get("lock") == "True"
+        self._parse_path(
+            s, s.id, self.get_tag_label(s), lock, context_node, e_list, geometry
+        )
+        return True
+
+    @staticmethod
+    def _stream_values(values, tag, attrib):
+        """
+        Values of an svg element with the given attributes within a parent of the given values. These are the values
+        SVG.parse() gives the element, as there are no styles sheets in a streamed file.
+
+        @param values: values of the parent
+        @param tag: svg tag
+        @param attrib: xml attributes of the element
+        @return: values of the element
+        """
+        values = dict(values)
+        for key in (
+            SVG_ATTR_PRESERVEASPECTRATIO,
+            SVG_ATTR_VIEWBOX,
+            SVG_ATTR_ID,
+            SVG_ATTR_CLASS,
+            SVG_ATTR_CLIP_PATH,
+        ):
+            if key in values:
+                del values[key]
+        attributes = dict(attrib)
+        attributes[SVG_ATTR_TAG] = tag
+        if SVG_ATTR_STYLE in attributes:
+            for equate in attributes[SVG_ATTR_STYLE].split(";"):
+                equal_item = equate.split(":")
+                if len(equal_item) == 2:
+                    attributes[str(equal_item[0]).strip()] = str(equal_item[1]).strip()
+        for key in (SVG_ATTR_FILL, SVG_ATTR_STROKE):
+            if attributes.get(key) == SVG_VALUE_CURRENT_COLOR:
+                if SVG_ATTR_COLOR in attributes:
+                    attributes[key] = attributes[SVG_ATTR_COLOR]
+                else:
+                    attributes[key] = values[SVG_ATTR_COLOR]
+        if SVG_ATTR_TRANSFORM in attributes and SVG_ATTR_TRANSFORM in values:
+            attributes[SVG_ATTR_TRANSFORM] = (
+                values[SVG_ATTR_TRANSFORM] + " " + attributes[SVG_ATTR_TRANSFORM]
+            )
+        values.update(attributes)
+        values[SVG_STRUCT_ATTRIB] = attributes
+        return values
+
     def check_for_mk_path_attributes(self, node, element):
         """
         Checks for some mk special parameters starting with mk. Especially mkparam, and uses this property to fill in
@@ -907,7 +1196,9 @@ class SVGProcessor:
         )
         e_list.append(node)
 
-    def _parse_path(self, element, ident, label, lock, context_node, e_list):
+    def _parse_path(
+        self, element, ident, label, lock, context_node, e_list, geometry=None
+    ):
         """
         Parses an SVG Path object.
 
@@ -920,6 +1211,7 @@ class SVGProcessor:
         @param lock:
         @param context_node:
         @param e_list:
+        @param geometry: geometry of the path, if already parsed
         @return:
         """
         if len(element) < 0:
@@ -936,10 +1228,20 @@ class SVGProcessor:
             pass
         if element.values.get("type") == "elem line":
             pass
-        element.approximate_arcs_with_cubics()
-        node = context_node.add(
-            path=element, type="elem path", id=ident, label=label, lock=lock
-        )
+        if geometry is None:
+            element.approximate_arcs_with_cubics()
+            node = context_node.add(
+                path=element, type="elem path", id=ident, label=label, lock=lock
+            )
+        else:
+            node = context_node.add(
+                path=element,
+                geometry=geometry,
+                type="elem path",
+                id=ident,
+                label=label,
+                lock=lock,
+            )
         self.check_for_line_attributes(node, element)
         self.check_for_fill_attributes(node, element)
         self.check_for_mk_path_attributes(node, element)
@@ -1319,6 +1621,34 @@ class SVGProcessor:
             elem.id = node_id
             e_list.append(elem)
 
+    def _parse_group(self, element, ident, label, context_node, e_list):
+        """
+        Parses an SVG Group object into a node of the group type given by the attributes, `group` by default. The
+        children of the group are not parsed.
+
+        @param element:
+        @param ident:
+        @param label:
+        @param context_node:
+        @param e_list:
+        @return: group node
+        """
+        e_dict = dict(element.values["attributes"])
+        e_type = e_dict.get("type", "group")
+        if "stroke" in e_dict:
+            e_dict["stroke"] = Color(e_dict.get("stroke"))
+        if "fill" in e_dict:
+            e_dict["fill"] = Color(e_dict.get("fill"))
+        for attr in ("type", "id", "label"):
+            if attr in e_dict:
+                del e_dict[attr]
+        node = context_node.add(type=e_type, id=ident, label=label, **e_dict)
+        node._ref_load = element.values.get("references")
+        e_list.append(node)
+        if hasattr(node, "validate"):
+            node.validate()
+        return node
+
     def parse(self, element, context_node, e_list, branch=None, uselabel=None):
         """
         Parse does the bulk of the work. Given an element, here the base case is an SVG itself, we parse such that
@@ -1427,20 +1757,9 @@ class SVGProcessor:
                     branch="operations",
                 )
                 return
-            if "stroke" in e_dict:
-                e_dict["stroke"] = Color(e_dict.get("stroke"))
-            if "fill" in e_dict:
-                e_dict["fill"] = Color(e_dict.get("fill"))
-            for attr in ("type", "id", "label"):
-                if attr in e_dict:
-                    del e_dict[attr]
-            context_node = context_node.add(
-                type=e_type, id=ident, label=_label, **e_dict
+            context_node = self._parse_group(
+                element, ident, _label, context_node, e_list
             )
-            context_node._ref_load = element.values.get("references")
-            e_list.append(context_node)
-            if hasattr(context_node, "validate"):
-                context_node.validate()
 
             # recurse to children
             if self.reverse:
@@ -1477,41 +1796,14 @@ class SVGLoader:
 
     @staticmethod
     def load(context, elements_service, pathname, **kwargs):
-        if "svg_ppi" in kwargs:
-            ppi = float(kwargs["svg_ppi"])
-        else:
-            ppi = DEFAULT_PPI
-        if ppi == 0:
-            ppi = DEFAULT_PPI
-        scale_factor = NATIVE_UNIT_PER_INCH / ppi
-        source = pathname
-        if pathname.lower().endswith("svgz"):
-            source = gzip.open(pathname, "rb")
-        try:
-            if context.elements.svg_viewport_bed:
-                width = Length(amount=context.device.view.unit_width).length_mm
-                height = Length(amount=context.device.view.unit_height).length_mm
-            else:
-                width = None
-                height = None
-            # The color attribute of SVG.parse decides which default color
-            # a stroke / fill will get if the attribute "currentColor" is
-            # set - we opt for "black"
-            svg = SVG.parse(
-                source=source,
-                reify=False,
-                width=width,
-                height=height,
-                ppi=ppi,
-                color="black",
-                parse_display_none=True,
-                transform=f"scale({scale_factor})",
-            )
-        except ParseError as e:
-            raise BadFileError(str(e)) from e
-        svg_processor = SVGProcessor(elements_service, True)
-        svg_processor.process(svg, pathname)
-        return True
+        return load_svg(
+            context,
+            elements_service,
+            pathname,
+            load_operations=True,
+            parse_display_none=True,
+            **kwargs,
+        )
 
 
 class SVGLoaderPlain:
@@ -1525,37 +1817,80 @@ class SVGLoaderPlain:
 
     @staticmethod
     def load(context, elements_service, pathname, **kwargs):
-        if "svg_ppi" in kwargs:
-            ppi = float(kwargs["svg_ppi"])
-        else:
-            ppi = DEFAULT_PPI
-        if ppi == 0:
-            ppi = DEFAULT_PPI
-        scale_factor = NATIVE_UNIT_PER_INCH / ppi
-        source = pathname
+        return load_svg(
+            context,
+            elements_service,
+            pathname,
+            load_operations=False,
+            parse_display_none=False,
+            **kwargs,
+        )
+
+
+def load_svg(
+    context,
+    elements_service,
+    pathname,
+    load_operations=True,
+    parse_display_none=False,
+    **kwargs,
+):
+    """
+    Loads the svg file. The file is streamed if possible, else it is parsed as a whole with SVG.parse() and then
+    processed.
+
+    @param context:
+    @param elements_service:
+    @param pathname:
+    @param load_operations: load the operations stored in the file
+    @param parse_display_none: load elements which are not displayed, as regmarks
+    @return:
+    """
+    if "svg_ppi" in kwargs:
+        ppi = float(kwargs["svg_ppi"])
+    else:
+        ppi = DEFAULT_PPI
+    if ppi == 0:
+        ppi = DEFAULT_PPI
+    scale_factor = NATIVE_UNIT_PER_INCH / ppi
+    if context.elements.svg_viewport_bed:
+        width = Length(amount=context.device.view.unit_width).length_mm
+        height = Length(amount=context.device.view.unit_height).length_mm
+    else:
+        width = None
+        height = None
+
+    def open_source():
         if pathname.lower().endswith("svgz"):
-            source = gzip.open(pathname, "rb")
-        try:
-            if context.elements.svg_viewport_bed:
-                width = Length(amount=context.device.view.unit_width).length_mm
-                height = Length(amount=context.device.view.unit_height).length_mm
-            else:
-                width = None
-                height = None
-            # The color attribute of SVG.parse decides which default color
-            # a stroke / fill will get if the attribute "currentColor" is
-            # set - we opt for "black"
-            svg = SVG.parse(
-                source=source,
-                reify=False,
-                width=width,
-                height=height,
-                ppi=ppi,
-                color="black",
-                transform=f"scale({scale_factor})",
-            )
-        except ParseError as e:
-            raise BadFileError(str(e)) from e
-        svg_processor = SVGProcessor(elements_service, False)
-        svg_processor.process(svg, pathname)
-        return True
+            return gzip.open(pathname, "rb")
+        return pathname
+
+    # The color attribute decides which default color a stroke / fill will
+    # get if the attribute "currentColor" is set - we opt for "black"
+    parameters = dict(
+        ppi=ppi,
+        width=width,
+        height=height,
+        color="black",
+        transform=f"scale({scale_factor})",
+        parse_display_none=parse_display_none,
+    )
+    source = open_source()
+    try:
+        svg_processor = SVGProcessor(elements_service, load_operations)
+        if svg_processor.process_stream(source, pathname, **parameters):
+            return True
+    finally:
+        if source is not pathname:
+            source.close()
+    source = open_source()
+    try:
+        svg = SVG.parse(source=source, reify=False, **parameters)
+    except ParseError as e:
+        raise BadFileError(str(e)) from e
+    finally:
+        if source is not pathname:
+            source.close()
+    svg_processor = SVGProcessor(elements_service, load_operations)
+    svg_processor.process(svg, pathname)
+    return True
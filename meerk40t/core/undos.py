@@ -4,14 +4,105 @@ Undo States
 The undo class centralizes the undo stack and related commands. It's passed the
 rootnode of the tree and can perform marks to save the current tree states and will
 execute undo and redo operations for the tree.
+
+Undo states share their node copies. A mark only copies the nodes which were changed
+since the previous mark, as notified by the tree or found by comparing the node with
+its copy. All other nodes reuse the copy made for an earlier state. The stack is limited
+to a number of states and an estimated memory size, dropping the oldest states first.
 """
 import threading
+from copy import copy
+
+import numpy as np
+
+from meerk40t.tools.geomstr import Geomstr
+
+
+def node_bytes(node) -> int:
+    """
+    Estimated memory size of the data of a node.
+
+    @param node: node to estimate
+    @return: size in bytes
+    """
+    size = 256
+    for v in node.node_dict.values():
+        if isinstance(v, (str, bytes)):
+            size += len(v)
+        elif hasattr(v, "nbytes"):
+            size += v.nbytes
+        elif hasattr(v, "segments") and hasattr(v.segments, "nbytes"):
+            size += v.segments.nbytes
+        elif hasattr(v, "getbands") and hasattr(v, "size"):
+            width, height = v.size
+            size += width * height * len(v.getbands())
+    return size
+
+
+def node_values(node, node_copy) -> dict:
+    """
+    Values of the node when it was copied, to find whether the copy is still current. Dicts and lists are copied as
+    they are in the node, since copying the node may convert their values. Other objects, which may be changed in
+    place, are compared with their copies.
+
+    @param node: node of the tree
+    @param node_copy: copy made of the node
+    @return: values by attribute name
+    """
+    copied = node_copy.node_dict
+    values = {}
+    for key, value in node.node_dict.items():
+        if isinstance(value, dict):
+            values[key] = dict(value)
+        elif isinstance(value, list):
+            values[key] = list(value)
+        elif value is None or isinstance(value, (bool, int, float, str, tuple)):
+            values[key] = value
+        else:
+            values[key] = copied.get(key, value)
+    return values
+
+
+def node_current(node, values) -> bool:
+    """
+    Whether the node still has the values it was copied with. Properties are often set without notifying the tree,
+    so a copy is only reused if the node is unchanged.
+
+    @param node: node of the tree
+    @param values: values of the node when copied, see node_values()
+    @return: True if the node is unchanged
+    """
+    current = node.node_dict
+    if current.keys() != values.keys():
+        return False
+    for key, value in current.items():
+        other = values[key]
+        if value is other:
+            continue
+        if type(value) is not type(other):
+            return False
+        if isinstance(value, Geomstr):
+            if value.index != other.index or not np.array_equal(
+                value.segments[: value.index],
+                other.segments[: other.index],
+                equal_nan=True,
+            ):
+                return False
+            continue
+        try:
+            if not value == other:
+                return False
+        except (TypeError, ValueError):
+            # Values such as arrays have no single truth value.
+            return False
+    return True
 
 
 class UndoState:
-    def __init__(self, state, message=None):
+    def __init__(self, state, message=None, copies=None):
         self.state = state
         self.message = message
+        self.copies = copies if copies is not None else ()
         if self.message is None:
             self.message = str(id(state))
 
@@ -20,18 +111,167 @@ class UndoState:
 
 
 class Undo:
-    def __init__(self, service, tree):
+    def __init__(self, service, tree, levels=0, memory=0):
         self.service = service
         self.tree = tree
+        # Limits of the stack, 0 for no limit. If not set the service undo_levels and undo_memory (MB) are used.
+        self.levels = levels
+        self.memory = memory
         self._lock = threading.Lock()
         self._undo_stack = []
         self._undo_index = -1
+        # Node copies, with the values they were copied from, by id of the tree node. Dropped when the node is changed.
+        self._copies = {}
+        # Reference count and estimated size of the node copies held by the stack, by id of the copy.
+        self._copy_refs = {}
+        self._memory = 0
+        self.tree.listen(self)
         self.mark("init")  # Set initial tree state.
         self.message = None
 
     def __str__(self):
         return f"Undo(#{self._undo_index} in list of {len(self._undo_stack)} states)"
 
+    # ==========
+    # TREE LISTENER
+    # ==========
+
+    def _changed(self, node=None, *args, **kwargs):
+        if node is not None:
+            self._copies.pop(id(node), None)
+
+    node_changed = _changed
+    modified = _changed
+    altered = _changed
+    translated = _changed
+    scaled = _changed
+    update = _changed
+
+    # ==========
+    # STATES
+    # ==========
+
+    def _snapshot(self):
+        """
+        Snapshot of the tree. Branches are nested lists of (copy, children, reference), where reference is the
+        position of the referenced node in the depth-first order of the snapshot.
+
+        @return: snapshot branches, node copies used
+        """
+        positions = {}
+        stack = list(reversed(self.tree._children))
+        while stack:
+            node = stack.pop()
+            positions[id(node)] = len(positions)
+            stack.extend(reversed(node._children))
+
+        old_copies = self._copies
+        copies = {}
+
+        def build(node):
+            entries = []
+            for c in node._children:
+                cached = old_copies.get(id(c))
+                if (
+                    cached is None
+                    or cached[0] is not c
+                    or not node_current(c, cached[2])
+                ):
+                    node_copy = copy(c)
+                    node_copy._root = self.tree._root
+                    cached = (c, node_copy, node_values(c, node_copy))
+                else:
+                    node_copy = cached[1]
+                copies[id(c)] = cached
+                reference = None
+                if c.type == "reference":
+                    reference = positions[id(c.node)]
+                entries.append((node_copy, build(c), reference))
+            return entries
+
+        state = build(self.tree)
+        self._copies = copies
+        return state, [cached[1] for cached in copies.values()]
+
+    def _restore(self, state):
+        """
+        Restores the tree to the given snapshot. The tree is given new copies of the snapshot nodes, the snapshot
+        itself is unchanged.
+        """
+        tree = self.tree
+        order = []
+
+        def build(entries, parent):
+            nodes = []
+            for node_copy, children, reference in entries:
+                node = copy(node_copy)
+                node._root = tree._root
+                node._parent = parent
+                order.append((node, node_copy, reference))
+                node._children.extend(build(children, node))
+                nodes.append(node)
+            return nodes
+
+        branches = build(state, tree)
+        for node, node_copy, reference in order:
+            if reference is not None:
+                referenced = order[reference][0]
+                node.node = referenced
+                referenced._references.append(node)
+        tree.restore_tree(branches)
+        self._copies = {
+            id(node): (node, node_copy, node_values(node, node_copy))
+            for node, node_copy, r in order
+        }
+
+    def _hold(self, undo_state):
+        for node_copy in undo_state.copies:
+            refs = self._copy_refs.get(id(node_copy))
+            if refs is None:
+                size = node_bytes(node_copy)
+                self._copy_refs[id(node_copy)] = [1, size]
+                self._memory += size
+            else:
+                refs[0] += 1
+
+    def _release(self, undo_state):
+        for node_copy in undo_state.copies:
+            refs = self._copy_refs[id(node_copy)]
+            refs[0] -= 1
+            if refs[0] == 0:
+                del self._copy_refs[id(node_copy)]
+                self._memory -= refs[1]
+
+    def _limit(self):
+        """
+        Drops the oldest states until the stack is within its limits. The current state is always kept.
+        """
+        levels = self.levels or getattr(self.service, "undo_levels", 0)
+        memory = self.memory or getattr(self.service, "undo_memory", 0) * 0x100000
+        while self._undo_index > 0 and (
+            (levels and len(self._undo_stack) > levels)
+            or (memory and self._memory > memory)
+        ):
+            self._release(self._undo_stack.pop(0))
+            self._undo_index -= 1
+
+    def snapshot(self):
+        """
+        Snapshot of the current tree, sharing the node copies of the undo states. The snapshot is not an undo state,
+        and must not be changed.
+
+        @return: snapshot branches, see _snapshot()
+        """
+        with self._lock:
+            return self._snapshot()[0]
+
+    @property
+    def memory_used(self) -> int:
+        """
+        Estimated memory size of the node copies held by the undo stack.
+        """
+        return self._memory
+
     def mark(self, message=None):
         """
         Marks an undo state require a backup the tree information.
@@ -45,23 +285,23 @@ class Undo:
             if message is None:
                 message = self.message
             try:
-                self._undo_stack.insert(
-                    self._undo_index,
-                    UndoState(self.tree.backup_tree(), message=message),
-                )
+                state, copies = self._snapshot()
+                undo_state = UndoState(state, message=message, copies=copies)
+                self._hold(undo_state)
+                self._undo_stack.insert(self._undo_index, undo_state)
             except KeyError:
                 # Hit a concurrent issue.
                 pass
+            for undo_state in self._undo_stack[self._undo_index + 1 :]:
+                self._release(undo_state)
             del self._undo_stack[self._undo_index + 1 :]
+            self._limit()
             self.message = None
         self.service.signal("undoredo")
 
     def undo(self):
         """
         Performs an undo operation restoring the tree state.
-
-        Note: because the undo.state is used directly, the UndoState's state must be
-        given a fresh copy.
         @return:
         """
         with self._lock:
@@ -78,11 +318,7 @@ class Undo:
                 # Invalid? Reset to bottom of stack
                 self._undo_index = 0
                 return False
-            self.tree.restore_tree(undo.state)
-            try:
-                undo.state = self.tree.backup_tree()  # Get unused copy
-            except KeyError:
-                pass
+            self._restore(undo.state)
             self.service.signal("undoredo")
             return True
 
@@ -100,11 +336,7 @@ class Undo:
                 # Invalid? Reset to top of stack
                 self._undo_index = len(self._undo_stack)
                 return False
-            self.tree.restore_tree(redo.state)
-            try:
-                redo.state = self.tree.backup_tree()  # Get unused copy
-            except KeyError:
-                pass
+            self._restore(redo.state)
             self.service.signal("undoredo")
             return True
 
@@ -1,10 +1,24 @@
+"""
+Dxf loading.
+
+Splines, hatches and polylines with arcs are the most expensive entities to convert. Their geometry is extracted as
+plain data, the primitives, which are converted to geometry in worker processes when there are many of them. The
+nodes are then created in the order of the entities, in the loading thread.
+"""
+
+import math
+import multiprocessing
 import os.path
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
 import ezdxf
 from ezdxf import units
+from ezdxf.math import BSpline, ConstructionEllipse, cubic_bezier_from_ellipse
 
 from ..core.exceptions import BadFileError
 from ..core.units import UNITS_PER_INCH, UNITS_PER_MM
+from ..tools.geomstr import Geomstr
 
 try:
     # ezdxf <= 0.6.14
@@ -16,12 +30,16 @@ except ImportError:
 
 from ezdxf.units import decode
 
+try:
+    from ezdxf.math import fit_points_to_cad_cv
+except ImportError:
+    # ezdxf < 0.16, splines of fit points are interpolated when extracted.
+    fit_points_to_cad_cv = None
+
 from ..svgelements import (
     SVG_ATTR_VECTOR_EFFECT,
     SVG_VALUE_NON_SCALING_STROKE,
     Angle,
-    Arc,
-    Circle,
     Color,
     Ellipse,
     Matrix,
@@ -33,6 +51,176 @@ from ..svgelements import (
     Viewbox,
 )
 
+# Least number of primitives converted in worker processes, fewer are converted faster than the processes start.
+PARALLEL_MINIMUM = 10000
+
+
+def _point(p):
+    return complex(p[0], p[1])
+
+
+def _arc(geometry, center, radius, start_angle, end_angle, ccw=True):
+    """
+    Adds the counterclockwise arc from start_angle to end_angle, in degrees. The arc is reversed if not ccw.
+    """
+    start_angle = math.radians(start_angle)
+    sweep = math.radians(end_angle) - start_angle
+    sweep %= math.tau
+    if sweep == 0:
+        sweep = math.tau
+    center = _point(center)
+    # Arcs are given by a point on the arc, which must be between the end points.
+    count = 1 if sweep <= math.pi else 2
+    points = [
+        center + radius * complex(math.cos(a), math.sin(a))
+        for a in (start_angle + sweep * i / (2 * count) for i in range(2 * count + 1))
+    ]
+    if not ccw:
+        points.reverse()
+    for i in range(0, 2 * count, 2):
+        geometry.arc(*points[i : i + 3])
+
+
+def _ellipse(geometry, center, major_axis, ratio, start_param, end_param, ccw=True):
+    ellipse = ConstructionEllipse(
+        center=(center[0], center[1], 0),
+        major_axis=(major_axis[0], major_axis[1], 0),
+        ratio=ratio,
+        start_param=start_param,
+        end_param=end_param,
+    )
+    curves = [
+        [_point(p) for p in bezier.control_points]
+        for bezier in cubic_bezier_from_ellipse(ellipse)
+    ]
+    if not ccw:
+        curves = [list(reversed(points)) for points in reversed(curves)]
+    for points in curves:
+        geometry.cubic(*points)
+
+
+def _spline(geometry, spline):
+    if spline.order <= 4:
+        try:
+            for bezier in spline.bezier_decomposition():
+                points = [_point(p) for p in bezier]
+                if len(points) == 4:
+                    geometry.cubic(*points)
+                elif len(points) == 3:
+                    geometry.quad(*points)
+                else:
+                    geometry.line(*points)
+            return
+        except (TypeError, ValueError):
+            # Rational b-splines are not decomposed.
+            pass
+    try:
+        # Flattening version 0.15
+        geometry.polyline([_point(p) for p in spline.flattening(1, 15)])
+    except AttributeError:
+        # Version before 0.15
+        for bezier in spline.cubic_bezier_approximation(4):
+            geometry.cubic(*[_point(p) for p in bezier.control_points])
+
+
+def _polyline(geometry, vertices, closed):
+    """
+    Adds the polyline of the (x, y, bulge) vertices. The bulge is the tangent of a quarter of the angle of the arc to
+    the next vertex, positive for counterclockwise arcs.
+    """
+    count = len(vertices)
+    for i in range(count if closed else count - 1):
+        x, y, bulge = vertices[i]
+        start = complex(x, y)
+        end = _point(vertices[(i + 1) % count])
+        if start == end:
+            continue
+        if bulge == 0:
+            geometry.line(start, end)
+        else:
+            # The middle of the arc is the sagitta away from the middle of the chord.
+            geometry.arc(start, (start + end) / 2 - 0.5j * bulge * (end - start), end)
+
+
+def _add_primitive(geometry, primitive):
+    kind = primitive[0]
+    if kind == "line":
+        geometry.line(_point(primitive[1]), _point(primitive[2]))
+    elif kind == "arc":
+        _arc(geometry, *primitive[1:])
+    elif kind == "ellipse":
+        _ellipse(geometry, *primitive[1:])
+    elif kind == "spline":
+        control_points, order, knots, weights = primitive[1:]
+        _spline(geometry, BSpline(control_points, order, knots, weights or None))
+    elif kind == "fit spline":
+        fit_points, tangents = primitive[1:]
+        _spline(geometry, fit_points_to_cad_cv(fit_points, tangents=tangents))
+    elif kind == "polyline":
+        _polyline(geometry, *primitive[1:])
+    elif kind == "path":
+        closed, parts = primitive[1:]
+        start = geometry.index
+        for part in parts:
+            _add_primitive(geometry, part)
+        if closed and geometry.index > start:
+            geometry.close()
+    elif kind == "paths":
+        for part in primitive[1]:
+            if geometry.index:
+                geometry.end()
+            _add_primitive(geometry, part)
+
+
+def convert_primitive(primitive):
+    """
+    Geometry of a primitive, given by DXFProcessor.primitive(). Primitives are nested tuples of a kind and its values:
+
+    ("line", start, end)
+    ("arc", center, radius, start_angle, end_angle, ccw)
+    ("ellipse", center, major_axis, ratio, start_param, end_param, ccw)
+    ("spline", control_points, order, knots, weights)
+    ("fit spline", fit_points, tangents)
+    ("polyline", [(x, y, bulge), ...], closed)
+    ("path", closed, [primitive, ...])
+    ("paths", [primitive, ...])
+
+    @param primitive: primitive to convert
+    @return: segments of the geometry
+    """
+    geometry = Geomstr()
+    _add_primitive(geometry, primitive)
+    return geometry.segments[: geometry.index]
+
+
+def convert_primitives(primitives, processes=None):
+    """
+    Geometries of the primitives, in order. The primitives are converted in worker processes if there are enough of
+    them to be worth starting the processes, and in this process if worker processes can't be started.
+
+    @param primitives: primitives, see convert_primitive()
+    @param processes: number of worker processes, None for one per cpu if there are enough primitives.
+    @return: list of segments
+    """
+    if processes is None:
+        processes = (os.cpu_count() or 1) if len(primitives) >= PARALLEL_MINIMUM else 1
+    # Frozen applications would start the application itself as worker process.
+    if processes > 1 and not getattr(sys, "frozen", False):
+        try:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(processes, mp_context=context) as pool:
+                return list(
+                    pool.map(
+                        convert_primitive,
+                        primitives,
+                        chunksize=max(1, len(primitives) // (processes * 4)),
+                    )
+                )
+        except (OSError, RuntimeError, NotImplementedError, ImportError):
+            # Worker processes can't be started, or were terminated.
+            pass
+    return [convert_primitive(primitive) for primitive in primitives]
+
 
 class DxfLoader:
     @staticmethod
@@ -83,17 +271,22 @@ class DXFProcessor:
         self.try_unsupported = True
         # Path stroke width
         self.std_stroke = 1000
+        # Converted geometries and virtual entities of inserts, by id of the entity.
+        self.geometries = {}
+        self.virtual = {}
 
     def process(self, entities, pathname):
         self.pathname = pathname
         # basename = os.path.basename(pathname)
+        self.try_unsupported = self.elements.setting(bool, "dxf_try_unsupported", True)
         context_node = self.elements.get(type="branch elems")
         file_node = context_node.add(type="file", filepath=pathname)
         file_node.focus()
+        entities = list(entities)
+        self.prepare(entities)
         for entity in entities:
             self.parse(entity, file_node, self.elements_list)
         dxf_center = self.elements.setting(bool, "dxf_center", True)
-        self.try_unsupported = self.elements.setting(bool, "dxf_try_unsupported", True)
         if dxf_center:
             bbox = file_node.bounds
             if bbox is not None:
@@ -132,6 +325,162 @@ class DXFProcessor:
             self.elements.classify(self.elements_list)
         return True
 
+    def prepare(self, entities):
+        """
+        Converts the geometries of the entities which have a primitive, see primitive(). They are converted together,
+        in worker processes if there are many. Entities which weren't prepared are converted when parsed.
+        """
+        prepared = []
+        primitives = []
+
+        def collect(entities):
+            for entity in entities:
+                if entity is None or hasattr(entity, "transform_to_wcs"):
+                    # Entities transformed to world coordinates are converted once transformed, when parsed.
+                    continue
+                if entity.dxftype() == "INSERT":
+                    collect(self.virtual_entities(entity))
+                    continue
+                primitive = self.primitive(entity)
+                if primitive is not None:
+                    prepared.append(entity)
+                    primitives.append(primitive)
+
+        collect(entities)
+        for entity, segments in zip(prepared, convert_primitives(primitives)):
+            self.geometries[id(entity)] = (entity, segments)
+
+    def virtual_entities(self, entity):
+        """
+        Virtual entities of the insert, which are created once.
+        """
+        virtual = self.virtual.get(id(entity))
+        if virtual is None:
+            virtual = (entity, list(entity.virtual_entities()))
+            self.virtual[id(entity)] = virtual
+        return virtual[1]
+
+    def primitive(self, entity):
+        """
+        Plain data of the geometry of splines, hatches and polylines with arcs, see convert_primitive(). Primitives are
+        made of tuples, lists and numbers, so they can be sent to worker processes.
+
+        @param entity: dxf entity
+        @return: primitive, None if the entity is not converted from a primitive
+        """
+        dxftype = entity.dxftype()
+        if dxftype == "SPLINE":
+            return ("path", entity.closed, [self.spline_primitive(entity)])
+        if dxftype == "LWPOLYLINE":
+            if not entity.has_arc:
+                return None
+            return ("polyline", [(p[0], p[1], p[4]) for p in entity], entity.closed)
+        if dxftype == "POLYLINE":
+            if not entity.has_arc or not (
+                entity.is_2d_polyline or self.try_unsupported
+            ):
+                return None
+            vertices = [
+                (e.dxf.location[0], e.dxf.location[1], e.dxf.bulge) for e in entity
+            ]
+            return ("polyline", vertices, entity.is_closed)
+        if dxftype == "HATCH":
+            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html
+            boundaries = []
+            for p in entity.paths:
+                if p.path_type_flags & 2:
+                    vertices = [
+                        (v[0], v[1], v[2] if len(v) > 2 else 0) for v in p.vertices
+                    ]
+                    boundaries.append(("polyline", vertices, p.is_closed))
+                    continue
+                edges = []
+                for e in p.edges:
+                    if e.EDGE_TYPE == "LineEdge":
+                        edges.append(("line", tuple(e.start), tuple(e.end)))
+                    elif e.EDGE_TYPE == "ArcEdge":
+                        edges.append(
+                            (
+                                "arc",
+                                tuple(e.center),
+                                e.radius,
+                                e.start_angle,
+                                e.end_angle,
+                                e.ccw,
+                            )
+                        )
+                    elif e.EDGE_TYPE == "EllipseEdge":
+                        edges.append(
+                            (
+                                "ellipse",
+                                tuple(e.center),
+                                tuple(e.major_axis),
+                                e.ratio,
+                                e.start_param,
+                                e.end_param,
+                                e.ccw,
+                            )
+                        )
+                    elif e.EDGE_TYPE == "SplineEdge" and len(e.control_points):
+                        edges.append(self.spline_primitive(e))
+                boundaries.append(("path", True, edges))
+            return ("paths", boundaries)
+        return None
+
+    @staticmethod
+    def spline_primitive(entity):
+        """
+        Primitive of a spline entity or hatch spline edge.
+        """
+        if (
+            fit_points_to_cad_cv is not None
+            and hasattr(entity, "fit_point_count")
+            and not entity.control_point_count()
+            and entity.fit_point_count()
+        ):
+            # Same as the construction tool, the fit points are interpolated when converted.
+            tangents = None
+            if entity.dxf.hasattr("start_tangent") and entity.dxf.hasattr(
+                "end_tangent"
+            ):
+                tangents = [
+                    tuple(entity.dxf.start_tangent),
+                    tuple(entity.dxf.end_tangent),
+                ]
+            return ("fit spline", [tuple(p) for p in entity.fit_points], tangents)
+        spline = entity.construction_tool()
+        return (
+            "spline",
+            [(p[0], p[1]) for p in spline.control_points],
+            spline.order,
+            list(spline.knots()),
+            list(spline.weights()),
+        )
+
+    def add_geometry(self, entity, context_node, e_list, **kwargs):
+        """
+        Adds the path node of an entity which has a primitive, with its geometry converted by prepare() if it was
+        prepared.
+        """
+        prepared = self.geometries.pop(id(entity), None)
+        if prepared is not None:
+            segments = prepared[1]
+        else:
+            segments = convert_primitive(self.primitive(entity))
+        geometry = Geomstr(segments)
+        matrix = Matrix.scale(self.scale, -self.scale)
+        matrix.post_translate_y(self.elements.device.view.unit_height)
+        geometry.transform(matrix)
+        node = context_node.add(
+            geometry=geometry,
+            type="elem path",
+            stroke_scale=False,
+            stroke_width=self.std_stroke,
+            **kwargs,
+        )
+        self.check_for_attributes(node, entity)
+        e_list.append(node)
+
     def check_for_attributes(self, node, entity):
         dxf = self.dxf
         if entity.rgb is not None:
@@ -292,49 +641,7 @@ class DXFProcessor:
                     e_list.append(node)
                     return
                 else:
-                    element = Path()
-                    bulge = 0
-                    for idx, e in enumerate(entity):
-                        point = e.dxf.location
-                        if bulge == 0:
-                            element.line((point[0], point[1]))
-                        else:
-                            element += Arc(
-                                start=element.current_point,
-                                end=(point[0], point[1]),
-                                bulge=bulge,
-                            )
-                        bulge = e.dxf.bulge
-                    if entity.is_closed:
-                        if bulge == 0:
-                            element.closed()
-                        else:
-                            element += Arc(
-                                start=element.current_point,
-                                end=element.z_point,
-                                bulge=bulge,
-                            )
-                            element.closed()
-                    element.values[
-                        SVG_ATTR_VECTOR_EFFECT
-                    ] = SVG_VALUE_NON_SCALING_STROKE
-                    element.transform.post_scale(self.scale, -self.scale)
-                    element.transform.post_translate_y(
-                        self.elements.device.view.unit_height
-                    )
-                    path = abs(Path(element))
-                    if len(path) != 0:
-                        if not isinstance(path[0], Move):
-                            path = Move(path.first_point) + path
-                        path.approximate_arcs_with_cubics()
-                    node = context_node.add(
-                        path=path,
-                        type="elem path",
-                        stroke_scale=False,
-                        stroke_width=self.std_stroke,
-                    )
-                    self.check_for_attributes(node, entity)
-                    e_list.append(node)
+                    self.add_geometry(entity, context_node, e_list)
                     return
         elif entity.dxftype() == "LWPOLYLINE":
             # https://ezdxf.readthedocs.io/en/stable/dxfentities/lwpolyline.html
@@ -358,111 +665,14 @@ class DXFProcessor:
                 e_list.append(node)
                 return
             else:
-                element = Path()
-                bulge = 0
-                for e in entity:
-                    if bulge == 0:
-                        element.line((e[0], e[1]))
-                    else:
-                        element += Arc(
-                            start=element.current_point, end=(e[0], e[1]), bulge=bulge
-                        )
-                    bulge = e[4]
-                if entity.closed:
-                    if bulge == 0:
-                        element.closed()
-                    else:
-                        element += Arc(
-                            start=element.current_point,
-                            end=element.z_point,
-                            bulge=bulge,
-                        )
-                        element.closed()
-                element.values[SVG_ATTR_VECTOR_EFFECT] = SVG_VALUE_NON_SCALING_STROKE
-                element.transform.post_scale(self.scale, -self.scale)
-                element.transform.post_translate_y(
-                    self.elements.device.view.unit_height
-                )
-                path = abs(Path(element))
-                if len(path) != 0:
-                    if not isinstance(path[0], Move):
-                        path = Move(path.first_point) + path
-                    path.approximate_arcs_with_cubics()
-                node = context_node.add(
-                    path=path,
-                    type="elem path",
-                    stroke_scale=False,
-                    stroke_width=self.std_stroke,
-                )
-                self.check_for_attributes(node, entity)
-                e_list.append(node)
+                self.add_geometry(entity, context_node, e_list)
                 return
         elif entity.dxftype() == "HATCH":
             # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html
-            element = Path()
+            fill = None
             if entity.bgcolor is not None:
-                Path.fill = Color(*entity.bgcolor)
-            for p in entity.paths:
-                if p.path_type_flags & 2:
-                    for v in p.vertices:
-                        element.line(v[0], v[1])
-                    if p.is_closed:
-                        element.closed()
-                else:
-                    for e in p.edges:
-                        if type(e) == "LineEdge":
-                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.LineEdge
-                            element.line(e.start, e.end)
-                        elif type(e) == "ArcEdge":
-                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.ArcEdge
-                            circ = Circle(
-                                center=e.center,
-                                radius=e.radius,
-                            )
-                            element += circ.arc_angle(
-                                Angle.degrees(e.start_angle), Angle.degrees(e.end_angle)
-                            )
-                        elif type(e) == "EllipseEdge":
-                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.EllipseEdge
-                            element += Arc(
-                                radius=e.radius,
-                                start_angle=Angle.degrees(e.start_angle),
-                                end_angle=Angle.degrees(e.end_angle),
-                                ccw=e.is_counter_clockwise,
-                            )
-                        elif type(e) == "SplineEdge":
-                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.SplineEdge
-                            if e.degree == 3:
-                                for i in range(len(e.knot_values)):
-                                    control = e.control_values[i]
-                                    knot = e.knot_values[i]
-                                    element.quad(control, knot)
-                            elif e.degree == 4:
-                                for i in range(len(e.knot_values)):
-                                    control1 = e.control_values[2 * i]
-                                    control2 = e.control_values[2 * i + 1]
-                                    knot = e.knot_values[i]
-                                    element.cubic(control1, control2, knot)
-                            else:
-                                for i in range(len(e.knot_values)):
-                                    knot = e.knot_values[i]
-                                    element.line(knot)
-            element.values[SVG_ATTR_VECTOR_EFFECT] = SVG_VALUE_NON_SCALING_STROKE
-            element.transform.post_scale(self.scale, -self.scale)
-            element.transform.post_translate_y(self.elements.device.view.unit_height)
-            path = abs(Path(element))
-            if len(path) != 0:
-                if not isinstance(path[0], Move):
-                    path = Move(path.first_point) + path
-                path.approximate_arcs_with_cubics()
-            node = context_node.add(
-                path=path,
-                type="elem path",
-                stroke_scale=False,
-                stroke_width=self.std_stroke,
-            )
-            self.check_for_attributes(node, entity)
-            e_list.append(node)
+                fill = Color(*entity.bgcolor)
+            self.add_geometry(entity, context_node, e_list, fill=fill)
             return
         elif entity.dxftype() == "IMAGE":
             bottom_left_position = entity.dxf.insert
@@ -605,65 +815,12 @@ class DXFProcessor:
             e_list.append(node)
             return
         elif entity.dxftype() == "SPLINE":
-            element = Path()
-            try:
-                for b in entity.construction_tool().bezier_decomposition():
-                    if len(element) == 0:
-                        element.move((b[0][0], b[0][1]))
-                    if len(b) == 4:
-                        element.cubic(
-                            (b[1][0], b[1][1]), (b[2][0], b[2][1]), (b[3][0], b[3][1])
-                        )
-                    elif len(b) == 3:
-                        element.quad((b[1][0], b[1][1]), (b[2][0], b[2][1]))
-            except (AttributeError, TypeError):
-                # Fallback for rational b-splines.
-                try:
-                    # Flattening version 0.15
-                    for q in entity.flattening(1, 15):
-                        element.line((q[0], q[1]))
-                except AttributeError:
-                    # Version before 0.15
-                    try:
-                        for (
-                            bezier
-                        ) in entity.construction_tool().cubic_bezier_approximation(4):
-                            b = bezier.control_points
-                            if len(b) == 4:
-                                element.cubic(
-                                    (b[1][0], b[1][1]),
-                                    (b[2][0], b[2][1]),
-                                    (b[3][0], b[3][1]),
-                                )
-                            elif len(b) == 3:
-                                element.quad((b[1][0], b[1][1]), (b[2][0], b[2][1]))
-                    except (AttributeError, TypeError):
-                        # Fallback for versions of EZDXF prior to 0.13
-                        element.move(entity.control_points[0])
-                        for i in range(1, entity.dxf.n_control_points):
-                            element.line(entity.control_points[i])
-            if entity.closed:
-                element.closed()
-            element.values[SVG_ATTR_VECTOR_EFFECT] = SVG_VALUE_NON_SCALING_STROKE
-            element.transform.post_scale(self.scale, -self.scale)
-            element.transform.post_translate_y(self.elements.device.view.unit_height)
-            path = abs(element)
-            if len(path) != 0:
-                if not isinstance(path[0], Move):
-                    path = Move(path.first_point) + path
-            node = context_node.add(
-                path=path,
-                type="elem path",
-                stroke_scale=False,
-                stroke_width=self.std_stroke,
-            )
-            self.check_for_attributes(node, entity)
-            e_list.append(node)
+            self.add_geometry(entity, context_node, e_list)
             return
         elif entity.dxftype() == "INSERT":
             # Insert creates virtual grouping.
             context_node = context_node.add(type="group")
-            for e in entity.virtual_entities():
+            for e in self.virtual_entities(entity):
                 if e is None:
                     continue
                 self.parse(e, context_node, e_list)
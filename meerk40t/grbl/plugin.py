@@ -3,12 +3,7 @@ GRBL Device Plugin
 
 Registers the required files to run the GRBL device.
 """
-from meerk40t.grbl.control import GRBLControl, greet
-from meerk40t.grbl.device import GRBLDevice, GRBLDriver
-from meerk40t.grbl.emulator import GRBLEmulator
-from meerk40t.grbl.gcodejob import GcodeJob
-from meerk40t.grbl.interpreter import GRBLInterpreter
-from meerk40t.grbl.loader import GCodeLoader
+from meerk40t.kernel import LazyImport
 
 
 def plugin(kernel, lifecycle=None):
@@ -26,7 +21,9 @@ def plugin(kernel, lifecycle=None):
     elif lifecycle == "register":
         _ = kernel.translation
 
-        kernel.register("provider/device/grbl", GRBLDevice)
+        kernel.register(
+            "provider/device/grbl", LazyImport("meerk40t.grbl.device", "GRBLDevice")
+        )
         kernel.register("provider/friendly/grbl", ("GRBL-Diode-Laser", 2))
         kernel.register(
             "dev_info/grbl-generic",
@@ -175,11 +172,20 @@ def plugin(kernel, lifecycle=None):
                 ],
             },
         )
-        kernel.register("driver/grbl", GRBLDriver)
-        kernel.register("spoolerjob/grbl", GcodeJob)
-        kernel.register("interpreter/grbl", GRBLInterpreter)
-        kernel.register("emulator/grbl", GRBLEmulator)
-        kernel.register("load/GCodeLoader", GCodeLoader)
+        kernel.register("driver/grbl", LazyImport("meerk40t.grbl.device", "GRBLDriver"))
+        kernel.register(
+            "spoolerjob/grbl", LazyImport("meerk40t.grbl.gcodejob", "GcodeJob")
+        )
+        kernel.register(
+            "interpreter/grbl",
+            LazyImport("meerk40t.grbl.interpreter", "GRBLInterpreter"),
+        )
+        kernel.register(
+            "emulator/grbl", LazyImport("meerk40t.grbl.emulator", "GRBLEmulator")
+        )
+        kernel.register(
+            "load/GCodeLoader", LazyImport("meerk40t.grbl.loader", "GCodeLoader")
+        )
 
         @kernel.console_option(
             "port", "p", type=int, default=23, help=_("port to listen on.")
@@ -219,6 +225,8 @@ def plugin(kernel, lifecycle=None):
             if grblcontrol is None:
                 if quit:
                     return
+                from meerk40t.grbl.control import GRBLControl
+
                 grblcontrol = GRBLControl(root)
                 root.device.register("grblcontrol", grblcontrol)
                 grblcontrol.start(port, verbose)
@@ -235,6 +243,8 @@ def plugin(kernel, lifecycle=None):
         def server_console(command, channel, _, port=23, **kwargs):
             root = kernel.root
 
+            from meerk40t.grbl.control import greet
+
             try:
                 root.open_as("module/TCPServer", "grblmock", port=port)
                 tcp_recv_channel = root.channel("grblmock/recv", pure=True)
@@ -3,6 +3,7 @@ from wx import aui
 
 from meerk40t.core.elements.element_types import op_nodes
 
+from ..core.node.rootnode import RootNode
 from ..core.units import Length
 from ..kernel import signal_listener
 from ..svgelements import Color
@@ -686,6 +687,24 @@ class ShadowTree:
         self.node_register(node, **kwargs)
         self.register_children(node)
 
+    def nodes_added(self, nodes):
+        """
+        Notified that these nodes, with their children, have been added to the tree together. Their items are built
+        in one pass.
+        @param nodes: Nodes that were added.
+        @return:
+        """
+        frozen = self._freeze
+        self.freeze_tree(True)
+        # Items are inserted in order, each sibling before it is already registered.
+        for node, pos in RootNode.insert_order(nodes):
+            self.node_register(node, pos=pos)
+            self.register_children(node)
+        self.freeze_tree(frozen)
+        if self._freeze or self.context.elements.suppress_updates:
+            return
+        self.elements.signal("modified")
+
     def node_changed(self, node):
         """
         Notified that this node has been changed.
@@ -8,6 +8,7 @@ from .jobs import *
 from .kernel import *
 from .lifecycles import *
 from .module import *
+from .registry import LazyImport
 from .service import *
 from .settings import *
 
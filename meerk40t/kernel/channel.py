@@ -1,8 +1,10 @@
+import os
 import re
+import struct
 import threading
+import time
 from collections import deque
-from datetime import datetime
-from typing import Callable, Optional, Union
+from typing import Callable, Generator, Optional, Tuple, Union
 
 # https://en.wikipedia.org/wiki/ANSI_escape_code#3-bit_and_4-bit
 BBCODE_LIST = {
@@ -65,10 +67,93 @@ def bbcode_to_plain(text):
     return RE_ANSI.sub("", text)
 
 
+class ChannelLog:
+    """
+    Compact binary log of the messages sent to a channel, written to a rotating set of files.
+
+    Each record is a header of the time (double), the message type (0 for text, 1 for bytes) and the payload length,
+    followed by the payload. When the log file would exceed max_bytes it is renamed to `<filename>.1`, older files
+    moving up to `<filename>.<backups>`, and a new file is started.
+    """
+
+    HEADER = struct.Struct("<dBI")
+
+    def __init__(self, filename: str, max_bytes: int = 0x1000000, backups: int = 3):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._file = open(filename, "ab")
+        self._size = self._file.tell()
+
+    def __call__(self, message: Union[str, bytes, bytearray]):
+        if isinstance(message, str):
+            kind = 0
+            payload = message.encode("utf-8")
+        else:
+            kind = 1
+            payload = bytes(message)
+        record = self.HEADER.pack(time.time(), kind, len(payload)) + payload
+        with self._lock:
+            if self._file is None:
+                return
+            if self._size and self._size + len(record) > self.max_bytes:
+                self._rotate()
+            self._file.write(record)
+            self._size += len(record)
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.filename}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.filename}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.filename, f"{self.filename}.1")
+        self._file = open(self.filename, "wb")
+        self._size = 0
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_channel_log(
+    filename: str,
+) -> Generator[Tuple[float, Union[str, bytes]], None, None]:
+    """
+    Reads the records of a channel log file.
+
+    @param filename: log file to read
+    @return: time, message
+    """
+    header = ChannelLog.HEADER
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(header.size)
+            if len(data) < header.size:
+                return
+            t, kind, length = header.unpack(data)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield t, payload.decode("utf-8") if kind == 0 else payload
+
+
 class Channel:
     """
     Register and configure the Kernel channel that is used to send and view data within the kernel. Channels can send
     both string data and binary data. They provide debug information and data such as from a server module.
+
+    Buffered channels keep their latest messages, limited to buffer_size messages and, if given, buffer_bytes bytes.
+    A channel log records every message to disk without being limited by the buffer.
     """
 
     def __init__(
@@ -79,25 +164,76 @@ class Channel:
         timestamp: bool = False,
         pure: bool = False,
         ansi: bool = False,
+        buffer_bytes: int = 0,
     ):
         self.watchers = []
         self.greet = None
         self.name = name
         self.buffer_size = buffer_size
+        self.buffer_bytes = buffer_bytes
+        self._buffered_bytes = 0
         self.line_end = line_end
         self._ = lambda e: e
         self.timestamp = timestamp
+        self._timestamp_second = None
+        self._timestamp_text = ""
         self.pure = pure
-        if buffer_size == 0:
+        if buffer_size == 0 and buffer_bytes == 0:
             self.buffer = None
         else:
             self.buffer = deque()
+        self.log = None
         self.ansi = ansi
         self.threaded = False
 
     def __repr__(self):
         return f"Channel({repr(self.name)}, buffer_size={str(self.buffer_size)}, line_end={repr(self.line_end)})"
 
+    def _timestamp(self) -> str:
+        """
+        Timestamp prefix for the current time. The text is only formatted once each second.
+        """
+        now = time.time()
+        second = int(now)
+        if second != self._timestamp_second:
+            self._timestamp_second = second
+            self._timestamp_text = time.strftime("[%H:%M:%S] ", time.localtime(now))
+        return self._timestamp_text
+
+    def _buffer_append(self, message: Union[str, bytes, bytearray]):
+        self.buffer.append(message)
+        self._buffered_bytes += len(message)
+        self._buffer_trim()
+
+    def _buffer_trim(self):
+        buffer = self.buffer
+        if self.buffer_bytes:
+            while self._buffered_bytes > self.buffer_bytes and len(buffer) > 1:
+                self._buffered_bytes -= len(buffer.popleft())
+        if self.buffer_size:
+            while len(buffer) > self.buffer_size:
+                self._buffered_bytes -= len(buffer.popleft())
+
+    def set_buffer(self, buffer_size: int = 0, buffer_bytes: int = 0):
+        """
+        Sets the buffer limits of this channel. A channel without limits is not buffered.
+
+        @param buffer_size: maximum number of messages buffered
+        @param buffer_bytes: maximum length of all the messages buffered
+        @return:
+        """
+        self.buffer_size = buffer_size
+        self.buffer_bytes = buffer_bytes
+        if buffer_size == 0 and buffer_bytes == 0:
+            self.buffer = None
+            self._buffered_bytes = 0
+            return
+        if self.buffer is None:
+            self.buffer = deque()
+            self._buffered_bytes = 0
+        else:
+            self._buffer_trim()
+
     def _call_raw(
         self,
         message: Union[str, bytes, bytearray],
@@ -105,9 +241,7 @@ class Channel:
         for w in self.watchers:
             w(message)
         if self.buffer is not None:
-            self.buffer.append(message)
-            while len(self.buffer) > self.buffer_size:
-                self.buffer.popleft()
+            self._buffer_append(message)
 
     def __call__(
         self,
@@ -121,6 +255,10 @@ class Channel:
         if self.threaded and execute_threaded:
             self._threaded_call(message, *args, indent=indent, ansi=ansi, **kwargs)
             return
+        if self.log is not None:
+            self.log(message)
+            if not self.watchers and self.buffer is None:
+                return
         if isinstance(message, (bytes, bytearray)) or self.pure:
             self._call_raw(message)
             return
@@ -131,7 +269,7 @@ class Channel:
         if indent:
             message = "    " + message.replace("\n", "\n    ")
         if self.timestamp:
-            ts = datetime.now().strftime("[%H:%M:%S] ")
+            ts = self._timestamp()
             message = ts + message.replace("\n", f"\n{ts}")
         if ansi:
             if self.ansi:
@@ -160,9 +298,7 @@ class Channel:
             else:
                 w(message)
         if self.buffer is not None:
-            self.buffer.append(message)
-            while len(self.buffer) > self.buffer_size:
-                self.buffer.popleft()
+            self._buffer_append(message)
 
     def __len__(self):
         return self.buffer_size
@@ -180,7 +316,7 @@ class Channel:
         send the data. With this you can have `channels` that do no work unless something in the kernel
         is listening for that data, or the data is being buffered.
         """
-        return bool(self.watchers) or self.buffer_size != 0
+        return bool(self.watchers) or self.buffer is not None or self.log is not None
 
     def bbcode_to_ansi(self, text):
         return "".join(
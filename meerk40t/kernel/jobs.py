@@ -9,6 +9,9 @@ class Job:
     Jobs that can be scheduled in the scheduler-kernel to run at a particular time and a given number of times.
     This is done calling schedule() and unschedule() and setting the parameters for process, args, interval,
     and times.
+
+    Jobs run in the scheduler thread, in the main thread if run_main is set, or in a dedicated scheduler thread
+    shared by all jobs with the same thread name.
     """
 
     def __init__(
@@ -20,11 +23,13 @@ class Job:
         job_name: Optional[str] = None,
         run_main: bool = False,
         conditional: Callable = None,
+        thread: Optional[str] = None,
     ):
         self.job_name = job_name
         self.state = "init"
         self.run_main = run_main
         self.conditional = conditional
+        self.thread = thread
 
         self.process = process
         self.args = args
@@ -82,9 +87,18 @@ class ConsoleFunction(Job):
         job_name: Optional[str] = None,
         run_main: bool = False,
         conditional: Callable = None,
+        thread: Optional[str] = None,
     ):
         Job.__init__(
-            self, self.__call__, None, interval, times, job_name, run_main, conditional
+            self,
+            self.__call__,
+            None,
+            interval,
+            times,
+            job_name,
+            run_main,
+            conditional,
+            thread,
         )
         self.context = context
         self.data = data
@@ -1,15 +1,19 @@
+import contextlib
 import functools
+import heapq
 import inspect
 import os
 import platform
 import re
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from threading import Thread
 from typing import Any, Callable, Generator, List, Optional, Tuple, Union
 
-from .channel import Channel
+from .channel import Channel, ChannelLog
 from .context import Context
 from .exceptions import CommandMatchRejected, CommandSyntaxError
 from .functions import (
@@ -22,6 +26,8 @@ from .functions import (
 from .jobs import ConsoleFunction, Job
 from .lifecycles import *
 from .module import Module
+from .profiler import LifecycleProfile
+from .registry import LazyImport, Registry
 from .service import Service
 from .settings import Settings
 
@@ -87,11 +93,14 @@ class Kernel(Settings):
         self.profile = profile
         self.version = version
 
-        # Persistent Settings
+        # Persistent Settings, a settings database is used once it has been created.
+        settings_file = f"{profile}.cfg"
+        if os.path.exists(os.path.join(get_safe_path(self.name), f"{profile}.db")):
+            settings_file = f"{profile}.db"
         Settings.__init__(
             self,
             self.name,
-            f"{profile}.cfg",
+            settings_file,
             ignore_settings=ignore_settings,
             create_backup=True,
         )
@@ -103,6 +112,9 @@ class Kernel(Settings):
         self._shutdown = False
         self._quit = False
 
+        # Timing of all lifecycle calls made to plugins and objects.
+        self.lifecycle_profile = LifecycleProfile()
+
         # Store the plugins for the kernel. During lifecycle events all plugins will be called with the new lifecycle
         self._kernel_plugins = []
         self._service_plugins = {}
@@ -126,12 +138,16 @@ class Kernel(Settings):
             times=1,
             run_main=True,
         )
-        self._registered = {}
+        self._registered = Registry()
         self.lookups = {}
         self.lookup_previous = {}
         self._dirty_paths = []
         self._lookup_lock = threading.Lock()
 
+        # Console command dispatch index, rebuilt after registration changes.
+        self._command_index = None
+        self._command_generation = 0
+
         # The translation object to be overridden by any valid translation functions
         from . import _
 
@@ -148,6 +164,9 @@ class Kernel(Settings):
         # Scheduler
         self.jobs = {}
         self.scheduler_thread = None
+        self._job_heaps = {}
+        self._job_sequence = 0
+        self._job_condition = threading.Condition()
 
         # Signal Listener
         self.signal_job = None
@@ -161,6 +180,16 @@ class Kernel(Settings):
         self._message_queue = {}
         self._process_lock = threading.Lock()
         self._processing = {}
+        self._listener_stats = {}
+        self._listener_stats_lock = threading.Lock()
+        self._async_lock = threading.Lock()
+        self._async_pending = {}
+        self._async_pool = None
+
+        # Batch
+        self._batch_lock = threading.Lock()
+        self._batch_depth = 0
+        self._batch_deferred = {}
 
         # Channels
         self.channels = {}
@@ -286,14 +315,14 @@ class Kernel(Settings):
         @param plugin:
         @return:
         """
-        additional_plugins = plugin(self, "plugins")
+        additional_plugins = self._lifecycle_plugin(plugin, self, "plugins")
         if additional_plugins is not None:
             if not isinstance(additional_plugins, (tuple, list)):
                 additional_plugins = tuple(additional_plugins)
             for p in additional_plugins:
                 self.add_plugin(p)
-        service_paths = plugin(self, "service")
-        module_paths = plugin(self, "module")
+        service_paths = self._lifecycle_plugin(plugin, self, "service")
+        module_paths = self._lifecycle_plugin(plugin, self, "module")
         if service_paths is None and module_paths is None:
             # This is just a kernel plugin.
             if plugin not in self._kernel_plugins:
@@ -346,7 +375,7 @@ class Kernel(Settings):
 
         @return: domain, service
         """
-        for r in list(self._registered):
+        for r in self._registered.matching("service/"):
             result = RE_ACTIVE.match(r)
             if result:
                 yield result.group(1), self._registered[r]
@@ -357,7 +386,7 @@ class Kernel(Settings):
 
         @return: domain, service
         """
-        for r in list(self._registered):
+        for r in self._registered.matching("service/"):
             result = RE_AVAILABLE.match(r)
             if result:
                 yield result.group(1), self._registered[r]
@@ -611,6 +640,25 @@ class Kernel(Settings):
         elif isinstance(model, Kernel):
             self.set_kernel_lifecycle(model, Kernel.kernel_lifecycle_position(model))
 
+    def _lifecycle_plugin(self, plugin: Callable, target: Any, lifecycle: str):
+        """
+        Calls the plugin with the given lifecycle, recording the call within the lifecycle profile.
+        """
+        module = getattr(plugin, "__module__", None)
+        name = getattr(plugin, "__qualname__", str(plugin))
+        return self.lifecycle_profile.call(
+            lifecycle, f"{module}.{name}", str(target), plugin, target, lifecycle
+        )
+
+    def _lifecycle_object(self, obj: Any, method: str, *args, **kwargs):
+        """
+        Calls the lifecycle method of the given object, recording the call within the lifecycle profile.
+        """
+        name = f"{type(obj).__module__}.{type(obj).__qualname__}.{method}"
+        return self.lifecycle_profile.call(
+            method, name, str(obj), getattr(obj, method), *args, **kwargs
+        )
+
     def set_kernel_lifecycle(self, kernel, position, *args, **kwargs):
         """
         Sets the kernel's lifecycle object
@@ -633,12 +681,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-precli: {str(k)}")
                 if hasattr(k, "precli"):
-                    k.precli()
+                    self._lifecycle_object(k, "precli")
         if start < LIFECYCLE_KERNEL_PRECLI <= end:
             if channel:
                 channel("(plugin) kernel-precli")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "precli")
+                self._lifecycle_plugin(plugin, kernel, "precli")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_CLI <= end:
@@ -646,12 +694,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-cli: {str(k)}")
                 if hasattr(k, "cli"):
-                    k.cli()
+                    self._lifecycle_object(k, "cli")
         if start < LIFECYCLE_KERNEL_CLI <= end:
             if channel:
                 channel("(plugin) kernel-cli")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "cli")
+                self._lifecycle_plugin(plugin, kernel, "cli")
 
         objects = self.get_linked_objects(kernel)
         for k in objects:
@@ -660,26 +708,26 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-invalidate: {str(k)}")
                 if hasattr(k, "invalidate"):
-                    k.invalidate()
+                    self._lifecycle_object(k, "invalidate")
         if start < LIFECYCLE_KERNEL_INVALIDATE <= end:
             if channel:
                 channel("(plugin) kernel-invalidate")
             plugin_list = self._kernel_plugins
             for i in range(len(plugin_list) - 1, -1, -1):
                 plugin = plugin_list[i]
-                if plugin(kernel, "invalidate"):
+                if self._lifecycle_plugin(plugin, kernel, "invalidate"):
                     del plugin_list[i]
             for domain in self._service_plugins:
                 plugin_list = self._service_plugins[domain]
                 for i in range(len(plugin_list) - 1, -1, -1):
                     plugin = plugin_list[i]
-                    if plugin(kernel, "invalidate"):
+                    if self._lifecycle_plugin(plugin, kernel, "invalidate"):
                         del plugin_list[i]
             for module_path in self._module_plugins:
                 plugin_list = self._module_plugins[module_path]
                 for i in range(len(plugin_list) - 1, -1, -1):
                     plugin = plugin_list[i]
-                    if plugin(kernel, "invalidate"):
+                    if self._lifecycle_plugin(plugin, kernel, "invalidate"):
                         del plugin_list[i]
 
         objects = self.get_linked_objects(kernel)
@@ -689,12 +737,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-preregister: {str(k)}")
                 if hasattr(k, "preregister"):
-                    k.preregister()
+                    self._lifecycle_object(k, "preregister")
         if start < LIFECYCLE_KERNEL_PREREGISTER <= end:
             if channel:
                 channel("(plugin) kernel-preregister")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preregister")
+                self._lifecycle_plugin(plugin, kernel, "preregister")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_REGISTER <= end:
@@ -702,12 +750,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-registration: {str(k)}")
                 if hasattr(k, "registration"):
-                    k.registration()
+                    self._lifecycle_object(k, "registration")
         if start < LIFECYCLE_KERNEL_REGISTER <= end:
             if channel:
                 channel("(plugin) kernel-register")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "register")
+                self._lifecycle_plugin(plugin, kernel, "register")
 
         objects = self.get_linked_objects(kernel)
         for k in objects:
@@ -716,12 +764,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-configure: {str(k)}")
                 if hasattr(k, "configure"):
-                    k.configure()
+                    self._lifecycle_object(k, "configure")
         if start < LIFECYCLE_KERNEL_CONFIGURE <= end:
             if channel:
                 channel("(plugin) kernel-configure")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "configure")
+                self._lifecycle_plugin(plugin, kernel, "configure")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PREBOOT <= end:
@@ -729,12 +777,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-preboot: {str(k)}")
                 if hasattr(k, "preboot"):
-                    k.preboot()
+                    self._lifecycle_object(k, "preboot")
         if start < LIFECYCLE_KERNEL_PREBOOT <= end:
             if channel:
                 channel("(plugin) kernel-preboot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preboot")
+                self._lifecycle_plugin(plugin, kernel, "preboot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_BOOT <= end:
@@ -742,7 +790,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-boot: {str(k)} boot")
                 if hasattr(k, "boot"):
-                    k.boot()
+                    self._lifecycle_object(k, "boot")
                 self._command_attach(self, k)
                 self._signal_attach(k)
                 self._lookup_attach(k)
@@ -750,7 +798,7 @@ class Kernel(Settings):
             if channel:
                 channel("(plugin) kernel-boot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "boot")
+                self._lifecycle_plugin(plugin, kernel, "boot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTBOOT <= end:
@@ -758,12 +806,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-postboot: {str(k)}")
                 if hasattr(k, "postboot"):
-                    k.postboot()
+                    self._lifecycle_object(k, "postboot")
         if start < LIFECYCLE_KERNEL_POSTBOOT <= end:
             if channel:
                 channel("(plugin) kernel-postboot")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "postboot")
+                self._lifecycle_plugin(plugin, kernel, "postboot")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PRESTART <= end:
@@ -771,12 +819,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-prestart: {str(k)}")
                 if hasattr(k, "prestart"):
-                    k.prestart()
+                    self._lifecycle_object(k, "prestart")
         if start < LIFECYCLE_KERNEL_PRESTART <= end:
             if channel:
                 channel("(plugin) kernel-prestart")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "prestart")
+                self._lifecycle_plugin(plugin, kernel, "prestart")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_START <= end:
@@ -784,12 +832,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-start: {str(k)}")
                 if hasattr(k, "start"):
-                    k.start()
+                    self._lifecycle_object(k, "start")
         if start < LIFECYCLE_KERNEL_START <= end:
             if channel:
                 channel("(plugin) kernel-start")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "start")
+                self._lifecycle_plugin(plugin, kernel, "start")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTSTART <= end:
@@ -797,12 +845,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-poststart: {str(k)}")
                 if hasattr(k, "poststart"):
-                    k.poststart()
+                    self._lifecycle_object(k, "poststart")
         if start < LIFECYCLE_KERNEL_POSTSTART <= end:
             if channel:
                 channel("(plugin) kernel-poststart")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "poststart")
+                self._lifecycle_plugin(plugin, kernel, "poststart")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_READY <= end:
@@ -810,12 +858,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-ready: {str(k)}")
                 if hasattr(k, "ready"):
-                    k.ready()
+                    self._lifecycle_object(k, "ready")
         if start < LIFECYCLE_KERNEL_READY <= end:
             if channel:
                 channel("(plugin) kernel-ready")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "ready")
+                self._lifecycle_plugin(plugin, kernel, "ready")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_FINISHED <= end:
@@ -823,12 +871,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-finished: {str(k)}")
                 if hasattr(k, "finished"):
-                    k.finished()
+                    self._lifecycle_object(k, "finished")
         if start < LIFECYCLE_KERNEL_FINISHED <= end:
             if channel:
                 channel("(plugin) kernel-finished")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "finished")
+                self._lifecycle_plugin(plugin, kernel, "finished")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PREMAIN <= end:
@@ -836,12 +884,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-premain: {str(k)}")
                 if hasattr(k, "premain"):
-                    k.premain()
+                    self._lifecycle_object(k, "premain")
         if start < LIFECYCLE_KERNEL_PREMAIN <= end:
             if channel:
                 channel("(plugin) kernel-premain")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "premain")
+                self._lifecycle_plugin(plugin, kernel, "premain")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_MAINLOOP <= end:
@@ -849,12 +897,12 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-mainloop: {str(k)}")
                 if hasattr(k, "mainloop"):
-                    k.mainloop()
+                    self._lifecycle_object(k, "mainloop")
         if start < LIFECYCLE_KERNEL_MAINLOOP <= end:
             if channel:
                 channel("(plugin) kernel-mainloop")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "mainloop")
+                self._lifecycle_plugin(plugin, kernel, "mainloop")
 
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_POSTMAIN <= end:
@@ -862,18 +910,18 @@ class Kernel(Settings):
                 if channel:
                     channel(f"kernel-postmain: {str(k)}")
                 if hasattr(k, "postmain"):
-                    k.postmain()
+                    self._lifecycle_object(k, "postmain")
         if start < LIFECYCLE_KERNEL_POSTMAIN <= end:
             if channel:
                 channel("(plugin) kernel-postmain")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "postmain")
+                self._lifecycle_plugin(plugin, kernel, "postmain")
 
         if start < LIFECYCLE_KERNEL_PRESHUTDOWN <= end:
             if channel:
                 channel("(plugin) kernel-preshutdown")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "preshutdown")
+                self._lifecycle_plugin(plugin, kernel, "preshutdown")
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_PRESHUTDOWN <= end:
                 k._kernel_lifecycle = LIFECYCLE_KERNEL_PRESHUTDOWN
@@ -883,13 +931,13 @@ class Kernel(Settings):
                 self._signal_detach(k)
                 self._lookup_detach(k)
                 if hasattr(k, "preshutdown"):
-                    k.preshutdown()
+                    self._lifecycle_object(k, "preshutdown")
 
         if start < LIFECYCLE_KERNEL_SHUTDOWN <= end:
             if channel:
                 channel("(plugin) kernel-shutdown")
             for plugin in self._kernel_plugins:
-                plugin(kernel, "shutdown")
+                self._lifecycle_plugin(plugin, kernel, "shutdown")
         for k in objects:
             if klp(k) < LIFECYCLE_KERNEL_SHUTDOWN <= end:
                 k._kernel_lifecycle = LIFECYCLE_KERNEL_SHUTDOWN
@@ -898,7 +946,7 @@ class Kernel(Settings):
                 self._signal_detach(k)
                 self._lookup_detach(k)
                 if hasattr(k, "shutdown"):
-                    k.shutdown()
+                    self._lifecycle_object(k, "shutdown")
 
         for k in objects:
             k._kernel_lifecycle = end
@@ -929,7 +977,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"service-added: {str(s)}")
                 if hasattr(s, "added"):
-                    s.added(*args, **kwargs)
+                    self._lifecycle_object(s, "added", *args, **kwargs)
                 self._command_attach(service, s)
 
         # Update plugin: added
@@ -939,7 +987,7 @@ class Kernel(Settings):
                 channel(f"(plugin) service-added: {str(service)}")
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "added")
+                    self._lifecycle_plugin(plugin, service, "added")
             except (KeyError, AttributeError):
                 pass
 
@@ -956,7 +1004,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"service-service_detach: {str(s)}")
                 if hasattr(s, "service_detach"):
-                    s.service_detach(*args, **kwargs)
+                    self._lifecycle_object(s, "service_detach", *args, **kwargs)
                 self._signal_detach(s)
                 self._lookup_detach(s)
 
@@ -967,7 +1015,7 @@ class Kernel(Settings):
             start = LIFECYCLE_SERVICE_DETACHED
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "service_detach")
+                    self._lifecycle_plugin(plugin, service, "service_detach")
             except (KeyError, AttributeError):
                 pass
 
@@ -980,7 +1028,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"service-service_attach: {str(s)}")
                 if hasattr(s, "service_attach"):
-                    s.service_attach(*args, **kwargs)
+                    self._lifecycle_object(s, "service_attach", *args, **kwargs)
                 self._signal_attach(s)
                 self._lookup_attach(s)
 
@@ -991,7 +1039,7 @@ class Kernel(Settings):
             start = LIFECYCLE_SERVICE_ATTACHED
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "service_attach")
+                    self._lifecycle_plugin(plugin, service, "service_attach")
             except (KeyError, AttributeError):
                 pass
 
@@ -1005,7 +1053,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"service-assigned: {str(s)}")
                 if hasattr(s, "assigned"):
-                    s.assigned(*args, **kwargs)
+                    self._lifecycle_object(s, "assigned", *args, **kwargs)
 
         # Update plugin: assigned
         if start == LIFECYCLE_SERVICE_ATTACHED and end == LIFECYCLE_SERVICE_ASSIGNED:
@@ -1014,7 +1062,7 @@ class Kernel(Settings):
                 channel(f"(plugin) service-assigned: {str(service)}")
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "assigned")
+                    self._lifecycle_plugin(plugin, service, "assigned")
             except (KeyError, AttributeError):
                 pass
 
@@ -1025,7 +1073,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"service-shutdown: {str(s)}")
                 if hasattr(s, "shutdown"):
-                    s.shutdown(*args, **kwargs)
+                    self._lifecycle_object(s, "shutdown", *args, **kwargs)
                 self._command_detach(service, s)
 
         # Update plugin: shutdown
@@ -1036,7 +1084,7 @@ class Kernel(Settings):
             self.remove_service(service)
             try:
                 for plugin in self._service_plugins[service.registered_path]:
-                    plugin(service, "shutdown")
+                    self._lifecycle_plugin(plugin, service, "shutdown")
             except (KeyError, AttributeError):
                 pass
 
@@ -1069,7 +1117,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"module-module_open: {str(m)}")
                 if hasattr(m, "module_open"):
-                    m.module_open(*args, **kwargs)
+                    self._lifecycle_object(m, "module_open", *args, **kwargs)
                 self._signal_attach(m)
                 self._lookup_attach(m)
 
@@ -1080,7 +1128,7 @@ class Kernel(Settings):
             module.context.opened[module.name] = module
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "module_open")
+                    self._lifecycle_plugin(plugin, module, "module_open")
             except (KeyError, AttributeError):
                 pass
 
@@ -1091,7 +1139,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"module-module_closed: {str(m)}")
                 if hasattr(m, "module_close"):
-                    m.module_close(*args, **kwargs)
+                    self._lifecycle_object(m, "module_close", *args, **kwargs)
                 self._signal_detach(m)
                 self._lookup_detach(m)
 
@@ -1106,7 +1154,7 @@ class Kernel(Settings):
                 pass  # Nothing to close.
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "module_close")
+                    self._lifecycle_plugin(plugin, module, "module_close")
             except (KeyError, AttributeError):
                 pass
 
@@ -1117,7 +1165,7 @@ class Kernel(Settings):
                 if channel:
                     channel(f"module-shutdown: {str(m)}")
                 if hasattr(m, "shutdown"):
-                    m.shutdown()
+                    self._lifecycle_object(m, "shutdown")
 
         # Update plugin: shutdown
         if start < LIFECYCLE_KERNEL_SHUTDOWN <= end:
@@ -1125,7 +1173,7 @@ class Kernel(Settings):
                 channel(f"(plugin) module-shutdown: {str(module)}")
             try:
                 for plugin in self._module_plugins[module.registered_path]:
-                    plugin(module, "shutdown")
+                    self._lifecycle_plugin(plugin, module, "shutdown")
             except (KeyError, AttributeError):
                 pass
 
@@ -1163,12 +1211,14 @@ class Kernel(Settings):
         @return:
         """
         self.scheduler_thread = self.threaded(self.run, thread_name="Scheduler")
+        # The signal job runs once after signals or listeners are queued, see _signal_wake().
         self.signal_job = self.add_job(
             run=self.process_queue,
             name="kernel.signals",
             interval=self.delay,
+            times=1,
             run_main=True,
-            conditional=lambda: not self._processing,
+            conditional=lambda: not self._processing and not self._batch_depth,
         )
         self._booted = True
 
@@ -1202,11 +1252,25 @@ class Kernel(Settings):
             # If a batch file is specified it gets processed here.
             self.channel("console").watch(self.__print_delegate)
             with self.args.batch as batch:
-                for line in batch:
-                    self.console(line.strip() + "\n")
+                self.batch_console(
+                    [line.strip() for line in batch], channel=self._console_channel
+                )
             self.channel("console").unwatch(self.__print_delegate)
 
     def premain(self):
+        if hasattr(self.args, "profile_startup") and self.args.profile_startup:
+            # Startup is complete, write the lifecycle profile.
+            try:
+                self.lifecycle_profile.write(self.args.profile_startup)
+                self.channel("console")(
+                    f"Startup profile written to {self.args.profile_startup}"
+                )
+            except OSError as e:
+                self.channel("console")(f"Startup profile could not be written: {e}")
+            import tracemalloc
+
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
         if hasattr(self.args, "console") and self.args.console:
             self.channel("console").watch(self.__print_delegate)
             import sys
@@ -1295,6 +1359,8 @@ class Kernel(Settings):
         """
         channel = self.channel("shutdown")
         self.state = "end"  # Terminates the Scheduler.
+        with self._job_condition:
+            self._job_condition.notify_all()
 
         _ = self.translation
 
@@ -1426,6 +1492,11 @@ class Kernel(Settings):
             except:
                 pass
 
+        # Close any channel logs.
+        for chan in self.channels.values():
+            if chan.log is not None:
+                chan.log.close()
+
         # Process any remove attempts that were occurred too late for standard removal.
         self._process_remove_listeners()
         for key, listener in self.listeners.items():
@@ -1438,6 +1509,8 @@ class Kernel(Settings):
                     )
         self._last_message = {}
         self.listeners = {}
+        if self._async_pool is not None:
+            self._async_pool.shutdown(wait=True)
         if (
             self.scheduler_thread != threading.current_thread()
         ):  # Join if not this thread.
@@ -1458,14 +1531,17 @@ class Kernel(Settings):
         @return:
         """
         matchtext = "/".join(args)
-        match = re.compile(matchtext)
-        for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    yield service._registered[r], r, list(r.split("/"))[-1]
-        for r in self._registered:
-            if match.match(r):
-                yield self._registered[r], r, list(r.split("/"))[-1]
+        registries = [service._registered for domain, service in self.services_active()]
+        registries.append(self._registered)
+        for registered in registries:
+            for r in registered.matching(matchtext):
+                try:
+                    obj = registered[r]
+                except KeyError:
+                    continue
+                if isinstance(obj, LazyImport):
+                    obj = self._lazy_resolve(registered, r, obj)
+                yield obj, r, list(r.split("/"))[-1]
 
     def match(self, matchtext: str, suffix: bool = False) -> Generator[str, None, None]:
         """
@@ -1475,16 +1551,10 @@ class Kernel(Settings):
         @param suffix: provide the suffix of the match only.
         @return:
         """
-        match = re.compile(matchtext)
-        for domain, service in self.services_active():
-            for r in service._registered:
-                if match.match(r):
-                    if suffix:
-                        yield list(r.split("/"))[-1]
-                    else:
-                        yield r
-        for r in self._registered:
-            if match.match(r):
+        registries = [service._registered for domain, service in self.services_active()]
+        registries.append(self._registered)
+        for registered in registries:
+            for r in registered.matching(matchtext):
                 if suffix:
                     yield list(r.split("/"))[-1]
                 else:
@@ -1498,15 +1568,32 @@ class Kernel(Settings):
         @return:
         """
         value = "/".join(args)
-        for domain, service in self.services_active():
+        registries = [service._registered for domain, service in self.services_active()]
+        registries.append(self._registered)
+        for registered in registries:
             try:
-                return service._registered[value]
+                obj = registered[value]
             except KeyError:
-                pass
-        try:
-            return self._registered[value]
-        except KeyError:
-            return None
+                continue
+            if isinstance(obj, LazyImport):
+                obj = self._lazy_resolve(registered, value, obj)
+            return obj
+        return None
+
+    @staticmethod
+    def _lazy_resolve(registered: dict, path: str, lazy: LazyImport) -> Any:
+        """
+        Import the object of a lazily registered path and replace the placeholder with it.
+
+        @param registered: registry holding the path
+        @param path: registered path
+        @param lazy: placeholder registered at that path
+        @return: imported object
+        """
+        obj = lazy.resolve()
+        if registered.get(path) is lazy:
+            registered[path] = obj
+        return obj
 
     def has_feature(self, *args):
         for feature in args:
@@ -1606,6 +1693,7 @@ class Kernel(Settings):
         self.channel("lookup")(
             f"Changed all: {str(paths)} ({str(threading.current_thread().name)})"
         )
+        self._command_index_invalidate()
         with self._lookup_lock:
             if not self._dirty_paths:
                 self.schedule(self._clean_lookup)
@@ -1621,6 +1709,8 @@ class Kernel(Settings):
         self.channel("lookup")(
             f"Changed {str(path)} ({str(threading.current_thread().name)})"
         )
+        if path.startswith("command/") or path.startswith("service/"):
+            self._command_index_invalidate()
         with self._lookup_lock:
             if not self._dirty_paths:
                 self.schedule(self._clean_lookup)
@@ -1834,67 +1924,165 @@ class Kernel(Settings):
     def scheduler_default(self, *args):
         self.schedule_run(defaults=True, mains=False)
 
-    def schedule_run(self, defaults=True, mains=True):
+    @staticmethod
+    def _job_lane(job) -> str:
         """
-        Single run of scheduler jobs.
-        @return:
+        Lane of the given job. Each lane is run by a single thread.
+
+        @param job: job to find the lane of
+        @return: lane name
         """
-        jobs = self.jobs
-        for job_name in list(jobs):
-            try:
-                job = jobs[job_name]
-            except KeyError:
-                continue  # Job was removed during execution.
+        thread = getattr(job, "thread", None)
+        if thread is not None:
+            return f"thread/{thread}"
+        if job.run_main:
+            return "main"
+        return "default"
+
+    def _job_push(self, job: "Job") -> bool:
+        """
+        Push the job into the heap of its lane at its next run time. The job condition must be held.
 
-            # Checking if jobs should run.
-            if job.run_main:
-                if not mains:
-                    # Do not attempt to run mains.
+        Entries are not removed when jobs are unscheduled or rescheduled, they are discarded when they reach the top
+        of the heap and no longer agree with the scheduled job.
+
+        @param job: job to push
+        @return: whether this created a new lane
+        """
+        lane = self._job_lane(job)
+        heap = self._job_heaps.get(lane)
+        created = heap is None
+        if created:
+            heap = self._job_heaps[lane] = []
+        heapq.heappush(heap, (job._next_run, self._job_sequence, job))
+        self._job_sequence += 1
+        return created
+
+    def _jobs_due(self, lanes: List[str]) -> Tuple[list, Optional[float]]:
+        """
+        Pop all due jobs within the given lanes. The job condition must be held.
+
+        @param lanes: lanes to check
+        @return: list of due jobs, time of the next job or None
+        """
+        now = time.time()
+        due = []
+        next_run = None
+        for lane in lanes:
+            heap = self._job_heaps.get(lane)
+            while heap:
+                when, sequence, job = heap[0]
+                if self.jobs.get(job.job_name) is not job or job._next_run != when:
+                    heapq.heappop(heap)  # Unscheduled or rescheduled.
                     continue
+                if when > now:
+                    if next_run is None or when < next_run:
+                        next_run = when
+                    break
+                heapq.heappop(heap)
+                due.append(job)
+        return due, next_run
+
+    def _job_execute(self, job: "Job") -> None:
+        """
+        Execute a due job and schedule its next run.
+
+        @param job: job to run
+        @return:
+        """
+        if job.conditional is not None and not job.conditional():
+            # Not ready. Check the job again after the kernel delay.
+            with self._job_condition:
+                job._next_run = time.time() + self.delay
+                self._job_push(job)
+            return
+        job._next_run = 0  # Set to zero while running.
+        if job._remaining is not None:
+            job._remaining = job._remaining - 1
+            if job._remaining <= 0:
+                with self._job_condition:
+                    if self.jobs.get(job.job_name) is job:
+                        del self.jobs[job.job_name]
+            if job._remaining < 0:
+                return
+        try:
+            if job.args is None:
+                job.process()
             else:
-                if not defaults:
-                    # Do not attempt to run defaults.
-                    continue
-            if job.scheduled:
-                job._next_run = 0  # Set to zero while running.
-                if job._remaining is not None:
-                    job._remaining = job._remaining - 1
-                    if job._remaining <= 0:
-                        del jobs[job_name]
-                    if job._remaining < 0:
-                        continue
-                try:
-                    if job.args is None:
-                        job.process()
-                    else:
-                        job.process(*job.args)
-                except Exception:
-                    import sys
+                job.process(*job.args)
+        except Exception:
+            import sys
+
+            sys.excepthook(*sys.exc_info())
+        job._last_run = time.time()
+        with self._job_condition:
+            job._next_run = job._last_run + job.interval
+            if self.jobs.get(job.job_name) is job:
+                self._job_push(job)
+
+    def _job_cycle(self, lanes: List[str]) -> None:
+        """
+        Run the due jobs of the given lanes, if there are none wait until the next job is due or a job is scheduled.
 
-                    sys.excepthook(*sys.exc_info())
-                job._last_run = time.time()
-                job._next_run += job._last_run + job.interval
+        @param lanes: lanes run by the current thread
+        @return:
+        """
+        with self._job_condition:
+            due, next_run = self._jobs_due(lanes)
+            if not due and self.state != "end":
+                if next_run is None:
+                    self._job_condition.wait()
+                else:
+                    self._job_condition.wait(max(0.0, next_run - time.time()))
+        for job in due:
+            self._job_execute(job)
+
+    def _job_worker(self, lane: str) -> None:
+        """
+        Thread loop for the jobs with a thread affinity.
+
+        @param lane: lane of the jobs run by this thread
+        @return:
+        """
+        while self.state != "end":
+            self._job_cycle([lane])
+
+    def schedule_run(self, defaults=True, mains=True):
+        """
+        Single run of scheduler jobs.
+        @return:
+        """
+        lanes = list()
+        if defaults:
+            lanes.append("default")
+        if mains:
+            lanes.append("main")
+        with self._job_condition:
+            due, next_run = self._jobs_due(lanes)
+        for job in due:
+            self._job_execute(job)
 
     def run(self, *args) -> None:
         """
         Scheduler main loop.
 
         Check the Scheduler thread state, and whether it should abort or pause.
-        Check each job, and if that job is scheduled to run. Executes that job.
+        Wait until the next job is due, or a new job is scheduled, and execute the due jobs.
         @return:
         """
         self.state = "active"
         while self.state != "end":
-            time.sleep(self.delay)
             while self.state == "pause":
                 # The scheduler is paused.
                 time.sleep(0.1)
             if self.state == "terminate":
                 break
-            self.schedule_run(
-                self.scheduler_handles_default_thread_jobs,
-                self.scheduler_handles_main_thread_jobs,
-            )
+            lanes = list()
+            if self.scheduler_handles_default_thread_jobs:
+                lanes.append("default")
+            if self.scheduler_handles_main_thread_jobs:
+                lanes.append("main")
+            self._job_cycle(lanes)
         self.state = "end"
 
     def schedule(self, job: "Job") -> "Job":
@@ -1903,14 +2091,26 @@ class Kernel(Settings):
             # Could be recurring job. Reset on reschedule.
         except AttributeError:
             pass
-        self.jobs[job.job_name] = job
+        with self._job_condition:
+            self.jobs[job.job_name] = job
+            created = self._job_push(job)
+            self._job_condition.notify_all()
+        thread = getattr(job, "thread", None)
+        if created and thread is not None:
+            self.threaded(
+                self._job_worker,
+                self._job_lane(job),
+                thread_name=f"Scheduler-{thread}",
+                daemon=True,
+            )
         return job
 
     def unschedule(self, job: "Job") -> "Job":
-        try:
-            del self.jobs[job.job_name]
-        except KeyError:
-            pass  # No such job.
+        with self._job_condition:
+            try:
+                del self.jobs[job.job_name]
+            except KeyError:
+                pass  # No such job.
         return job
 
     def add_job(
@@ -1922,6 +2122,7 @@ class Kernel(Settings):
         times: int = None,
         run_main: bool = False,
         conditional: Callable = None,
+        thread: Optional[str] = None,
     ) -> "Job":
         """
         Adds a job to the scheduler.
@@ -1933,6 +2134,7 @@ class Kernel(Settings):
         @param times: limit on number of executions.
         @param run_main: Should this run in the main thread (as registered by kernel.run_later)
         @param conditional: Should execute only if the given additional conditional is true. (checked outside run_main)
+        @param thread: Name of a dedicated scheduler thread this job should run in.
         @return: Reference to the job added.
         """
         job = Job(
@@ -1943,6 +2145,7 @@ class Kernel(Settings):
             times=times,
             run_main=run_main,
             conditional=conditional,
+            thread=thread,
         )
         return self.schedule(job)
 
@@ -1993,6 +2196,23 @@ class Kernel(Settings):
         """
         with self._message_queue_lock:
             self._message_queue[code] = path, message
+        self._signal_wake()
+
+    def _signal_wake(self) -> None:
+        """
+        Schedules the signal job, unless it is already waiting to run.
+
+        The job is removed from the scheduler before it processes the queue, so anything queued while processing
+        schedules it again.
+        @return:
+        """
+        job = self.signal_job
+        if job is None:
+            return  # Not booted, the signal job is scheduled at boot.
+        with self._job_condition:
+            if self.jobs.get(job.job_name) is job:
+                return
+        self.schedule(job)
 
     def _process_add_listeners(self):
         """
@@ -2055,6 +2275,82 @@ class Kernel(Settings):
                     for index, listener in enumerate(listeners):
                         print(f"{index}: {str(listener)}")
 
+    @staticmethod
+    def _listener_name(listener: Callable) -> str:
+        name = getattr(listener, "__qualname__", None)
+        if name is None:
+            name = getattr(listener, "__name__", str(listener))
+        return f"{getattr(listener, '__module__', None)}:{name}"
+
+    def _listener_call(self, signal: str, listener: Callable, origin, message) -> None:
+        """
+        Calls the listener with the signal message, recording the time spent within the listener.
+        """
+        start = time.perf_counter()
+        try:
+            listener(origin, *message)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = signal, self._listener_name(listener)
+            with self._listener_stats_lock:
+                stats = self._listener_stats.get(key)
+                if stats is None:
+                    self._listener_stats[key] = [1, elapsed, elapsed]
+                else:
+                    stats[0] += 1
+                    stats[1] += elapsed
+                    if elapsed > stats[2]:
+                        stats[2] = elapsed
+
+    def listener_stats(self) -> List[Tuple[str, str, int, float, float]]:
+        """
+        Timing of all signal listeners called so far.
+
+        @return: list of signal, listener, calls, total seconds, maximum seconds
+        """
+        with self._listener_stats_lock:
+            return [
+                (signal, name, stats[0], stats[1], stats[2])
+                for (signal, name), stats in self._listener_stats.items()
+            ]
+
+    def _signal_async(self, signal: str, listener: Callable, origin, message) -> None:
+        """
+        Queue the delivery of a signal to a listener flagged as asynchronous. Deliveries of the same signal are run
+        one at a time in the order they were queued, within the signal worker pool.
+        """
+        with self._async_lock:
+            pending = self._async_pending.get(signal)
+            if pending is not None:
+                pending.append((listener, origin, message))
+                return
+            self._async_pending[signal] = deque([(listener, origin, message)])
+            if self._async_pool is None:
+                self._async_pool = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix="Signal"
+                )
+            pool = self._async_pool
+        try:
+            pool.submit(self._signal_async_drain, signal)
+        except RuntimeError:
+            # Pool is shutdown, deliver within this thread.
+            self._signal_async_drain(signal)
+
+    def _signal_async_drain(self, signal: str) -> None:
+        while True:
+            with self._async_lock:
+                pending = self._async_pending[signal]
+                if not pending:
+                    del self._async_pending[signal]
+                    return
+                listener, origin, message = pending.popleft()
+            try:
+                self._listener_call(signal, listener, origin, message)
+            except Exception:
+                import sys
+
+                sys.excepthook(*sys.exc_info())
+
     def _process_signal_queue(self):
         """
         Process signals in the processing queue.
@@ -2067,11 +2363,14 @@ class Kernel(Settings):
             if signal in self.listeners:
                 listeners = self.listeners[signal]
                 for listener, listen_lso in listeners:
-                    listener(origin, *message)
+                    if getattr(listener, "signal_async", False):
+                        self._signal_async(signal, listener, origin, message)
+                    else:
+                        self._listener_call(signal, listener, origin, message)
                     if signal_channel:
                         signal_channel(
                             f"Signal: {origin} {signal}: "
-                            f"{listener.__module__}:{listener.__name__}{str(message)}"
+                            f"{self._listener_name(listener)}{str(message)}"
                         )
             self._last_message[signal] = payload
 
@@ -2118,6 +2417,9 @@ class Kernel(Settings):
         """
         Attaches callable to a particular signal. This will be attached next time the signals are processed.
 
+        Listeners flagged with a true signal_async attribute are delivered in the signal worker pool rather than in
+        the signal processing thread, see @signal_listener.
+
         @param signal:
         @param funct:
         @param lifecycle_object:
@@ -2125,6 +2427,7 @@ class Kernel(Settings):
         """
         with self._add_lock:
             self._adding_listeners.append((signal, funct, lifecycle_object))
+        self._signal_wake()
 
     def unlisten(
         self,
@@ -2142,6 +2445,7 @@ class Kernel(Settings):
         """
         with self._remove_lock:
             self._removing_listeners.append((signal, funct, lifecycle_object))
+        self._signal_wake()
         # if len(self._removing_listeners) != len(set(self._removing_listeners)):
         #     print("Warning duplicate listener removing.")
 
@@ -2289,6 +2593,78 @@ class Kernel(Settings):
     def _console_interface(self, command: str):
         pass
 
+    def _command_index_invalidate(self) -> None:
+        """
+        Mark the console command index as stale. It is rebuilt on the next command.
+        """
+        self._command_generation += 1
+        self._command_index = None
+
+    def _command_index_build(self) -> dict:
+        """
+        Build the console command index from the registered commands of the active services and the kernel.
+
+        Each input_type maps to a dict of exact command names and a list of precompiled regex commands. Every entry
+        carries its position in registration order, so candidates are tried in the same order as a full registry scan.
+
+        @return: index of input_type to (exact, regexes)
+        """
+        index = {}
+        order = 0
+        registries = [service._registered for domain, service in self.services_active()]
+        registries.append(self._registered)
+        for registered in registries:
+            for r in registered.matching("command/"):
+                try:
+                    funct = registered[r]
+                except KeyError:
+                    continue
+                parts = r.split("/")
+                if len(parts) < 3:
+                    continue
+                name = parts[-1]
+                exact, regexes = index.setdefault(parts[1], ({}, []))
+                if funct.regex:
+                    try:
+                        regexes.append((order, re.compile(name), funct, name))
+                    except re.error:
+                        continue
+                else:
+                    exact.setdefault(name, []).append((order, funct, name))
+                order += 1
+        return index
+
+    def _command_candidates(self, input_type, command: str):
+        """
+        Yields the registered command functions for the given input_type which match the given command.
+
+        @param input_type: current command context
+        @param command: command name
+        @return: funct, name
+        """
+        index = self._command_index
+        if index is None:
+            generation = self._command_generation
+            index = self._command_index_build()
+            if generation == self._command_generation:
+                self._command_index = index
+        try:
+            exact, regexes = index[str(input_type)]
+        except KeyError:
+            return
+        candidates = [
+            (order, funct, name)
+            for order, match, funct, name in regexes
+            if match.match(command)
+        ]
+        if candidates:
+            candidates.extend(exact.get(command, ()))
+            candidates.sort(key=lambda e: e[0])
+        else:
+            candidates = exact.get(command, ())
+        for order, funct, name in candidates:
+            yield funct, name
+
     def _console_parse(self, text: str, channel: "Channel"):
         """
         Takes single line console commands and executes them.
@@ -2317,19 +2693,8 @@ class Kernel(Settings):
 
             command = command.lower()
             command_executed = False
-            # Process command matches.
-            for funct, name, regex in self.find("command", str(input_type), ".*"):
-                # Find all commands with matching input_type.
-                if funct.regex:
-                    # This function is a regex match.
-                    match = re.compile(regex)
-                    if not match.match(command):
-                        continue
-                else:
-                    # Exact match only.
-                    if regex != command:
-                        continue
-
+            # Process command matches, exact names and precompiled regex commands.
+            for funct, name in self._command_candidates(input_type, command):
                 try:
                     data, remainder, input_type = funct(
                         command=command,
@@ -2638,6 +3003,40 @@ class Kernel(Settings):
                 channel(" ".join(parts))
             channel(_("----------"))
 
+        @self.console_option(
+            "limit", "l", type=int, default=20, help=_("Number of entries to show")
+        )
+        @self.console_option(
+            "output", "o", type=str, help=_("Write full json report to this file")
+        )
+        @self.console_command(
+            "lifecycles", help=_("show the time taken by plugin lifecycle calls")
+        )
+        def lifecycle_report(channel, _, limit=20, output=None, **kwargs):
+            profile = self.lifecycle_profile
+            if output is not None:
+                try:
+                    profile.write(output)
+                except OSError as e:
+                    channel(str(e))
+                    return
+                channel(_("Lifecycle report written to {file}.").format(file=output))
+                return
+            channel(_("----------"))
+            channel(_("Lifecycle Calls:"))
+            for i, entry in enumerate(profile.summary()[:limit]):
+                lifecycle, name, calls, duration, memory = entry
+                parts = [f"{i + 1}:", lifecycle, name]
+                parts.append(
+                    _("{calls} calls, {time:.1f}ms").format(
+                        calls=calls, time=duration * 1000
+                    )
+                )
+                if memory:
+                    parts.append(f"{memory / 1024:+.0f}KiB")
+                channel(" ".join(parts))
+            channel(_("----------"))
+
         @self.console_command("schedule", help=_("show scheduled events"))
         def schedule(channel, _, **kwargs):
             channel(_("----------"))
@@ -3347,6 +3746,113 @@ class Kernel(Settings):
                 self.channel(cn).watch(_console_file_write)
             return "channel", channel_name
 
+        @self.console_option(
+            "filename", "f", help=_("Use this filename rather than default")
+        )
+        @self.console_option(
+            "size",
+            "s",
+            type=int,
+            default=16,
+            help=_("Size in MB at which the log file is rotated"),
+        )
+        @self.console_option(
+            "backups", "b", type=int, default=3, help=_("Rotated log files kept")
+        )
+        @self.console_option("close", "c", type=bool, action="store_true")
+        @self.console_argument("channel_name", help=_("channel name"))
+        @self.console_command(
+            "log",
+            help=_("record this channel to a rotating binary log"),
+            input_type="channel",
+            output_type="channel",
+        )
+        def channel_log(
+            channel,
+            _,
+            channel_name,
+            filename=None,
+            size=16,
+            backups=3,
+            close=False,
+            **kwargs,
+        ):
+            """
+            Records every message sent to the channel to a compact binary log, regardless of the channel buffer.
+            The log files are rotated at the given size, so the disk used is limited as well.
+            """
+            if channel_name is None:
+                raise CommandSyntaxError(_("channel_name is not specified."))
+            try:
+                v = int(channel_name) - 1
+                for i, name in enumerate(self.channels):
+                    if v == i:
+                        channel_name = name
+                        break
+            except ValueError:
+                pass
+            chan = self.channel(channel_name)
+            if chan.log is not None:
+                chan.log.close()
+                chan.log = None
+                channel(_("Closed log of Channel: {name}").format(name=channel_name))
+            if close:
+                return "channel", channel_name
+            if filename is None:
+                filename = os.path.join(
+                    get_safe_path(self.name, True), f"{channel_name}.log"
+                )
+            chan.log = ChannelLog(
+                filename, max_bytes=size * 0x100000, backups=backups
+            )
+            channel(
+                _("Logging Channel: {name} to file {filename}").format(
+                    name=channel_name, filename=filename
+                )
+            )
+            return "channel", channel_name
+
+        @self.console_option("size", "s", type=int, help=_("bytes buffered"))
+        @self.console_option(
+            "lines", "l", type=int, help=_("number of messages buffered")
+        )
+        @self.console_argument("channel_name", help=_("channel name"))
+        @self.console_command(
+            "limit",
+            help=_("set the buffer limits of this channel, 0 for no limit"),
+            input_type="channel",
+            output_type="channel",
+        )
+        def channel_limit(channel, _, channel_name, size=None, lines=None, **kwargs):
+            if channel_name is None:
+                raise CommandSyntaxError(_("channel_name is not specified."))
+            try:
+                v = int(channel_name) - 1
+                for i, name in enumerate(self.channels):
+                    if v == i:
+                        channel_name = name
+                        break
+            except ValueError:
+                pass
+            chan = self.channel(channel_name)
+            if size is not None or lines is not None:
+                chan.set_buffer(
+                    buffer_size=chan.buffer_size if lines is None else lines,
+                    buffer_bytes=chan.buffer_bytes if size is None else size,
+                )
+            buffered = 0 if chan.buffer is None else len(chan.buffer)
+            channel(
+                _(
+                    "Channel {name}: {count} messages buffered, limits: {lines} messages, {size} bytes"
+                ).format(
+                    name=channel_name,
+                    count=buffered,
+                    lines=chan.buffer_size,
+                    size=chan.buffer_bytes,
+                )
+            )
+            return "channel", channel_name
+
         # ==========
         # SETTINGS
         # ==========
@@ -3421,6 +3927,29 @@ class Kernel(Settings):
             self.write_configuration(newfile)
             channel(_("Persistent settings exported to {file}.").format(file=newfile))
 
+        @self.console_command(
+            "setting_database",
+            help=_("Store persistent settings in a database instead of the .cfg file"),
+        )
+        def setting_database(channel, _, **kwargs):
+            if str(self._config_file).endswith(".db"):
+                channel(
+                    _("Persistent settings are stored in {file}.").format(
+                        file=self._config_file
+                    )
+                )
+                return
+            for context_name in list(self.contexts):
+                context = self.contexts[context_name]
+                context.flush()
+            self._config_file = self._config_file.with_suffix(".db")
+            self.write_configuration()
+            channel(
+                _(
+                    "Persistent settings moved to {file}. Delete it to return to the .cfg file."
+                ).format(file=self._config_file)
+            )
+
         @self.console_command(
             "setting_import", help=_("Restore a previously saved configuration file")
         )
@@ -3465,6 +3994,53 @@ class Kernel(Settings):
                 channel(f"Error while sending {signalname}, {signalargs}: {e}")
             return
 
+        @self.console_option(
+            "limit", "l", type=int, default=20, help=_("Number of listeners to show")
+        )
+        @self.console_option(
+            "sort",
+            "s",
+            type=str,
+            default="total",
+            help=_("Sort by total, max, avg or calls"),
+        )
+        @self.console_option(
+            "reset", "r", action="store_true", help=_("Reset the listener timings")
+        )
+        @self.console_command("listeners", help=_("show the slowest signal listeners"))
+        def listener_report(channel, _, limit=20, sort="total", reset=False, **kwargs):
+            if reset:
+                with self._listener_stats_lock:
+                    self._listener_stats.clear()
+                channel(_("Listener timings reset."))
+                return
+            keys = {
+                "calls": lambda e: e[2],
+                "total": lambda e: e[3],
+                "max": lambda e: e[4],
+                "avg": lambda e: e[3] / e[2],
+            }
+            if sort not in keys:
+                raise CommandSyntaxError(_("Sort by total, max, avg or calls"))
+            stats = self.listener_stats()
+            stats.sort(key=keys[sort], reverse=True)
+            channel(_("----------"))
+            channel(_("Signal Listeners:"))
+            for i, entry in enumerate(stats[:limit]):
+                signal, name, calls, total, worst = entry
+                channel(
+                    f"{i + 1}: {signal} {name} "
+                    + _(
+                        "{calls} calls, {total:.1f}ms total, {avg:.3f}ms avg, {worst:.1f}ms max"
+                    ).format(
+                        calls=calls,
+                        total=total * 1000,
+                        avg=total * 1000 / calls,
+                        worst=worst * 1000,
+                    )
+                )
+            channel(_("----------"))
+
         # ==========
         # LIFECYCLE
         # ==========
@@ -3581,14 +4157,96 @@ class Kernel(Settings):
         root = self.root
         if root.setting(str, "batch", None) is None:
             return
+        commands = []
         for b in root.batch.split(";"):
             if b:
                 find = b.find(" ")
                 origin = b[:find]
                 if origin == "disable":
                     continue
-                command = b[find + 1 :]
-                root(f"{command}\n")
+                commands.append(b[find + 1 :])
+        self.batch_console(commands)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Transactional batch. Within the batch, signals are not delivered and calls made with batch_call() are
+        deferred. When the outermost batch ends, each deferred call is made once and the queued signals are delivered
+        together with the next signal processing, each signal once with its latest message.
+        """
+        with self._batch_lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._batch_lock:
+                self._batch_depth -= 1
+                deferred = None
+                if not self._batch_depth:
+                    deferred = self._batch_deferred
+                    self._batch_deferred = {}
+            if deferred:
+                for funct, args in deferred:
+                    funct(*args)
+
+    @property
+    def batching(self) -> bool:
+        return self._batch_depth != 0
+
+    def batch_call(self, funct: Callable, *args) -> None:
+        """
+        Calls the function, or if a batch is running calls it once when the batch ends.
+
+        @param funct: function to call, must be hashable with its args
+        @param args: arguments of the call
+        @return:
+        """
+        with self._batch_lock:
+            if self._batch_depth:
+                self._batch_deferred[(funct, args)] = None
+                return
+        funct(*args)
+
+    def batch_console(self, commands, channel=None) -> List[Tuple[str, float]]:
+        """
+        Executes the console commands as one transactional batch, see batch().
+
+        The time taken by each command is sent to the "batch" channel, and a summary to the given channel.
+
+        @param commands: console command lines
+        @param channel: channel to report the batch summary
+        @return: list of command, seconds
+        """
+        timings = []
+        timing_channel = self.channel("batch")
+        start = time.perf_counter()
+        with self.batch():
+            for command in commands:
+                if not command:
+                    continue
+                t = time.perf_counter()
+                try:
+                    self.console(f"{command}\n")
+                finally:
+                    elapsed = time.perf_counter() - t
+                    timings.append((command, elapsed))
+                    if timing_channel:
+                        timing_channel(f"{elapsed * 1000.0:10.3f}ms {command}")
+        if channel is not None:
+            _ = self.translation
+            slowest = max(timings, key=lambda e: e[1], default=None)
+            channel(
+                _("Batch: {count} commands in {time:.3f}s").format(
+                    count=len(timings), time=time.perf_counter() - start
+                )
+            )
+            if slowest is not None:
+                channel(
+                    _("Slowest: {time:.3f}s {command}").format(
+                        time=slowest[1], command=slowest[0]
+                    )
+                )
+        return timings
 
     # ==========
     # KERNEL REPLACEABLE
@@ -3696,11 +4354,15 @@ def lookup_listener(param):
     return decor
 
 
-def signal_listener(param):
+def signal_listener(param, asynchronous: bool = False):
     """
     Flags a method as a @signal_listener. This will be listened when the module is opened.
 
+    Asynchronous listeners are called in a worker pool, so they must not touch the gui. Signals delivered to them
+    keep their order for each signal.
+
     @param param: function being attached to
+    @param asynchronous: deliver the signal outside the signal processing thread
     @return:
     """
 
@@ -3709,6 +4371,8 @@ def signal_listener(param):
             func.signal_listener = [param]
         else:
             func.signal_listener.append(param)
+        if asynchronous:
+            func.signal_async = True
         return func
 
     return decor
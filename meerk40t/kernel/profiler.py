@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+import tracemalloc
+
+
+class LifecycleProfile:
+    """
+    Records the time taken, and when tracemalloc is tracing the memory allocated, by every lifecycle call the kernel
+    makes to plugins, services, modules and kernel objects.
+
+    Records are kept in call order. Calls made within a lifecycle call, such as plugins added by the "plugins"
+    lifecycle, are recorded separately and included in the time and memory of their caller.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.records = []
+
+    def call(self, lifecycle: str, name: str, target: str, funct, *args, **kwargs):
+        """
+        Calls the given function, recording it for the given lifecycle.
+
+        @param lifecycle: lifecycle position being called
+        @param name: name of the plugin or object method called
+        @param target: kernel, service or module the lifecycle is being set for
+        @param funct: function to call
+        @return: result of the call
+        """
+        tracing = tracemalloc.is_tracing()
+        memory = tracemalloc.get_traced_memory()[0] if tracing else 0
+        start = time.perf_counter()
+        try:
+            return funct(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            if tracing:
+                memory = tracemalloc.get_traced_memory()[0] - memory
+            self.records.append(
+                (
+                    lifecycle,
+                    name,
+                    target,
+                    start - self.origin,
+                    end - start,
+                    memory,
+                    threading.get_ident(),
+                )
+            )
+
+    def summary(self):
+        """
+        Totals of the records for each lifecycle and name.
+
+        @return: list of lifecycle, name, calls, seconds, memory sorted by time taken.
+        """
+        totals = {}
+        for lifecycle, name, target, start, duration, memory, tid in self.records:
+            total = totals.get((lifecycle, name))
+            if total is None:
+                totals[(lifecycle, name)] = [1, duration, memory]
+            else:
+                total[0] += 1
+                total[1] += duration
+                total[2] += memory
+        summary = [
+            (lifecycle, name, calls, duration, memory)
+            for (lifecycle, name), (calls, duration, memory) in totals.items()
+        ]
+        summary.sort(key=lambda e: e[3], reverse=True)
+        return summary
+
+    def report(self) -> dict:
+        """
+        Report of all records. The traceEvents are in the trace event format read by flamegraph viewers such as
+        speedscope, perfetto and chrome://tracing.
+
+        @return: json serializable dict
+        """
+        records = []
+        events = []
+        for lifecycle, name, target, start, duration, memory, tid in self.records:
+            records.append(
+                {
+                    "lifecycle": lifecycle,
+                    "name": name,
+                    "target": target,
+                    "start": start,
+                    "time": duration,
+                    "memory": memory,
+                }
+            )
+            events.append(
+                {
+                    "name": f"{lifecycle}: {name}",
+                    "cat": lifecycle,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": 0,
+                    "tid": tid,
+                    "args": {"target": target, "memory": memory},
+                }
+            )
+        summary = [
+            {
+                "lifecycle": lifecycle,
+                "name": name,
+                "calls": calls,
+                "time": duration,
+                "memory": memory,
+            }
+            for lifecycle, name, calls, duration, memory in self.summary()
+        ]
+        return {
+            "memory_traced": tracemalloc.is_tracing(),
+            "summary": summary,
+            "records": records,
+            "traceEvents": events,
+        }
+
+    def write(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            json.dump(self.report(), f, indent=1)
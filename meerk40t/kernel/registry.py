@@ -0,0 +1,119 @@
+import re
+from importlib import import_module
+
+REGEX_SPECIAL = frozenset(".^$*+?{}[]\\|()")
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Returns the literal text every string matched by the given regex pattern must start with.
+
+    This is conservative: alternations, escapes and groups end the literal prefix and a quantified final character
+    is not part of it.
+
+    @param pattern: regex pattern, as used with re.match()
+    @return: literal prefix of the pattern
+    """
+    if "|" in pattern:
+        return ""
+    for i, c in enumerate(pattern):
+        if c in REGEX_SPECIAL:
+            if c in "*?{" and i > 0:
+                return pattern[: i - 1]
+            return pattern[:i]
+    return pattern
+
+
+class LazyImport:
+    """
+    Placeholder registered in place of an object which should only be imported on first use.
+
+    Kernel lookups replace the placeholder with the imported object, so plugins can declare their providers, loaders
+    and jobs without importing the modules that implement them.
+    """
+
+    def __init__(self, module: str, name: str):
+        self.module = module
+        self.name = name
+
+    def __repr__(self):
+        return f"LazyImport('{self.module}', '{self.name}')"
+
+    def resolve(self):
+        return getattr(import_module(self.module), self.name)
+
+
+class Registry(dict):
+    """
+    Dictionary of registered paths to objects, indexed by the first path segment.
+
+    Registered paths are "/" separated, for example "command/elements/scale" or "format/op cut". Matching a pattern
+    with a literal first segment only scans the paths within that segment and a pattern which is entirely literal is
+    matched without the regex engine. Iteration order is the registration order, as with a plain dict.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._segments = {}
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._segments.setdefault(key.split("/", 1)[0], {})[key] = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        segment = key.split("/", 1)[0]
+        bucket = self._segments[segment]
+        del bucket[key]
+        if not bucket:
+            del self._segments[segment]
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *args)
+
+    def popitem(self):
+        key = next(reversed(self))
+        value = self.pop(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        self._segments.clear()
+
+    def matching(self, pattern: str) -> list:
+        """
+        Lists the registered paths which the given regex pattern matches, in registration order.
+
+        @param pattern: regex pattern, matched at the start of the path
+        @return: list of matching paths
+        """
+        prefix = literal_prefix(pattern)
+        pos = prefix.find("/")
+        if pos == -1:
+            candidates = list(self)
+        else:
+            bucket = self._segments.get(prefix[:pos])
+            if bucket is None:
+                return []
+            candidates = list(bucket)
+        if prefix:
+            candidates = [r for r in candidates if r.startswith(prefix)]
+        if prefix == pattern:
+            return candidates
+        match = re.compile(pattern).match
+        return [r for r in candidates if match(r)]
@@ -8,6 +8,7 @@ from .functions import (
     console_option,
 )
 from .lifecycles import *
+from .registry import Registry
 
 
 class Service(Context):
@@ -32,7 +33,7 @@ class Service(Context):
         super().__init__(kernel, path)
         kernel.register_as_context(self)
         self.registered_path = registered_path
-        self._registered = {}
+        self._registered = Registry()
 
     def __str__(self):
         if hasattr(self, "label"):
@@ -1,5 +1,6 @@
 import ast
 import os
+import sqlite3
 from configparser import ConfigParser, MissingSectionHeaderError, NoSectionError
 from pathlib import Path
 from typing import Any, Dict, Generator, Optional, Union
@@ -18,6 +19,11 @@ class Settings:
     Reading/writing and deleting are performed on the config_dict which stores a set of values
     these are loaded during the `read_configuration` step and are committed to disk when
     `write_configuration` is called.
+
+    Settings files ending in `.db` are sqlite databases rather than ini files. The database
+    keeps one row per key, so writing it only updates the keys which changed since it was
+    last read or written. If the database does not yet exist, the `.cfg` file with the same
+    name is imported.
     """
 
     def __init__(self, directory, filename, ignore_settings=False, create_backup=False):
@@ -25,6 +31,7 @@ class Settings:
             filename
         )
         self._config_dict = {}
+        self._config_stored = {}
         self.create_backup = create_backup
         if not ignore_settings:
             self.read_configuration()
@@ -42,6 +49,9 @@ class Settings:
         """
         if targetfile is None:
             targetfile = self._config_file
+        if str(targetfile).endswith(".db"):
+            self._read_database(targetfile)
+            return
         try:
             parser = ConfigParser()
             parser.read(targetfile, encoding="utf-8")
@@ -70,6 +80,9 @@ class Settings:
         """
         if targetfile is None:
             targetfile = self._config_file
+        if str(targetfile).endswith(".db"):
+            self._write_database(targetfile)
+            return
         try:
             parser = ConfigParser()
             for section_key in self._config_dict:
@@ -117,6 +130,105 @@ class Settings:
         except (PermissionError, FileNotFoundError):
             return
 
+    @staticmethod
+    def _connect_database(targetfile) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(targetfile))
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS settings ("
+            "section TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (section, key))"
+        )
+        return connection
+
+    def _read_database(self, targetfile):
+        """
+        Reads the settings database. If this is our own database, the values read are the stored state that
+        later writes are compared against.
+
+        @param targetfile: database file to read.
+        @return:
+        """
+        own = Path(targetfile) == self._config_file
+        if own and not os.path.exists(targetfile):
+            # No database yet, import the ini settings of the same name.
+            self.read_configuration(Path(targetfile).with_suffix(".cfg"))
+            return
+        try:
+            connection = self._connect_database(targetfile)
+            try:
+                rows = connection.execute(
+                    "SELECT section, key, value FROM settings"
+                ).fetchall()
+            finally:
+                connection.close()
+        except (sqlite3.Error, PermissionError):
+            return
+        for section, key, value in rows:
+            try:
+                config_section = self._config_dict[section]
+            except KeyError:
+                config_section = dict()
+                self._config_dict[section] = config_section
+            config_section[key] = value
+            if own:
+                try:
+                    self._config_stored[section][key] = value
+                except KeyError:
+                    self._config_stored[section] = {key: value}
+
+    def _write_database(self, targetfile):
+        """
+        Writes the settings database. Our own database is only updated with the keys which differ from the stored
+        state, any other database is replaced entirely.
+
+        @param targetfile: database file to write.
+        @return:
+        """
+        own = Path(targetfile) == self._config_file
+        stored = self._config_stored if own else {}
+        changed = []
+        for section, section_dict in self._config_dict.items():
+            stored_section = stored.get(section, {})
+            for key, value in section_dict.items():
+                if stored_section.get(key) != value:
+                    changed.append((section, key, str(value)))
+        deleted = []
+        for section, stored_section in stored.items():
+            section_dict = self._config_dict.get(section, {})
+            for key in stored_section:
+                if key not in section_dict:
+                    deleted.append((section, key))
+        if own and not changed and not deleted:
+            return
+        try:
+            connection = self._connect_database(targetfile)
+            try:
+                with connection:
+                    if not own:
+                        connection.execute("DELETE FROM settings")
+                    connection.executemany(
+                        "DELETE FROM settings WHERE section = ? AND key = ?", deleted
+                    )
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO settings (section, key, value) "
+                        "VALUES (?, ?, ?)",
+                        changed,
+                    )
+            finally:
+                connection.close()
+        except (sqlite3.Error, PermissionError):
+            return
+        if own:
+            for section, key in deleted:
+                del stored[section][key]
+                if not stored[section]:
+                    del stored[section]
+            for section, key, value in changed:
+                try:
+                    stored[section][key] = value
+                except KeyError:
+                    stored[section] = {key: value}
+
     def literal_dict(self):
         literal_dict = dict()
         import warnings
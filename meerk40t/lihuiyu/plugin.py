@@ -4,7 +4,7 @@ Lihuiyu Device Plugin
 Registers the needed classes for the lihuiyu device.
 """
 
-from meerk40t.lihuiyu.device import LihuiyuDevice
+from meerk40t.kernel import LazyImport
 
 
 def plugin(kernel, lifecycle=None):
@@ -20,7 +20,10 @@ def plugin(kernel, lifecycle=None):
             print("Lihuiyu plugin could not load because pyusb is not installed.")
             return True
     if lifecycle == "register":
-        kernel.register("provider/device/lhystudios", LihuiyuDevice)
+        kernel.register(
+            "provider/device/lhystudios",
+            LazyImport("meerk40t.lihuiyu.device", "LihuiyuDevice"),
+        )
         kernel.register("provider/friendly/lhystudios", ("CO2-Laser (K40)", 1))
         _ = kernel.translation
         kernel.register(
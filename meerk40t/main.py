@@ -126,6 +126,14 @@ parser.add_argument(
     default=None,
     help="run meerk40t with profiler file specified",
 )
+parser.add_argument(
+    "--profile-startup",
+    type=str,
+    nargs="?",
+    const="meerk40t-startup.json",
+    default=None,
+    help="write plugin lifecycle timings and memory of the startup to a json file",
+)
 
 
 def run():
@@ -175,6 +183,10 @@ def _exe(args):
     from meerk40t.internal_plugins import plugin as internal_plugins
     from meerk40t.kernel import Kernel
 
+    if args.profile_startup:
+        import tracemalloc
+
+        tracemalloc.start()
     kernel = Kernel(
         APPLICATION_NAME,
         APPLICATION_VERSION,
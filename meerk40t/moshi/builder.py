@@ -6,6 +6,8 @@ required data to run a Moshiboard.
 """
 import struct
 
+import numpy as np
+
 swizzle_table = [
     [
         b"\x00",
@@ -552,6 +554,42 @@ class MoshiBuilder:
         self.write(swizzle_table[MOSHI_CUT_VERT][0])
         self.pipe_int16le(int(y))
 
+    def raster_row(self, positions, cuts, vertical=False):
+        """
+        Write a raster scanline of absolute horizontal, or vertical, transitions at once.
+
+        This is equal to calling cut_horizontal_abs() or move_horizontal_abs() for each position, but the commands
+        are encoded as a single array and appended to the program in one write.
+
+        @param positions: x positions (y positions if vertical) of each transition.
+        @param cuts: whether each transition cuts or moves.
+        @param vertical: scanline is vertical.
+        @return:
+        """
+        assert 2 <= self._stage <= 3
+        positions = np.asarray(positions, dtype=float).ravel()
+        count = len(positions)
+        if count == 0:
+            return
+        self._stage = 3
+        if vertical:
+            self.last_y = positions[-1]
+            values = positions - self.offset_y
+            cut_code = swizzle_table[MOSHI_CUT_VERT][0][0]
+            move_code = swizzle_table[MOSHI_MOVE_VERT][0][0]
+        else:
+            self.last_x = positions[-1]
+            values = positions - self.offset_x
+            cut_code = swizzle_table[MOSHI_CUT_HORIZ][0][0]
+            move_code = swizzle_table[MOSHI_MOVE_HORIZ][0][0]
+        values = np.clip(values.astype(np.int64), -32768, 32767).astype("<i2")
+        if self.channel:
+            self.channel(f"Raster Row: {count} transitions")
+        row = np.empty((count, 3), dtype=np.uint8)
+        row[:, 0] = np.where(np.asarray(cuts, dtype=bool), cut_code, move_code)
+        row[:, 1:] = values.view(np.uint8).reshape((count, 2))
+        self.write(row.tobytes())
+
     def debug(self, output=print):
         data = self.data
         convert = MoshiBuilder.convert
@@ -64,6 +64,11 @@ class MoshiDriver(Parameters):
         self.preferred_offset_x = 0
         self.preferred_offset_y = 0
 
+        # Pending horizontal transitions of the current raster row.
+        self._row_x = []
+        self._row_cut = []
+        self._row_current = None
+
         self.pipe_channel = service.channel(f"{service.safe_label}/events")
         self.program.channel = self.pipe_channel
 
@@ -340,6 +345,15 @@ class MoshiDriver(Parameters):
                         time.sleep(0.05)
                         continue
                     on = int(on)
+                    if (
+                        on <= 1
+                        and self.state == DRIVER_STATE_RASTER
+                        and y == self.native_y
+                    ):
+                        # Horizontal transition, written with the rest of its row.
+                        self._raster_row_append(x, on & 1)
+                        continue
+                    self._raster_row_commit()
                     if on > 1:
                         # Special Command.
                         if on & (
@@ -380,6 +394,7 @@ class MoshiDriver(Parameters):
                             self.settings.update(p_set.settings)
                         continue
                     self._goto_absolute(x, y, on & 1)
+                self._raster_row_commit()
         self.queue.clear()
 
     def move_abs(self, x, y):
@@ -785,6 +800,37 @@ class MoshiDriver(Parameters):
             (old_current[0], old_current[1], new_current[0], new_current[1]),
         )
 
+    def _raster_row_append(self, x, cut):
+        """
+        Adds a horizontal raster transition to the pending row. Equal to _goto_absolute() in raster mode with an
+        unchanged y, but the row is written by _raster_row_commit().
+        """
+        if x == self.native_x:
+            return
+        if self._row_current is None:
+            self._row_current = self.service.current
+        self._row_x.append(x)
+        self._row_cut.append(cut)
+        self.native_x = x
+
+    def _raster_row_commit(self):
+        """
+        Writes the pending raster row to the program as a single batch.
+        """
+        if not self._row_x:
+            return
+        old_current = self._row_current
+        self.program.raster_row(self._row_x, self._row_cut)
+        self._row_x.clear()
+        self._row_cut.clear()
+        self._row_current = None
+
+        new_current = self.service.current
+        self.service.signal(
+            "driver;position",
+            (old_current[0], old_current[1], new_current[0], new_current[1]),
+        )
+
     def _move_absolute(self, x, y):
         """
         Move to a position x, y. This is an absolute position.
@@ -4,7 +4,7 @@ Moshi Device Plugin
 Registers the needed classes for the moshi device.
 """
 
-from meerk40t.moshi.device import MoshiDevice
+from meerk40t.kernel import LazyImport
 
 
 def plugin(kernel, lifecycle=None):
@@ -14,7 +14,9 @@ def plugin(kernel, lifecycle=None):
         return [gui.plugin]
 
     if lifecycle == "register":
-        kernel.register("provider/device/moshi", MoshiDevice)
+        kernel.register(
+            "provider/device/moshi", LazyImport("meerk40t.moshi.device", "MoshiDevice")
+        )
         kernel.register("provider/friendly/moshi", ("Older CO2-Laser (Moshi)", 4))
         _ = kernel.translation
         kernel.register(
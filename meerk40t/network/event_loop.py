@@ -0,0 +1,157 @@
+"""
+The network event loop hosts the network servers on a single asyncio event loop, run in one daemon thread.
+
+Data received by a server is delivered to its kernel channel by a small shared pool of worker threads, in order for
+each connection, so slow channel watchers such as console commands do not stall the other connections. Data sent to
+a connection is written by the event loop. While a connection has too much unsent data, the threads sending to it
+wait for it to catch up.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_event_loop_lock = threading.Lock()
+
+
+def plugin(kernel, lifecycle=None):
+    if lifecycle == "shutdown":
+        event_loop = kernel.lookup("network/loop")
+        if event_loop is not None:
+            event_loop.shutdown()
+
+
+def get_event_loop(context) -> "EventLoop":
+    """
+    Kernel wide network event loop, started on first use.
+
+    @param context: context of the server requiring the event loop
+    @return: EventLoop
+    """
+    kernel = context.kernel
+    with _event_loop_lock:
+        event_loop = kernel.lookup("network/loop")
+        if event_loop is None:
+            event_loop = EventLoop(kernel)
+            kernel.register("network/loop", event_loop)
+    return event_loop
+
+
+class EventLoop:
+    def __init__(self, kernel, workers: int = 8):
+        self.kernel = kernel
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="network"
+        )
+        self._ident = None
+        self._started = threading.Event()
+        kernel.threaded(self._run, thread_name="network-loop", daemon=True)
+        self._started.wait()
+
+    def _run(self):
+        self._ident = threading.get_ident()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def in_loop(self) -> bool:
+        """
+        Whether the current thread is the event loop thread.
+        """
+        return threading.get_ident() == self._ident
+
+    def submit(self, coroutine):
+        """
+        Runs the coroutine on the event loop.
+
+        @param coroutine: coroutine to run
+        @return: concurrent.futures.Future of the coroutine result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call(self, funct, *args):
+        """
+        Calls the function on the event loop, from any thread.
+        """
+        self.loop.call_soon_threadsafe(funct, *args)
+
+    async def deliver(self, funct, *args):
+        """
+        Calls the function on the worker threads, waiting for the result within the event loop.
+        """
+        return await self.loop.run_in_executor(self.executor, funct, *args)
+
+
+class Outgoing:
+    """
+    Unsent data of a connection. Data may be sent from any thread and is written by the event loop.
+
+    A thread sending data while more than high_water bytes are unsent waits until the connection catches up. If the
+    connection does not catch up within timeout seconds it is considered stalled and is aborted.
+    """
+
+    def __init__(
+        self,
+        event_loop: EventLoop,
+        write,
+        drain,
+        abort,
+        high_water: int = 0x10000,
+        timeout: float = 10.0,
+    ):
+        self.event_loop = event_loop
+        self.write = write
+        self.drain = drain
+        self.abort = abort
+        self.high_water = high_water
+        self.timeout = timeout
+        self.closed = False
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._queue = asyncio.Queue()
+
+    def __call__(self, data: bytes):
+        with self._condition:
+            if self.closed:
+                return
+            if self._pending >= self.high_water and not self.event_loop.in_loop():
+                if not self._condition.wait_for(
+                    lambda: self.closed or self._pending < self.high_water,
+                    self.timeout,
+                ):
+                    self.closed = True
+                    self.event_loop.call(self.abort)
+                if self.closed:
+                    return
+            self._pending += len(data)
+        self.event_loop.call(self._queue.put_nowait, data)
+
+    async def run(self):
+        """
+        Writes the data sent, until the outgoing data is closed.
+        """
+        while True:
+            data = await self._queue.get()
+            if data is None:
+                return
+            try:
+                self.write(data)
+                await self.drain()
+            except OSError:
+                self.close()
+                return
+            finally:
+                with self._condition:
+                    self._pending -= len(data)
+                    self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+        self.event_loop.call(self._queue.put_nowait, None)
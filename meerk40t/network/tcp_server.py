@@ -1,7 +1,9 @@
-import socket
+import asyncio
 
 from meerk40t.kernel import Module
 
+from .event_loop import Outgoing, get_event_loop
+
 
 def plugin(kernel, lifecycle=None):
     if lifecycle == "register":
@@ -11,7 +13,7 @@ def plugin(kernel, lifecycle=None):
 
 class TCPServer(Module):
     """
-    TCPServer opens up a localhost server and waits. Any connection is given its own handler.
+    TCPServer opens up a localhost server and waits. Every connection is handled on the network event loop.
     """
 
     def __init__(self, context, name, port=23):
@@ -25,12 +27,12 @@ class TCPServer(Module):
         Module.__init__(self, context, name)
         self.port = port
 
-        self.socket = None
+        self.server = None
+        self.connections = []
         self.events_channel = self.context.channel(f"server-tcp-{port}")
         self.data_channel = self.context.channel(f"data-tcp-{port}")
-        self.context.threaded(
-            self.run_tcp_delegater, thread_name=f"tcp-{port}", daemon=True
-        )
+        self.event_loop = get_event_loop(self.context)
+        self.event_loop.submit(self.run_tcp_server())
 
     def stop(self):
         self.state = "terminate"
@@ -39,104 +41,75 @@ class TCPServer(Module):
         _ = self.context._
         self.events_channel(_("Shutting down server."))
         self.state = "terminate"
-        if self.socket is not None:
-            self.socket.close()
-            self.socket = None
+        self.event_loop.call(self._close)
 
-    def run_tcp_delegater(self):
+    def _close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        for writer in list(self.connections):
+            writer.close()
+
+    async def run_tcp_server(self):
         """
-        TCP Run is a connection thread delegate. Any connections are given a different threaded
-        handle to interact with that connection. This thread here waits for sockets and delegates.
+        Starts listening on the event loop. Any connection is given to connection_handler().
         """
         _ = self.context._
-        self.socket = socket.socket()
         try:
-            self.socket.bind(("", self.port))
-            self.socket.listen(1)
+            self.server = await asyncio.start_server(
+                self.connection_handler, host=None, port=self.port
+            )
         except OSError:
             self.events_channel(_("Could not start listening."))
             return
-        handle = 1
-        while self.state != "terminate":
-            self.events_channel(
-                _("Listening {name} on port {port}...").format(
-                    name=self.name, port=self.port
-                )
+        if self.state == "terminate":
+            self._close()
+            return
+        self.events_channel(
+            _("Listening {name} on port {port}...").format(
+                name=self.name, port=self.port
             )
-            connection = None
-            address = None
-            try:
-                connection, address = self.socket.accept()
-                self.events_channel(
-                    _("Socket Connected: {address}").format(address=address)
-                )
-                self.context.threaded(
-                    self.connection_handler(connection, address),
-                    thread_name=f"handler-{self.port}-{handle}",
-                    daemon=True,
-                )
-                handle += 1
-            except socket.timeout:
-                pass
-            except OSError:
-                self.events_channel(
-                    _("Socket was killed: {address}").format(address=address)
-                )
-                if connection is not None:
-                    connection.close()
-                break
-            except AttributeError:
-                self.events_channel(_("Socket did not exist to accept connection."))
-                break
-        if self.socket is not None:
-            self.socket.close()
-
-    def connection_handler(self, connection, address):
+        )
+
+    async def connection_handler(self, reader, writer):
         """
-        The TCP Connection Handle, handles all connections delegated by the tcp_run() method.
-        The threaded context is entirely local and independent.
+        The TCP Connection Handle, handles each connection accepted by the server. Data received is sent to the
+        {name}/recv channel and data sent to the {name}/send channel is written to the connection.
         """
         _ = self.context._
+        address = writer.get_extra_info("peername")
+        self.events_channel(_("Socket Connected: {address}").format(address=address))
+        outgoing = Outgoing(
+            self.event_loop, writer.write, writer.drain, writer.transport.abort
+        )
 
-        def handle():
-            def send(e):
-                if connection is None:
-                    return
-                try:
-                    if isinstance(e, str):
-                        e = bytes(e, "utf-8")
-                    connection.send(e)
-                    self.data_channel(f"<-- {str(e)}")
-                except (ConnectionAbortedError, ConnectionResetError):
-                    connection.close()
-                except OSError:
-                    # Connection is likely already closed.
-                    if connection is not None:
-                        connection.close()
-
-            recv = self.context.channel(f"{self.name}/recv", pure=True)
-            send_channel_name = f"{self.name}/send"
-            self.context.channel(send_channel_name, pure=True).watch(send)
+        def send(e):
+            if isinstance(e, str):
+                e = bytes(e, "utf-8")
+            outgoing(e)
+            self.data_channel(f"<-- {str(e)}")
+
+        recv = self.context.channel(f"{self.name}/recv", pure=True)
+        send_channel = self.context.channel(f"{self.name}/send", pure=True)
+        writing = asyncio.ensure_future(outgoing.run())
+        self.connections.append(writer)
+        send_channel.watch(send)
+        try:
             while self.state != "terminate":
-                try:
-                    data_from_socket = connection.recv(1024)
-                    if len(data_from_socket):
-                        self.data_channel(f"--> {str(data_from_socket)}")
-                    else:
-                        break
-                    recv(data_from_socket)
-                except socket.timeout:
-                    self.events_channel(
-                        _("Connection to {address} timed out.").format(address=address)
-                    )
+                data_from_socket = await reader.read(1024)
+                if len(data_from_socket):
+                    self.data_channel(f"--> {str(data_from_socket)}")
+                else:
                     break
-                except OSError:
-                    if connection is not None:
-                        connection.close()
-                    break
-            self.context.channel(send_channel_name).unwatch(send)
+                await self.event_loop.deliver(recv, data_from_socket)
+        except OSError:
+            pass
+        finally:
+            send_channel.unwatch(send)
+            self.connections.remove(writer)
+            outgoing.close()
+            writer.close()
+            await writing
             self.events_channel(
                 _("Connection to {address} was closed.").format(address=address)
             )
-
-        return handle
@@ -6,10 +6,13 @@ Data sent to the `{path}/send` channel is sent as a reply to the last seen UDP p
 
 """
 
+import asyncio
 import socket
 
 from meerk40t.kernel import Module
 
+from .event_loop import get_event_loop
+
 
 def plugin(kernel, lifecycle=None):
     if lifecycle == "register":
@@ -37,28 +40,35 @@ class UDPServer(Module):
         self.listen_address = ""
         self.listen_port = port
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.socket.settimeout(2)
         self.socket.bind((self.listen_address, self.listen_port))
+        self.transport = None
+        self.event_loop = get_event_loop(self.context)
 
     def module_open(self, *args, **kwargs):
         """
-        Module opened. Watch send_channel -> Send and run the upd_listener thread.
+        Module opened. Watch send_channel -> Send and run the udp listener on the event loop.
         @param args:
         @param kwargs:
         @return:
         """
         self.send_channel.watch(self.send)
-        self.context.threaded(self.run_udp_listener, thread_name=self.name, daemon=True)
+        self.event_loop.submit(self.run_udp_listener())
 
     def module_close(self, *args, **kwargs):
         _ = self.context._
         self.send_channel.unwatch(self.send)
 
         self.events_channel(_("Shutting down server."))
-        if self.socket is not None:
-            self.socket.close()
-            self.socket = None
         self.state = "terminate"
+        self.event_loop.call(self._close)
+
+    def _close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        elif self.socket is not None:
+            self.socket.close()
+        self.socket = None
 
     def send(self, message, address=None):
         """
@@ -79,25 +89,49 @@ class UDPServer(Module):
             return
         if address:
             self.udp_address = address
-        self.socket.sendto(message, self.udp_address)
+        self.event_loop.call(self._sendto, message, self.udp_address)
+
+    def _sendto(self, message, address):
+        try:
+            if self.transport is not None:
+                self.transport.sendto(message, address)
+            elif self.socket is not None:
+                self.socket.sendto(message, address)
+        except OSError:
+            pass
 
-    def run_udp_listener(self):
+    async def run_udp_listener(self):
         """
-        UDP Thread Listener. Attempt to read UDP socket. On data read, send to `.recv_channel` ({name}/recv).
+        UDP Listener. Packets received are sent to `.recv_channel` ({name}/recv), in the order received.
         @return:
         """
         _ = self.context._
+        if self.socket is None:
+            return
+        received = asyncio.Queue()
+
+        class UDPProtocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                received.put_nowait((data, addr))
+
+            def connection_lost(self, exc):
+                received.put_nowait(None)
+
+        loop = self.event_loop.loop
+        self.transport, _protocol = await loop.create_datagram_endpoint(
+            UDPProtocol, sock=self.socket
+        )
+        if self.state == "terminate":
+            self._close()
         self.events_channel(
             _("UDP Socket({port}) Listening.").format(port=self.listen_port)
         )
-        try:
-            while self.state not in ("end", "terminate"):
-                try:
-                    message, address = self.socket.recvfrom(1024)
-                except (socket.timeout, AttributeError):
-                    continue
-                if address is not None:
-                    self.udp_address = address
-                self.recv_channel(message)
-        except OSError:
-            pass
+        while True:
+            item = await received.get()
+            if item is None:
+                break
+            message, address = item
+            # Replies go to the sender of the packet being delivered.
+            if address is not None:
+                self.udp_address = address
+            await self.event_loop.deliver(self.recv_channel, message)
@@ -4,9 +4,18 @@ Ruida Encoder
 The Ruida Encoder is responsible for turning function calls into binary ruida data.
 """
 import threading
+import time
+from collections import deque
 
 from meerk40t.ruida.rdjob import ACK, MEM_CARD_ID, RDJob
 
+# Reply for a packet whose checksum did not match.
+CHECKSUM_ERROR = b"\xCF"
+# Consecutive retransmits without any acknowledgement before giving up.
+SEND_RETRIES = 3
+# Seconds without a reply after which a packet is taken as lost.
+SEND_TIMEOUT = 5.0
+
 
 class RuidaController:
     """
@@ -24,6 +33,9 @@ class RuidaController:
         self._send_queue = []
         self._send_lock = threading.Condition()
         self._send_thread = None
+        # Replies to the packets sent, in the order received.
+        self._replies = deque()
+        self.window = 1.0
         self.events = service.channel(f"{service.safe_label}/events")
 
     def start_sending(self):
@@ -47,21 +59,99 @@ class RuidaController:
             self._send_queue.append(self.job.get_contents(last))
 
     def _data_sender(self):
-        while self._send_queue:
-            data = self._send_queue.pop(0)
-            self.write(data)
+        """
+        Sliding window sender. Up to window packets are sent before waiting for acknowledgements. Replies are not
+        numbered, so they are matched in order to the oldest unacknowledged packets.
+
+        The window grows by one packet per window of acknowledgements, up to the send_window setting. If every packet
+        was sent alone since all were last acknowledged, a checksum error resends the packet and a timeout fails the
+        job, as a late acknowledgement can't be told from a lost packet. Otherwise the refused or lost packet can't be
+        told from the unnumbered replies, a lost packet's reply is taken from a later packet: the remaining replies
+        are drained, every unconfirmed packet is resent in order, the rest of the file is sent one packet at a time
+        and a warning is given, as the laser may have received the file out of order.
+        """
+        max_window = max(1, int(getattr(self.service, "send_window", 1)))
+        self.window = 1.0
+        with self._send_lock:
+            self._replies.clear()
+        unacked = deque()
+        # Whether several packets were outstanding since all were acknowledged.
+        overlapped = False
+        retries = 0
+        while self._send_queue or unacked:
+            while self._send_queue and len(unacked) < int(self.window):
+                data = self._send_queue.pop(0)
+                unacked.append((data, time.time()))
+                self.write(data)
+            if len(unacked) > 1:
+                overlapped = True
             with self._send_lock:
-                if not self._send_lock.wait(5):
-                    self.service.signal("warning", "Connection Problem.", "Timeout")
-                    return
+                if not self._replies:
+                    self._send_lock.wait(SEND_TIMEOUT)
+                replies = list(self._replies)
+                self._replies.clear()
+            now = time.time()
+            refused = False
+            for reply in replies:
+                if not unacked:
+                    break
+                if reply != ACK:
+                    refused = True
+                    break
+                unacked.popleft()
+                self.window = min(max_window, self.window + 1.0 / self.window)
+                retries = 0
+            if not unacked:
+                overlapped = False
+            timed_out = unacked and now - unacked[0][1] > SEND_TIMEOUT
+            if not unacked or not (refused or timed_out):
+                continue
+            retries += 1
+            if retries > SEND_RETRIES or (timed_out and not overlapped):
+                self._send_queue.clear()
+                self._send_thread = None
+                self.service.signal("warning", "Connection Problem.", "Timeout")
+                return
+            self.window = 1.0
+            if overlapped:
+                if refused:
+                    self._drain(SEND_TIMEOUT)
+                max_window = 1
+                overlapped = len(unacked) > 1
+                self.service.signal(
+                    "warning",
+                    "Connection Problem.",
+                    "A packet was lost or refused while sending several at once, the job may be corrupted.",
+                )
+            resent = deque()
+            for data, sent in unacked:
+                resent.append((data, time.time()))
+                self.write(data)
+            unacked = resent
+            if refused:
+                self.events(f"Checksum error, {len(unacked)} packet(s) resent.")
+            else:
+                self.events(f"Timeout, {len(unacked)} packet(s) resent.")
         self._send_queue.clear()
         self._send_thread = None
         self.events("File Sent.")
 
+    def _drain(self, timeout):
+        """
+        Waits until no more replies arrive for the timeout, and discards them.
+        """
+        while True:
+            with self._send_lock:
+                self._replies.clear()
+                self._send_lock.wait(timeout)
+                if not self._replies:
+                    return
+
     def recv(self, reply):
         e = self.job.unswizzle(reply)
-        if e == ACK:
+        if e in (ACK, CHECKSUM_ERROR):
             with self._send_lock:
+                self._replies.append(e)
                 self._send_lock.notify()
         self.events(f"-->: {e}")
 
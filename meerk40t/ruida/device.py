@@ -172,6 +172,16 @@ class RuidaDevice(Service):
                 "label": _("Swizzle Magic Number"),
                 "tip": _("Swizzle value to communicate with laser."),
             },
+            {
+                "attr": "send_window",
+                "object": self,
+                "default": 1,
+                "type": int,
+                "label": _("Send Window"),
+                "tip": _(
+                    "Maximum number of packets sent before waiting for the laser to acknowledge them. The window grows as packets are acknowledged, 1 waits for every packet. Replies are not numbered, so a lost packet can't be resent in order with a larger window."
+                ),
+            },
         ]
         self.register_choices("ruida-magic", choices)
 
@@ -5,6 +5,8 @@ The Driver has a set of different commands which are sent and utilizes those whi
 """
 import time
 
+import numpy as np
+
 from meerk40t.core.cutcode.cubiccut import CubicCut
 from meerk40t.core.cutcode.dwellcut import DwellCut
 from meerk40t.core.cutcode.gotocut import GotoCut
@@ -187,10 +189,13 @@ class RuidaDriver(Parameters):
                 interp = self.service.interpolate
                 g = Geomstr()
                 g.quad(complex(*q.start), complex(*q.c()), complex(*q.end))
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag, cut=True)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                while self.paused:
+                    time.sleep(0.05)
+                self._move_bulk(points.real, points.imag, cut=True)
             elif isinstance(q, CubicCut):
                 interp = self.service.interpolate
                 g = Geomstr()
@@ -200,10 +205,13 @@ class RuidaDriver(Parameters):
                     complex(*q.c2()),
                     complex(*q.end),
                 )
-                for p in list(g.as_equal_interpolated_points(distance=interp))[1:]:
-                    while self.paused:
-                        time.sleep(0.05)
-                    self._move(p.real, p.imag, cut=True)
+                points = np.array(
+                    list(g.as_equal_interpolated_points(distance=interp))[1:],
+                    dtype=complex,
+                )
+                while self.paused:
+                    time.sleep(0.05)
+                self._move_bulk(points.real, points.imag, cut=True)
             elif isinstance(q, WaitCut):
                 self.controller.job.add_delay(q.dwell_time)
             elif isinstance(q, HomeCut):
@@ -218,14 +226,21 @@ class RuidaDriver(Parameters):
                 pass
             elif isinstance(q, PlotCut):
                 self.set("power", 1000)
-                for ox, oy, on, x, y in q.plot:
+                plot = np.array(
+                    [(x, y, on) for ox, oy, on, x, y in q.plot], dtype=float
+                ).reshape((-1, 3))
+                # q.plot can have different on values, each run of equal on values is written in bulk.
+                breaks = np.flatnonzero(np.diff(plot[:, 2])) + 1
+                for run in np.split(plot, breaks):
+                    if not len(run):
+                        continue
                     while self.hold_work(0):
                         time.sleep(0.05)
-                    # q.plot can have different on values, these are parsed
+                    on = run[0, 2]
                     if self.on_value != on:
                         self.power_dirty = True
                     self.on_value = on
-                    self._move(x, y, cut=True)
+                    self._move_bulk(run[:, 0], run[:, 1], cut=True)
             else:
                 #  Rastercut
                 self.plot_planner.push(q)
@@ -490,9 +505,26 @@ class RuidaDriver(Parameters):
     # PROTECTED DRIVER CODE
     ####################
 
-    def _move(self, x, y, cut=True):
+    def _move_bulk(self, x, y, cut=True):
+        """
+        Moves through each of the x, y positions, the same as calling _move() for each, but the job commands are
+        encoded in bulk and the position is signalled once.
+        """
+        if not len(x):
+            return
         old_current = self.service.current
         job = self.controller.job
+        self._write_dirty(job)
+        job.moves(x, y, cut, x0=self.native_x, y0=self.native_y)
+        self.native_x = float(x[-1])
+        self.native_y = float(y[-1])
+        new_current = self.service.current
+        self.service.signal(
+            "driver;position",
+            (old_current[0], old_current[1], new_current[0], new_current[1]),
+        )
+
+    def _write_dirty(self, job):
         if self.power_dirty:
             if self.power is not None:
                 job.max_power_1(self.power / 10.0 * self.on_value)
@@ -501,6 +533,11 @@ class RuidaDriver(Parameters):
         if self.speed_dirty:
             job.speed_laser_1(self.speed)
             self.speed_dirty = False
+
+    def _move(self, x, y, cut=True):
+        old_current = self.service.current
+        job = self.controller.job
+        self._write_dirty(job)
         dx = x - self.native_x
         dy = y - self.native_y
         if cut:
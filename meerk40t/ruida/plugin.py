@@ -3,11 +3,7 @@ Ruida Device Plugin
 
 Registers the needed classes for ruida device (or would if the ruida device could be controlled).
 """
-from meerk40t.ruida.control import RuidaControl
-from meerk40t.ruida.device import RuidaDevice
-from meerk40t.ruida.emulator import RuidaEmulator
-from meerk40t.ruida.loader import RDLoader
-from meerk40t.ruida.rdjob import RDJob
+from meerk40t.kernel import LazyImport
 
 
 def plugin(kernel, lifecycle=None):
@@ -17,7 +13,9 @@ def plugin(kernel, lifecycle=None):
         return [gui.plugin]
     if lifecycle == "register":
         _ = kernel.translation
-        kernel.register("provider/device/ruida", RuidaDevice)
+        kernel.register(
+            "provider/device/ruida", LazyImport("meerk40t.ruida.device", "RuidaDevice")
+        )
         # We don't want the ruida entry to appear
         # kernel.register("provider/friendly/ruida", ("CO2-Laser (DSP-Ruida)", 6))
         kernel.register(
@@ -41,9 +39,13 @@ def plugin(kernel, lifecycle=None):
                 ],
             },
         )
-        kernel.register("spoolerjob/ruida", RDJob)
-        kernel.register("load/RDLoader", RDLoader)
-        kernel.register("emulator/ruida", RuidaEmulator)
+        kernel.register("spoolerjob/ruida", LazyImport("meerk40t.ruida.rdjob", "RDJob"))
+        kernel.register(
+            "load/RDLoader", LazyImport("meerk40t.ruida.loader", "RDLoader")
+        )
+        kernel.register(
+            "emulator/ruida", LazyImport("meerk40t.ruida.emulator", "RuidaEmulator")
+        )
 
         @kernel.console_option(
             "verbose",
@@ -107,6 +109,8 @@ def plugin(kernel, lifecycle=None):
             if ruidacontrol is None:
                 if quit:
                     return
+                from meerk40t.ruida.control import RuidaControl
+
                 ruidacontrol = RuidaControl(root)
                 root.device.register("ruidacontrol", ruidacontrol)
                 ruidacontrol.start(
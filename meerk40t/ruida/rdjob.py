@@ -1,6 +1,8 @@
 import threading
 import time
 
+import numpy as np
+
 from meerk40t.core.cutcode.plotcut import PlotCut
 from meerk40t.core.units import UNITS_PER_uM
 from meerk40t.svgelements import Color
@@ -416,12 +418,21 @@ def swizzles_lut(magic):
     return lut_swizzle, lut_unswizzle
 
 
+def translate_bytes(data, lut):
+    """
+    Translates every byte of data through the 256 entry lookup table in a single array operation.
+
+    @param data: bytes to translate
+    @param lut: swizzle or unswizzle lookup table
+    @return: translated bytes
+    """
+    lut = np.asarray(lut, dtype=np.uint8)
+    return lut[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
 def decode_bytes(data, magic=0x88):
     lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_unswizzle[b])
-    return bytes(array)
+    return translate_bytes(data, lut_unswizzle)
 
 
 def determine_magic_via_histogram(data):
@@ -450,10 +461,94 @@ def determine_magic_via_histogram(data):
 
 def encode_bytes(data, magic=0x88):
     lut_swizzle, lut_unswizzle = swizzles_lut(magic)
-    array = list()
-    for b in data:
-        array.append(lut_swizzle[b])
-    return bytes(array)
+    return translate_bytes(data, lut_swizzle)
+
+
+def _encode14_array(v):
+    v = v.astype(np.int64)
+    return np.stack(((v >> 7) & 0x7F, v & 0x7F), axis=-1)
+
+
+def _encode32_array(v):
+    v = v.astype(np.int64)
+    return np.stack(
+        (
+            (v >> 28) & 0x7F,
+            (v >> 21) & 0x7F,
+            (v >> 14) & 0x7F,
+            (v >> 7) & 0x7F,
+            v & 0x7F,
+        ),
+        axis=-1,
+    )
+
+
+def _encode_moves(x, y, cut, x0=0, y0=0):
+    """
+    Encodes moves from x0, y0 through each of the x, y positions as cut or move commands. The encoding of each move is
+    chosen as RDJob.mark() and RDJob.jump() would: moves of zero length are skipped, moves beyond the relative limit
+    are absolute, otherwise relative x, relative y or relative xy.
+
+    @return: unswizzled uint8 array, start offset of each command within that array.
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    cut = np.broadcast_to(np.asarray(cut, dtype=bool), x.shape)
+    dx = x - np.append(x0, x[:-1])
+    dy = y - np.append(y0, y[:-1])
+
+    moving = (dx != 0) | (dy != 0)
+    absolute = moving & ((np.abs(dx) > 8192) | (np.abs(dy) > 8192))
+    relative = moving & ~absolute
+    rel_y = relative & (dx == 0)
+    rel_x = relative & (dy == 0)
+    rel_xy = relative & ~rel_x & ~rel_y
+
+    lengths = np.zeros(len(x), dtype=np.int64)
+    lengths[absolute] = 11
+    lengths[rel_x | rel_y] = 3
+    lengths[rel_xy] = 5
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    out = np.zeros(ends[-1] if len(ends) else 0, dtype=np.uint8)
+
+    # Move opcodes are the cut opcodes less 0x20.
+    opcodes = np.where(cut, 0, MOVE_ABS_XY[0] - CUT_ABS_XY[0]).astype(np.int64)
+    opcodes[absolute] += CUT_ABS_XY[0]
+    opcodes[rel_xy] += CUT_REL_XY[0]
+    opcodes[rel_x] += CUT_REL_X[0]
+    opcodes[rel_y] += CUT_REL_Y[0]
+    out[starts[moving]] = opcodes[moving]
+
+    index = starts[absolute][:, None]
+    out[index + np.arange(1, 6)] = _encode32_array(x[absolute])
+    out[index + np.arange(6, 11)] = _encode32_array(y[absolute])
+    index = starts[rel_xy][:, None]
+    out[index + np.arange(1, 3)] = _encode14_array(dx[rel_xy])
+    out[index + np.arange(3, 5)] = _encode14_array(dy[rel_xy])
+    out[starts[rel_x][:, None] + np.arange(1, 3)] = _encode14_array(dx[rel_x])
+    out[starts[rel_y][:, None] + np.arange(1, 3)] = _encode14_array(dy[rel_y])
+    return out, starts[moving]
+
+
+def encode_moves(x, y, cut, x0=0, y0=0, magic=None):
+    """
+    Bulk encodes moves from x0, y0 through each of the x, y positions. This is equal to calling RDJob.mark() or
+    RDJob.jump() for each position, but the encoding is performed on arrays and returned as one bytes blob.
+
+    @param x: array of x positions, device units
+    @param y: array of y positions, device units
+    @param cut: bool or array of bools, whether each move is a cut
+    @param x0: starting x position
+    @param y0: starting y position
+    @param magic: if given, the blob is swizzled with this magic number
+    @return: bytes of encoded commands
+    """
+    out, starts = _encode_moves(x, y, cut, x0=x0, y0=y0)
+    if magic is not None:
+        lut_swizzle, lut_unswizzle = swizzles_lut(magic)
+        return np.asarray(lut_swizzle, dtype=np.uint8)[out].tobytes()
+    return out.tobytes()
 
 
 def magic_keys():
@@ -1243,10 +1338,10 @@ class RDJob:
             self.channel(f"-**-> {str(bytes(array).hex())}\t({desc})")
 
     def unswizzle(self, data):
-        return bytes([self.lut_unswizzle[b] for b in data])
+        return translate_bytes(data, self.lut_unswizzle)
 
     def swizzle(self, data):
-        return bytes([self.lut_swizzle[b] for b in data])
+        return translate_bytes(data, self.lut_swizzle)
 
     def _calculate_layer_bounds(self, layer):
         max_x = float("-inf")
@@ -1442,6 +1537,29 @@ class RDJob:
             return
         self.cut_rel_xy(dx, dy)
 
+    def moves(self, x, y, cut, x0=0, y0=0, output=None):
+        """
+        Writes moves from x0, y0 through each of the x, y positions, as repeated calls to mark() or jump() would. The
+        commands are encoded in bulk with encode_moves().
+
+        @param x: array of x positions
+        @param y: array of y positions
+        @param cut: bool or array of bools, whether each move is a cut
+        @param x0: starting x position
+        @param y0: starting y position
+        @param output: if given, the swizzled blob is sent to output rather than the buffer.
+        @return:
+        """
+        out, starts = _encode_moves(x, y, cut, x0=x0, y0=y0)
+        if output is not None:
+            output(np.asarray(self.lut_swizzle, dtype=np.uint8)[out].tobytes())
+            return
+        data = out.tobytes()
+        starts = starts.tolist()
+        ends = starts[1:] + [len(data)]
+        with self.lock:
+            self.buffer.extend([data[start:end] for start, end in zip(starts, ends)])
+
     #######################
     # Specific Commands
     #######################
@@ -67,6 +67,7 @@ from meerk40t.svgelements import (
     Matrix,
     Move,
     Path,
+    Point,
     QuadraticBezier,
 )
 from meerk40t.tools.pmatrix import PMatrix
@@ -92,6 +93,12 @@ TYPE_UNTIL = (
 TYPE_CALL = 0xB0 | 0b1111  # The two higher level bytes are call label index.
 # If until is set to 0xFFFF termination only happens on interrupt.
 
+# Tokens of svg path data: commands, numbers and any other character, which is invalid.
+REGEX_PATH_D_TOKEN = re.compile(
+    r"[MmZzLlHhVvCcSsQqTtAa]|[-+]?[0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?|[^ ,\t\n\x0C\x0D]"
+)
+PATH_D_COMMANDS = frozenset("MmZzLlHhVvCcSsQqTtAa")
+
 
 class Polygon:
     def __init__(self, *args):
@@ -1248,11 +1255,14 @@ class Geomstr:
 
     @classmethod
     def svg(cls, path_d):
-        obj = cls()
         if isinstance(path_d, str):
-            path = Path(path_d)
+            try:
+                return cls.path_d(path_d)
+            except ValueError:
+                path = Path(path_d)
         else:
             path = path_d
+        obj = cls()
         last_point = None
         for seg in path:
             if isinstance(seg, Move):
@@ -1288,6 +1298,204 @@ class Geomstr:
             last_point = seg.end
         return obj
 
+    @classmethod
+    def path_d(cls, path_d, arc_error=None):
+        """
+        Parses svg path data directly into geometry, without creating path segments. The geometry is the same as
+        Geomstr.svg(Path(path_d)). If arc_error is given arcs are approximated with cubics, as
+        Path.approximate_arcs_with_cubics(arc_error) does.
+
+        Path data which is invalid or degenerate, such as an inline close or arcs ending at their start, raise a
+        ValueError and are left to svgelements.
+
+        @param path_d: svg path data
+        @param arc_error: error of the cubic approximation of arcs, None to keep arcs.
+        @return: Geomstr
+        """
+        tokens = REGEX_PATH_D_TOKEN.findall(path_d)
+        count = len(tokens)
+        pos = 0
+
+        def number():
+            nonlocal pos
+            if pos >= count:
+                raise ValueError
+            token = tokens[pos]
+            if not token[-1].isdigit():
+                raise ValueError
+            pos += 1
+            return float(token)
+
+        def flag():
+            nonlocal pos, count
+            if pos >= count:
+                raise ValueError
+            token = tokens[pos]
+            if token[0] not in "01":
+                raise ValueError
+            if len(token) != 1:
+                # Flags need no separators, "0110" are the flags 0 and 1 followed by 10.
+                tokens[pos : pos + 1] = [token[0]] + REGEX_PATH_D_TOKEN.findall(
+                    token[1:]
+                )
+                count = len(tokens)
+            pos += 1
+            return token[0] == "1"
+
+        line = complex(TYPE_LINE, 0)
+        quad = complex(TYPE_QUAD, 0)
+        cubic = complex(TYPE_CUBIC, 0)
+        arc = complex(TYPE_ARC, 0)
+        end = complex(TYPE_END, 0)
+        nan = np.nan
+
+        rows = []
+        row = rows.append
+        command = None
+        current = None
+        z_point = None
+        # End of the previous segment, moves to the same point are subpath breaks.
+        last = None
+        # Control point of a previous quad or cubic, for smooth commands.
+        control = None
+        while pos < count:
+            token = tokens[pos]
+            if token in PATH_D_COMMANDS:
+                command = token
+                pos += 1
+                if command == "Z" or command == "z":
+                    if current is None:
+                        raise ValueError
+                    row((current, 0, line, 0, z_point))
+                    current = last = z_point
+                    control = None
+                    continue
+                if current is None and command not in "Mm":
+                    raise ValueError
+            elif command is None or command == "Z" or command == "z":
+                raise ValueError
+            elif command == "M":
+                command = "L"
+            elif command == "m":
+                command = "l"
+            relative = command.islower() and current is not None
+            c = command.upper()
+            if c == "M":
+                x = number()
+                p = complex(x, number())
+                if relative:
+                    p += current
+                current = z_point = p
+                if last is not None and last == current:
+                    row((nan, nan, end, nan, nan))
+                last = current
+                control = None
+            elif c == "L":
+                x = number()
+                p = complex(x, number())
+                if relative:
+                    p += current
+                row((current, 0, line, 0, p))
+                current = last = p
+                control = None
+            elif c == "H":
+                x = number()
+                if relative:
+                    x += current.real
+                p = complex(x, current.imag)
+                row((current, 0, line, 0, p))
+                current = last = p
+                control = None
+            elif c == "V":
+                y = number()
+                if relative:
+                    y += current.imag
+                p = complex(current.real, y)
+                row((current, 0, line, 0, p))
+                current = last = p
+                control = None
+            elif c == "C" or c == "S":
+                if c == "C":
+                    x = number()
+                    c1 = complex(x, number())
+                    if relative:
+                        c1 += current
+                else:
+                    c1 = current if control is None else current + (current - control)
+                x = number()
+                c2 = complex(x, number())
+                if relative:
+                    c2 += current
+                x = number()
+                p = complex(x, number())
+                if relative:
+                    p += current
+                row((current, c1, cubic, c2, p))
+                current = last = p
+                control = c2
+            elif c == "Q" or c == "T":
+                if c == "Q":
+                    x = number()
+                    c1 = complex(x, number())
+                    if relative:
+                        c1 += current
+                else:
+                    c1 = current if control is None else current + (current - control)
+                x = number()
+                p = complex(x, number())
+                if relative:
+                    p += current
+                row((current, c1, quad, c1, p))
+                current = last = p
+                control = c1
+            else:
+                rx = abs(number())
+                ry = abs(number())
+                rotation = number()
+                large_arc = flag()
+                sweep = flag()
+                x = number()
+                p = complex(x, number())
+                if relative:
+                    p += current
+                if p == current or rx == 0 or ry == 0:
+                    raise ValueError
+                segment = Arc(
+                    Point(current.real, current.imag),
+                    rx,
+                    ry,
+                    rotation,
+                    large_arc,
+                    sweep,
+                    (p.real, p.imag),
+                )
+                if arc_error is not None:
+                    required = math.ceil(abs(segment.sweep) / (math.tau * arc_error))
+                    for curve in segment.as_cubic_curves(required):
+                        row(
+                            (
+                                complex(curve.start),
+                                complex(curve.control1),
+                                cubic,
+                                complex(curve.control2),
+                                complex(curve.end),
+                            )
+                        )
+                elif segment.is_circular():
+                    mid = complex(segment.point(0.5))
+                    row((current, mid, arc, mid, p))
+                else:
+                    for curve in segment.as_quad_curves(4):
+                        q = complex(curve.control)
+                        row((complex(curve.start), q, quad, q, complex(curve.end)))
+                current = last = p
+                control = None
+        obj = cls()
+        if rows:
+            obj.segments = np.array(rows, dtype=complex)
+            obj.index = obj.capacity = len(rows)
+        return obj
+
     @classmethod
     def image(cls, pil_image, invert=False, vertical=False, bidirectional=True):
         g = cls()
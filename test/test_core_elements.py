@@ -1,3 +1,4 @@
+import os
 import unittest
 from test import bootstrap
 
@@ -143,3 +144,313 @@ class TestElements(unittest.TestCase):
             kernel_root("grid 2 2 1in 1foo\n")
         finally:
             kernel()
+
+    def test_elements_emphasis_index(self):
+        """
+        Tests the tree index of emphasized nodes follows emphasis changes and node removal.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            for i in range(5):
+                kernel.console(f"rect {i}cm {i}cm 1cm 1cm\n")
+            nodes = list(elements.elems())
+            tree = elements._tree
+            elements.set_emphasis(None)
+            self.assertFalse(elements.has_emphasis())
+            elements.set_emphasis([nodes[1], nodes[3]])
+            self.assertEqual(set(tree.flagged("emphasized")), {nodes[1], nodes[3]})
+            self.assertEqual(set(tree.flagged("selected")), {nodes[1], nodes[3]})
+            self.assertEqual(
+                list(elements.elems(emphasized=True)), [nodes[1], nodes[3]]
+            )
+            elements.validate_selected_area()
+            expected = Node.union_bounds([nodes[1], nodes[3]])
+            for value, check in zip(elements.selected_area(), expected):
+                self.assertAlmostEqual(value, check)
+
+            nodes[3].remove_node()
+            self.assertEqual(tree.flagged("emphasized"), [nodes[1]])
+            elements.set_emphasis(None)
+            self.assertEqual(tree.flagged("emphasized"), [])
+            self.assertEqual(tree.flagged("selected"), [])
+            self.assertFalse(elements.has_emphasis())
+            self.assertEqual(list(elements.elems(emphasized=True)), [])
+            elements.validate_selected_area()
+            self.assertIsNone(elements.selected_area())
+        finally:
+            kernel()
+
+    def test_elements_replace_node_children(self):
+        """
+        Tests children kept by replace_node stay rooted and indexed in the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            tree = elements._tree
+            elements.op_branch.remove_all_children()
+            elements.elem_branch.remove_all_children()
+            op = elements.op_branch.add(type="op cut")
+            for i in range(10):
+                node = elements.elem_branch.add(
+                    type="elem rect", x=i, y=i, width=10, height=10
+                )
+                op.add_reference(node)
+            refs = list(op.children)
+            refs[2].emphasized = True
+            self.assertEqual(tree.flagged("emphasized"), [refs[2]])
+            engrave = op.replace_node(keep_children=True, type="op engrave")
+            self.assertEqual(engrave.children, refs)
+            self.assertEqual(op.children, [])
+            for ref in refs:
+                self.assertIs(ref._root, tree)
+            self.assertEqual(list(elements.flat(types=("reference",))), refs)
+            self.assertEqual(list(tree._types["reference"]), refs)
+            self.assertEqual(tree.flagged("emphasized"), [refs[2]])
+            self.assertNotIn(op, tree._types["op cut"])
+            self.assertIsNone(op._root)
+        finally:
+            kernel()
+
+    def test_elements_type_index(self):
+        """
+        Tests flat() queries answered by the type index of the tree match a full walk of the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            tree = elements._tree
+            for i in range(10):
+                group = elements.elem_branch.add(type="group")
+                for j in range(10):
+                    group.add(type="elem point", x=i, y=j)
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            types = ("op cut", "op engrave", "elem rect", "reference")
+
+            def walk(node):
+                return [n for n in node._flatten(node) if n.type in types]
+
+            self.assertIsNotNone(tree.typed_nodes(types))
+            self.assertEqual(list(tree.flat(types=types)), walk(tree))
+            self.assertEqual(
+                list(elements.op_branch.flat(types=types)), walk(elements.op_branch)
+            )
+            rect = list(elements.elem_branch.flat(types=("elem rect",)))[0]
+            op = elements.op_branch.children[-1]
+            op.swap_node(elements.op_branch.children[0])
+            self.assertEqual(list(tree.flat(types=types)), walk(tree))
+            ref = rect._references[0]
+            op = ref.parent
+            replaced = op.replace_node(
+                keep_children=True,
+                type="op engrave" if op.type == "op cut" else "op cut",
+            )
+            self.assertIs(ref.parent, replaced)
+            self.assertIn(ref, tree.typed_nodes(types))
+            self.assertNotIn(op, tree.typed_nodes(types))
+            self.assertEqual(list(tree.flat(types=types)), walk(tree))
+            rect.remove_node()
+            self.assertNotIn(rect, tree.typed_nodes(types))
+            self.assertEqual(list(tree.flat(types=types)), walk(tree))
+        finally:
+            kernel()
+
+
+class TestUndo(unittest.TestCase):
+    def test_undo_shared_states(self):
+        """
+        Tests undo states share unchanged nodes, restore the tree and are limited in depth.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            undo = elements.undo
+            undo.levels = 4
+            elements.do_undo = False  # Only the marks made here.
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            kernel.console("circle 3cm 3cm 1cm\n")
+            undo.mark("two")
+            rect, circle = list(elements.elems())
+            rect.matrix.post_translate(1000, 0)
+            rect.modified()
+            undo.mark("moved")
+            before, after = undo._undo_stack[-2:]
+            self.assertNotIn(id(rect), [id(c) for c in after.copies])
+            self.assertEqual(len(before.copies), len(after.copies))
+            shared = {id(c) for c in before.copies} & {id(c) for c in after.copies}
+            self.assertEqual(len(shared), len(after.copies) - 1)
+
+            self.assertTrue(undo.undo())
+            restored = list(elements.elems())
+            self.assertEqual(len(restored), 2)
+            self.assertNotIn(rect, restored)
+            self.assertEqual(restored[0].matrix.value_trans_x(), 0)
+            self.assertTrue(undo.redo())
+            self.assertEqual(list(elements.elems())[0].matrix.value_trans_x(), 1000)
+
+            for i in range(10):
+                undo.mark(str(i))
+            self.assertEqual(len(undo._undo_stack), 4)
+            self.assertEqual(str(undo._undo_stack[-1]), "9")
+            self.assertGreater(undo.memory_used, 0)
+        finally:
+            kernel()
+
+    def test_undo_unnotified_changes(self):
+        """
+        Tests undo states hold properties set without notifying the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            undo = elements.undo
+            elements.do_undo = False  # Only the marks made here.
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            undo.mark("rect")
+            op = list(elements.ops())[0]
+            node = list(elements.elems())[0]
+            speed = op.speed + 1
+            stroke_width = node.stroke_width + 1000
+            op.speed = speed
+            node.stroke_width = stroke_width
+            node.label = "changed"
+            elements.signal("element_property_reload", [op, node])
+            undo.mark("changed")
+
+            self.assertTrue(undo.undo())
+            self.assertTrue(undo.redo())
+            op = list(elements.ops())[0]
+            node = list(elements.elems())[0]
+            self.assertEqual(op.speed, speed)
+            self.assertEqual(node.stroke_width, stroke_width)
+            self.assertEqual(node.label, "changed")
+        finally:
+            kernel()
+
+
+class TestTreeBulk(unittest.TestCase):
+    def test_tree_bulk(self):
+        """
+        Tests nodes added within a bulk are notified together when it ends.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            tree = elements._tree
+
+            class Listener:
+                def __init__(self):
+                    self.events = []
+
+                def node_attached(self, node, **kwargs):
+                    self.events.append(("attached", node))
+
+                def modified(self, node, **kwargs):
+                    self.events.append(("modified", node))
+
+            class BulkListener(Listener):
+                def nodes_added(self, nodes):
+                    self.events.append(("added", list(nodes)))
+
+            listener = Listener()
+            bulk_listener = BulkListener()
+            tree.listen(listener)
+            tree.listen(bulk_listener)
+            with tree.bulk():
+                group = elements.elem_branch.add(type="group")
+                rect = group.add(type="elem rect", x=0, y=0, width=10, height=10)
+                rect.modified()
+                with tree.bulk():
+                    line = elements.elem_branch.add(type="elem line")
+                self.assertEqual(listener.events, [])
+                self.assertEqual(bulk_listener.events, [])
+            self.assertEqual(bulk_listener.events, [("added", [group, line])])
+            self.assertEqual(
+                listener.events,
+                [("attached", group), ("attached", rect), ("attached", line)],
+            )
+
+            # Removing nodes first notifies the nodes added so far.
+            bulk_listener.events.clear()
+            with tree.bulk():
+                circle = elements.elem_branch.add(type="elem ellipse")
+                line.remove_node()
+                self.assertEqual(bulk_listener.events, [("added", [circle])])
+            self.assertEqual(bulk_listener.events, [("added", [circle])])
+
+            # Inserted in their insert order, the added nodes build a view matching the tree.
+            branch = elements.elem_branch
+            view = {id(branch): list(branch.children), id(group): list(group.children)}
+            bulk_listener.events.clear()
+            with tree.bulk():
+                second = branch.add(type="elem line", pos=0)
+                first = branch.add(type="elem line", pos=0)
+                last = branch.add(type="elem line")
+                inner = group.add(type="elem line", pos=0)
+            ((_, added),) = bulk_listener.events
+            self.assertEqual(set(added), {first, second, last, inner})
+            for node, pos in tree.insert_order(added):
+                view[id(node.parent)].insert(pos, node)
+            self.assertEqual(view[id(branch)], branch.children)
+            self.assertEqual(view[id(group)], group.children)
+            self.assertEqual(branch.children[:2], [first, second])
+            tree.unlisten(listener)
+            tree.unlisten(bulk_listener)
+        finally:
+            kernel()
+
+
+class TestAutosave(unittest.TestCase):
+    def test_autosave(self):
+        """
+        Tests the autosave writes the tree once enough changes were made.
+        """
+        file1 = "test-autosave.mkp"
+        self.addCleanup(os.remove, file1)
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            autosave = elements.autosave
+            autosave.filename = file1
+            elements.autosave_changes = 3
+            elements.autosave_interval = 1000
+            autosave.changes = 0
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            kernel.console("circle 3cm 3cm 1cm\n")
+            self.assertGreaterEqual(autosave.changes, 2)
+            autosave.changes = 1
+            self.assertIsNone(autosave.check())
+            self.assertFalse(os.path.exists(file1))
+
+            kernel.console("line 0 0 1cm 1cm\n")
+            autosave.check().join()
+            self.assertEqual(autosave.changes, 0)
+            self.assertTrue(os.path.exists(file1))
+
+            saved = [e.type for e in elements.elems()]
+            elements.elem_branch.remove_all_children()
+            kernel.console(f"load {file1}\n")
+            self.assertEqual([e.type for e in elements.elems()], saved)
+
+            # Properties edited without notifying the tree are counted and saved.
+            op = list(elements.ops())[0]
+            node = list(elements.elems())[0]
+            speed = op.speed + 1
+            stroke_width = node.stroke_width + 1000
+            kernel.process_queue()
+            autosave.changes = 0
+            elements.autosave_changes = 1
+            op.speed = speed
+            node.stroke_width = stroke_width
+            elements.signal("element_property_reload", [op, node])
+            kernel.process_queue()
+            self.assertEqual(autosave.changes, 1)
+            autosave.check().join()
+            elements.elem_branch.remove_all_children()
+            elements.op_branch.remove_all_children()
+            kernel.console(f"load {file1}\n")
+            self.assertEqual(list(elements.ops())[0].speed, speed)
+            self.assertEqual(list(elements.elems())[0].stroke_width, stroke_width)
+        finally:
+            kernel()
@@ -164,3 +164,123 @@ class TestDriverGalvoRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(lmc_rect, data)
         self.assertEqual(lmc_rect_rotary, data)
+
+
+class TestDriverGalvoBulk(unittest.TestCase):
+    def test_driver_mark_bulk(self):
+        """
+        Marks the same points with power changes with mark() and with mark_bulk(), including repeated and fractional
+        points. The list packets produced must be identical.
+        @return:
+        """
+        import random
+
+        from meerk40t.balormk.driver import BalorDriver
+
+        random.seed(5)
+        points = []
+        for i in range(1000):
+            x = i * 0x40
+            y = random.randint(0, 0xFF) * 0x100
+            power = random.choice((10.0, 25.0, 50.0, 100.0))
+            points.append((x, y, power))
+        x, y, power = points[-1]
+        points.append((x, y, power))  # Repeated point.
+        points.append((-5, 20, power))  # Out of range point.
+        for i in range(200):
+            # Fractional points, compared and measured like mark() does.
+            x = random.randint(0, 0xFFFF) + random.choice((0.0, 0.25, 0.5, 0.75))
+            y = random.randint(0, 0xFFFF) + random.choice((0.0, 0.5))
+            points.append((x, y, power))
+            if i % 3 == 0:
+                points.append((x, y, power))
+            if i % 5 == 0:
+                points.append((int(x), int(y), power))
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            packets = []
+            for bulk in (False, True):
+                data = bytearray()
+                driver = BalorDriver(kernel.device, force_mock=True)
+                con = driver.connection
+                con.connect_if_needed()
+
+                def write(index, cmd):
+                    if len(cmd) == 0xC00:
+                        data.extend(cmd)
+
+                con.connection.write = write
+                con.raw_mode()
+                con.raw_clear()
+                con._frequency = 30.0
+                if bulk:
+                    con.mark_bulk(
+                        [p[0] for p in points],
+                        [p[1] for p in points],
+                        [p[2] for p in points],
+                    )
+                else:
+                    for x, y, power in points:
+                        con.power(power)
+                        con.mark(x, y)
+                con.list_end_of_list()
+                con._list_end()
+                packets.append(data)
+            self.assertGreater(len(packets[0]), 0xC00)
+            self.assertEqual(packets[0], packets[1])
+        finally:
+            kernel()
+
+    def test_driver_list_sender(self):
+        """
+        Streams several list packets through the sender thread. All packets must arrive in order and the queue must be
+        drained when returning to rapid mode, or when waiting for the controller to finish.
+        @return:
+        """
+        import struct
+        import time
+
+        from meerk40t.balormk.controller import listMarkTo
+        from meerk40t.balormk.driver import BalorDriver
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            driver = BalorDriver(kernel.device, force_mock=True)
+            con = driver.connection
+            con.connect_if_needed()
+            marks = []
+
+            def write(index, cmd):
+                if len(cmd) != 0xC00:
+                    return
+                for i in range(0, len(cmd), 12):
+                    v = struct.unpack("<6H", cmd[i : i + 12])
+                    if v[0] == listMarkTo:
+                        marks.append(v[1])
+
+            con.connection.write = write
+            con.program_mode()
+            xs = [i * 0x10 for i in range(1, 3000)]
+            con.mark_bulk(xs, [0x8000] * len(xs))
+            con.rapid_mode()
+            self.assertEqual(marks, xs)
+            self.assertTrue(con._list_queue.empty())
+            self.assertIsNone(con._list_sender_thread)
+
+            # Waiting for the controller to finish first sends the queued packets.
+            def slow_write(index, cmd):
+                time.sleep(0.01)
+                write(index, cmd)
+
+            con.connection.write = slow_write
+            con.program_mode()
+            con.mark_bulk(xs, [0x8000] * len(xs))
+            con.wait_finished()
+            self.assertTrue(con._list_queue.empty())
+            self.assertIsNone(con._list_sender_thread)
+            con.rapid_mode()
+        finally:
+            kernel()
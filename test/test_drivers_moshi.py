@@ -213,3 +213,35 @@ class TestDriverMoshiRotary(unittest.TestCase):
             data = f.read()
         self.assertNotEqual(mos_rect, data)
         self.assertEqual(mos_rect_rotary, data)
+
+
+class TestMoshiBuilder(unittest.TestCase):
+    def test_raster_row(self):
+        """
+        A bulk encoded raster row must equal the individually written transitions.
+        """
+        from meerk40t.moshi.builder import MoshiBuilder
+
+        positions = [10, 250, 40000, -40000, 5, 1000, 1001]
+        cuts = [1, 0, 1, 1, 0, 0, 1]
+        for vertical in (False, True):
+            single = MoshiBuilder()
+            single.raster_speed(100)
+            single.set_offset(0, 3, 7)
+            for p, cut in zip(positions, cuts):
+                if vertical:
+                    if cut:
+                        single.cut_vertical_abs(p)
+                    else:
+                        single.move_vertical_abs(p)
+                else:
+                    if cut:
+                        single.cut_horizontal_abs(p)
+                    else:
+                        single.move_horizontal_abs(p)
+
+            bulk = MoshiBuilder()
+            bulk.raster_speed(100)
+            bulk.set_offset(0, 3, 7)
+            bulk.raster_row(positions, cuts, vertical=vertical)
+            self.assertEqual(bulk.data, single.data)
@@ -3,6 +3,7 @@ from random import Random
 from test import bootstrap
 
 from meerk40t.core.elements.element_types import elem_nodes, op_nodes
+from meerk40t.svgelements import Color
 
 
 class TestElementClassification(unittest.TestCase):
@@ -95,3 +96,52 @@ class TestElementClassification(unittest.TestCase):
             self.assertEqual(len(results), 100)
         finally:
             kernel()
+
+    def test_element_classification_batch(self):
+        """
+        Test classifying a batch of elements gives the same operations as classifying them one by one.
+
+        :return:
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            colors = ("red", "blue", "black", "#123456", None)
+            nodes = []
+            for i in range(60):
+                stroke = colors[i % len(colors)]
+                fill = colors[(i // len(colors)) % len(colors)]
+                nodes.append(
+                    elements.elem_branch.add(
+                        type="elem rect",
+                        x=i,
+                        y=0,
+                        width=10,
+                        height=10,
+                        stroke=None if stroke is None else Color(stroke),
+                        fill=None if fill is None else Color(fill),
+                    )
+                )
+
+            def classified():
+                return [
+                    sorted(
+                        (ref.parent.type, str(ref.parent.color))
+                        for ref in node._references
+                    )
+                    for node in nodes
+                ]
+
+            kernel.root("operation* delete\n")
+            elements.classify(nodes)
+            batch = classified()
+            batch_ops = len(list(elements.ops()))
+
+            kernel.root("operation* delete\n")
+            self.assertEqual(classified(), [[]] * len(nodes))
+            for node in nodes:
+                elements.classify([node])
+            self.assertEqual(classified(), batch)
+            self.assertEqual(len(list(elements.ops())), batch_ops)
+        finally:
+            kernel()
@@ -0,0 +1,97 @@
+import os
+import unittest
+from test import bootstrap
+
+import ezdxf
+import ezdxf.bbox
+import numpy as np
+
+from meerk40t.dxf.dxf_io import DXFProcessor, convert_primitive, convert_primitives
+from meerk40t.tools.geomstr import Geomstr
+
+
+def dxf_document():
+    doc = ezdxf.new()
+    block = doc.blocks.new(name="B")
+    block.add_open_spline([(0, 0), (5, 10), (10, -10), (15, 0)])
+    msp = doc.modelspace()
+    msp.add_spline([(0, 0), (10, 5), (20, -5), (30, 0), (40, 8)])
+    msp.add_circle((50, 50), 10)
+    msp.add_lwpolyline(
+        [(0, 0, 1), (10, 0, 0), (10, 10, -0.5), (0, 10, 0)], format="xyb", close=True
+    )
+    msp.add_line((0, 0), (20, 20))
+    hatch = msp.add_hatch()
+    hatch.paths.add_polyline_path([(0, 0, 0.3), (5, 0), (5, 5)], is_closed=True)
+    edges = hatch.paths.add_edge_path()
+    edges.add_line((10, 0), (14, 0))
+    edges.add_arc((14, 2), 2, -90, 90)
+    edges.add_ellipse((12, 4), (2, 0), 0.5, 0, 180)
+    msp.add_blockref("B", (100, 100))
+    return doc
+
+
+class TestFileDxf(unittest.TestCase):
+    def test_dxf_primitives(self):
+        """
+        test that splines, hatches and polylines with arcs are converted to geometries of the extents of the entities,
+        the same in worker processes.
+        """
+        doc = dxf_document()
+        processor = DXFProcessor(None, doc)
+        primitives = []
+        for entity in doc.modelspace():
+            primitive = processor.primitive(entity)
+            if primitive is None:
+                continue
+            primitives.append(primitive)
+            geometry = Geomstr(convert_primitive(primitive))
+            extents = ezdxf.bbox.extents([entity], fast=False)
+            expected = (
+                extents.extmin.x,
+                extents.extmin.y,
+                extents.extmax.x,
+                extents.extmax.y,
+            )
+            for value, expected_value in zip(geometry.bbox(), expected):
+                self.assertAlmostEqual(value, expected_value, delta=1e-6)
+        self.assertEqual([p[0] for p in primitives], ["path", "polyline", "paths"])
+        converted = convert_primitives(primitives, processes=1)
+        for segments, pooled in zip(
+            converted, convert_primitives(primitives, processes=2)
+        ):
+            self.assertTrue(np.array_equal(segments, pooled, equal_nan=True))
+
+    def test_load_dxf(self):
+        """
+        test that the nodes of a loaded dxf are in the order of the entities.
+        """
+        file1 = "test.dxf"
+        self.addCleanup(os.remove, file1)
+        dxf_document().saveas(file1)
+
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console(f"load {file1}\n")
+            file_node = elements.elem_branch.children[-1]
+            self.assertEqual(
+                [node.type for node in file_node.children],
+                [
+                    "elem path",
+                    "elem ellipse",
+                    "elem path",
+                    "elem line",
+                    "elem path",
+                    "group",
+                ],
+            )
+            self.assertEqual(
+                [node.type for node in file_node.children[-1].children],
+                ["elem path"],
+            )
+            for node in file_node.flat(types="elem path"):
+                self.assertTrue(node.geometry.index)
+                self.assertIsNotNone(node.stroke)
+        finally:
+            kernel()
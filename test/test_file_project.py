@@ -0,0 +1,79 @@
+import os
+import unittest
+from test import bootstrap
+
+from PIL import Image
+
+from meerk40t.tools.geomstr import Geomstr
+
+
+class TestFileProject(unittest.TestCase):
+    def test_load_save_project(self):
+        """
+        test that saving and loading a project file restores the elements, operations and references.
+        """
+        file1 = "test.mkp"
+        self.addCleanup(os.remove, file1)
+
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console("rect 2cm 2cm 1cm 1cm stroke red\n")
+            kernel.console("circle 3cm 3cm 1cm fill blue\n")
+            kernel.console("text hello\n")
+            kernel.console("element* hatch\n")
+            geometry = Geomstr.svg("M0,0 L1000,1000 Q2000,0 3000,1000 Z")
+            elements.elem_branch.add(type="elem path", geometry=geometry, label="P")
+            image = Image.new("RGBA", (40, 30), "red")
+            elements.elem_branch.add(type="elem image", image=image, dpi=333)
+            elements.note = "Project note"
+
+            def tree():
+                nodes = []
+                for node in elements._tree.flat():
+                    if node.type == "root":
+                        continue
+                    values = {
+                        k: str(v)
+                        for k, v in node.node_dict.items()
+                        if k not in ("geometry", "image", "node")
+                    }
+                    if node.type == "reference":
+                        values["node"] = str(node.node.id)
+                    if hasattr(node, "geometry"):
+                        g = node.geometry
+                        values["geometry"] = str(g.segments[: g.index].tolist())
+                    if node.type == "elem image":
+                        values["image"] = str(list(node.image.getdata()))
+                    nodes.append((node.type, values))
+                return nodes
+
+            def load():
+                elements.elem_branch.remove_all_children()
+                elements.op_branch.remove_all_children()
+                elements.note = None
+                kernel.console(f"load {file1}\n")
+                return tree()
+
+            kernel.console(f"save {file1}\n")
+            saved = tree()
+            loaded = load()
+            self.assertEqual(len(loaded), len(saved))
+            for (saved_type, saved_values), (loaded_type, values) in zip(
+                saved, loaded
+            ):
+                # Operations are recreated with their default settings.
+                self.assertEqual(saved_type, loaded_type)
+                for key in ("id", "label", "geometry", "image", "node", "matrix"):
+                    self.assertEqual(saved_values.get(key), values.get(key))
+            self.assertIn("reference", [t for t, v in saved])
+            self.assertEqual(elements.note, "Project note")
+            for node in elements.elem_branch.flat(types="elem image"):
+                self.assertEqual(node.image.size, (40, 30))
+                self.assertEqual(node.dpi, 333)
+
+            # Loaded projects are saved and loaded unchanged.
+            kernel.console(f"save {file1}\n")
+            self.assertEqual(load(), loaded)
+        finally:
+            kernel()
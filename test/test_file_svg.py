@@ -3,7 +3,9 @@ import unittest
 from test import bootstrap
 
 from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.svg_io import SVGProcessor
 from meerk40t.core.units import Length
+from meerk40t.svgelements import SVG
 
 
 class TestFileSVG(unittest.TestCase):
@@ -174,3 +176,63 @@ class TestFileSVG(unittest.TestCase):
             self.assertEqual(len(list(engrave[0].flat(types="effect wobble"))), 1)
         finally:
             kernel()
+
+    def test_load_svg_stream(self):
+        """
+        test that streaming an svg file gives the same nodes as parsing it as a whole.
+        """
+        file1 = "test-stream.svg"
+        self.addCleanup(os.remove, file1)
+        with open(file1, "w") as f:
+            f.write(
+                """<?xml version="1.0"?>
+            <svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" width="100mm" height="80mm" viewBox="0 0 100 80" color="blue">
+            <defs><rect id="unused" width="5" height="5"/></defs>
+            <g id="layer1" inkscape:label="Layer 1" transform="translate(5,5)" stroke="red" style="fill:none;stroke-width:0.5">
+            <path id="p1" d="M0,0 L10,10 A5,5 0 0 1 20,10 C 25,0 30,0 35,10 Z"/>
+            <rect x="10" y="10" width="20" height="10" rx="2" fill="currentColor"/>
+            <g transform="scale(2)"><circle cx="10" cy="10" r="3" stroke="#00ff00"/><ellipse cx="20" cy="10" rx="3" ry="2"/></g>
+            <line x1="0" y1="0" x2="10" y2="0" stroke-linecap="round"/>
+            <polyline points="0,0 5,5 10,0"/><polygon points="0,0 5,5 10,0"/>
+            <path d="M 3,3 Z"/>
+            <text x="5" y="5" font-size="4">Hello<tspan x="5" y="10">World</tspan></text>
+            </g>
+            </svg>"""
+            )
+
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+
+            def loaded():
+                nodes = []
+                for node in elements.elem_branch.flat():
+                    values = {
+                        k: str(v)
+                        for k, v in vars(node).items()
+                        if not k.startswith("_") and k != "geometry"
+                    }
+                    if hasattr(node, "geometry"):
+                        g = node.geometry
+                        values["geometry"] = str(g.segments[: g.index].tolist())
+                    nodes.append(values)
+                return nodes
+
+            processor = SVGProcessor(elements, True)
+            self.assertTrue(processor.process_stream(file1, file1))
+            streamed = loaded()
+            self.assertEqual(len(list(elements.elems())), 10)
+
+            elements.elem_branch.remove_all_children()
+            svg = SVG.parse(file1, reify=False)
+            SVGProcessor(elements, True).process(svg, file1)
+            self.assertEqual(loaded(), streamed)
+
+            # Files of meerk40t are not streamed.
+            elements.elem_branch.remove_all_children()
+            kernel.console(f"save {file1}\n")
+            processor = SVGProcessor(elements, True)
+            self.assertFalse(processor.process_stream(file1, file1))
+            self.assertEqual(len(list(elements.elems())), 0)
+        finally:
+            kernel()
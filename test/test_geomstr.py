@@ -9,7 +9,14 @@ import numpy as np
 
 from meerk40t.fill.fills import scanline_fill
 from meerk40t.fill.patterns import set_diamond1, set_line
-from meerk40t.svgelements import Arc, CubicBezier, Line, Matrix, QuadraticBezier
+from meerk40t.svgelements import (
+    Arc,
+    CubicBezier,
+    Line,
+    Matrix,
+    Path,
+    QuadraticBezier,
+)
 from meerk40t.tools.geomstr import (
     TYPE_LINE,
     TYPE_POINT,
@@ -1554,6 +1561,34 @@ class TestGeomstr(unittest.TestCase):
         gs = Geomstr.svg("M0,0 h100 v100 h-100 v-100 z")
         self.assertEqual(gs.raw_length(), 400.0)
 
+    def test_geomstr_path_d(self):
+        """
+        Test the path data parser gives the same geometry as the svgelements Path.
+        """
+        for d in (
+            "M0,0 h100 v100 h-100 v-100 z",
+            "m10 10 20 0 0 20z m5 5 l1-1 1e1.5 M 0,0",
+            "M0,0 C10,0 20,10 20,20 S30,40 40,40 s10,10 20,0",
+            "M0,0 Q10,0 20,20 T40,40 t10,0 q5,5 10,0",
+            "M0,0 A50,25 30 1 1 100,0 a20,20 0 0,0 40,0 A10 10 0 0150 50",
+            "M0 0L10 10M10 10L20 0M30 30",
+        ):
+            gs = Geomstr.path_d(d)
+            expected = Geomstr.svg(Path(d))
+            np.testing.assert_array_equal(
+                gs.segments[: gs.index], expected.segments[: expected.index]
+            )
+            path = Path(d)
+            path.approximate_arcs_with_cubics(error=0.1)
+            gs = Geomstr.path_d(d, arc_error=0.1)
+            expected = Geomstr.svg(path)
+            np.testing.assert_array_equal(
+                gs.segments[: gs.index], expected.segments[: expected.index]
+            )
+        for d in ("L10,10", "M0,0 L10", "M0,0 X10,10"):
+            with self.assertRaises(ValueError):
+                Geomstr.path_d(d)
+
     def test_geomstr_near(self):
         """
         Test geomstr near command to find number of segment points within a given range.
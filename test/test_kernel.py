@@ -52,6 +52,29 @@ class TestKernel(unittest.TestCase):
         finally:
             kernel()
 
+    def test_command_index(self):
+        """
+        Test the console dispatch index follows command registration and removal.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+
+            @kernel.console_command("indexed", hidden=True)
+            def indexed(**kwargs):
+                return "elements", "exact"
+
+            @kernel.console_command("indexed_.*", regex=True, hidden=True)
+            def indexed_regex(command, **kwargs):
+                return "elements", command
+
+            self.assertEqual(kernel.root("indexed"), "exact")
+            self.assertEqual(kernel.root("indexed_two"), "indexed_two")
+            kernel.console_command_remove("indexed")
+            self.assertIsNone(kernel.root("indexed"))
+            self.assertEqual(kernel.root("indexed_three"), "indexed_three")
+        finally:
+            kernel()
+
     def test_kernel_commands(self):
         """
         Tests all commands with no arguments to test for crashes...
@@ -167,6 +190,348 @@ class TestKernel(unittest.TestCase):
             kernel()
 
 
+class TestScheduler(unittest.TestCase):
+    def test_scheduler_jobs(self):
+        """
+        Test scheduled jobs run when due, in their assigned thread, and stop when unscheduled.
+        """
+        import threading
+        import time
+
+        kernel = bootstrap.bootstrap()
+        try:
+            ran = []
+            done = threading.Event()
+
+            def poll():
+                ran.append(threading.current_thread().name)
+                if len(ran) == 5:
+                    done.set()
+
+            job = kernel.add_job(
+                poll, name="test.poll", interval=0.01, thread="test-poll"
+            )
+            self.assertTrue(done.wait(5))
+            kernel.unschedule(job)
+            self.assertEqual(set(ran[:5]), {"Scheduler-test-poll"})
+            count = len(ran)
+            time.sleep(0.1)
+            self.assertLessEqual(len(ran), count + 1)
+
+            once = threading.Event()
+            kernel.add_job(once.set, name="test.once", interval=0.05, times=1)
+            self.assertTrue(once.wait(5))
+            self.assertNotIn("test.once", kernel.jobs)
+
+            # The signal job is only scheduled while signals are queued.
+            signalled = threading.Event()
+            kernel.listen("test_wake", lambda origin, *message: signalled.set())
+            for _ in range(100):
+                if "kernel.signals" not in kernel.jobs:
+                    break
+                time.sleep(0.01)
+            self.assertNotIn("kernel.signals", kernel.jobs)
+            kernel.signal("test_wake", "/", True)
+            self.assertIn("kernel.signals", kernel.jobs)
+            self.assertTrue(signalled.wait(5))
+        finally:
+            kernel()
+
+
+class TestBatch(unittest.TestCase):
+    def test_batch_console(self):
+        """
+        Test a console batch defers signals and deferred calls until the batch ends.
+        """
+        import time
+
+        kernel = bootstrap.bootstrap()
+        try:
+            received = []
+
+            def listener(origin, *message):
+                received.append(message)
+
+            kernel.listen("test_batch", listener)
+            kernel.process_queue()
+            calls = []
+            runs = []
+
+            @kernel.console_command("batchtest")
+            def batchtest(**kwargs):
+                runs.append(None)
+                kernel.signal("test_batch", "/", len(runs))
+                kernel.batch_call(calls.append, "deferred")
+                self.assertFalse(kernel.signal_job.conditional())
+
+            timings = kernel.batch_console(["batchtest", "", "batchtest", "batchtest"])
+            self.assertEqual([command for command, t in timings], ["batchtest"] * 3)
+            self.assertEqual(calls, ["deferred"])
+            self.assertFalse(kernel.batching)
+            for _ in range(100):
+                if received:
+                    break
+                time.sleep(0.01)
+            kernel.process_queue()
+            self.assertEqual(received, [(3,)])
+            kernel.batch_call(calls.append, "now")
+            self.assertEqual(calls, ["deferred", "now"])
+        finally:
+            kernel()
+
+
+class TestLifecycleProfile(unittest.TestCase):
+    def test_lifecycle_profile(self):
+        """
+        Test plugin and object lifecycle calls are recorded in the lifecycle profile.
+        """
+        import json
+        import os
+        import tempfile
+
+        kernel = bootstrap.bootstrap()
+        try:
+            summary = kernel.lifecycle_profile.summary()
+            lifecycles = {(entry[0], entry[1]) for entry in summary}
+            self.assertIn(("boot", "meerk40t.core.planner.plugin"), lifecycles)
+            self.assertIn(("boot", "meerk40t.kernel.kernel.Kernel.boot"), lifecycles)
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "lifecycles.json")
+                kernel.console(f"lifecycles -o {filename}\n")
+                with open(filename) as f:
+                    report = json.load(f)
+            self.assertEqual(len(report["records"]), len(report["traceEvents"]))
+        finally:
+            kernel()
+
+
+class TestSignals(unittest.TestCase):
+    def test_signal_listener_timing(self):
+        """
+        Test listener timings are recorded and asynchronous listeners keep signal order.
+        """
+        import threading
+
+        kernel = bootstrap.bootstrap()
+        try:
+            received = []
+            delivered = []
+            done = threading.Event()
+
+            def sync_listener(origin, *message):
+                received.append(message[0])
+
+            def async_listener(origin, *message):
+                delivered.append((threading.current_thread().name, message[0]))
+                if message[0] == 9:
+                    done.set()
+
+            async_listener.signal_async = True
+            kernel.listen("test;timing", sync_listener)
+            kernel.listen("test;timing", async_listener)
+            for i in range(10):
+                kernel.signal("test;timing", "/", i)
+                kernel.process_queue()
+            self.assertTrue(done.wait(5))
+            self.assertEqual(received, list(range(10)))
+            self.assertEqual([m for t, m in delivered], list(range(10)))
+            self.assertTrue(all(t.startswith("Signal") for t, m in delivered))
+            stats = {
+                name.split(":")[-1]: calls
+                for signal, name, calls, total, worst in kernel.listener_stats()
+                if signal == "test;timing"
+            }
+            self.assertEqual(
+                stats,
+                {
+                    sync_listener.__qualname__: 10,
+                    async_listener.__qualname__: 10,
+                },
+            )
+            kernel.console("listeners --sort max\n")
+            kernel.unlisten("test;timing", sync_listener)
+            kernel.unlisten("test;timing", async_listener)
+        finally:
+            kernel()
+
+
+class TestRegistry(unittest.TestCase):
+    def test_registry_matching(self):
+        """
+        Test registry matching gives the same paths, in the same order, as a full regex scan.
+        """
+        import re
+
+        from meerk40t.kernel.registry import Registry
+
+        registry = Registry()
+        paths = [
+            "command/None/scale",
+            "command/elements/scale",
+            "command/elements/rotate",
+            "format/op cut",
+            "format/op engrave",
+            "button/basicediting/Undo",
+            "tree/op cut/Remove",
+            "feature/x",
+            "commander",
+        ]
+        for i, p in enumerate(paths):
+            registry[p] = i
+        del registry["format/op cut"]
+        registry["format/op cut"] = 10
+        registry.pop("feature/x")
+        patterns = [
+            "",
+            ".*",
+            "command",
+            "command/elements/.*",
+            "command/elements/sc.*",
+            "format/op c?ut",
+            "format/(.*)",
+            "tree/op cut/.*|button/.*",
+            "button/basicediting/Undo$",
+            "feature/x",
+            "missing/.*",
+        ]
+        for pattern in patterns:
+            match = re.compile(pattern)
+            expected = [r for r in registry if match.match(r)]
+            self.assertEqual(registry.matching(pattern), expected, pattern)
+
+    def test_registry_lazy_import(self):
+        """
+        Test lazily registered objects are imported when they are looked up.
+        """
+        from meerk40t.kernel import LazyImport
+        from meerk40t.kernel.registry import Registry
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.register(
+                "test/lazy", LazyImport("meerk40t.kernel.registry", "Registry")
+            )
+            self.assertIs(kernel.lookup("test/lazy"), Registry)
+            self.assertEqual(list(kernel.lookup_all("test/.*")), [Registry])
+            self.assertIs(kernel._registered["test/lazy"], Registry)
+            provider = kernel.lookup("provider/device/grbl")
+            self.assertEqual(provider.__name__, "GRBLDevice")
+        finally:
+            kernel()
+
+
+class TestSettings(unittest.TestCase):
+    def test_settings_database(self):
+        """
+        Test the settings database imports the .cfg file and writes only changed keys.
+        """
+        import os
+        import sqlite3
+        import tempfile
+        from pathlib import Path
+
+        from meerk40t.kernel import Settings
+
+        with tempfile.TemporaryDirectory() as directory:
+            ini = Settings("meerk40t", "test.cfg", ignore_settings=True)
+            ini._config_file = Path(directory, "test.cfg")
+            ini.write_persistent("device", "speed", 20.5)
+            ini.write_persistent("device", "label", "100%")
+            ini.write_persistent("operation 0001", "passes", 2)
+            ini.write_configuration()
+
+            settings = Settings("meerk40t", "test.db", ignore_settings=True)
+            settings._config_file = Path(directory, "test.db")
+            settings.read_configuration()
+            self.assertEqual(settings.read_persistent(float, "device", "speed"), 20.5)
+            self.assertEqual(settings.read_persistent(str, "device", "label"), "100%")
+            settings.write_configuration()
+            self.assertTrue(os.path.exists(settings._config_file))
+
+            settings.write_persistent("device", "speed", 30.0)
+            settings.delete_persistent("operation 0001", "passes")
+            connection = sqlite3.connect(str(settings._config_file))
+            try:
+                settings.write_configuration()
+                connection.execute("UPDATE settings SET value = 'x' WHERE key = 'label'")
+                connection.commit()
+                settings.write_configuration()  # Nothing changed, nothing written.
+                rows = connection.execute(
+                    "SELECT section, key, value FROM settings ORDER BY key"
+                ).fetchall()
+            finally:
+                connection.close()
+            self.assertEqual(
+                rows, [("device", "label", "x"), ("device", "speed", "30.0")]
+            )
+
+            reloaded = Settings("meerk40t", "test.db", ignore_settings=True)
+            reloaded._config_file = Path(directory, "test.db")
+            reloaded.read_configuration()
+            self.assertEqual(reloaded.read_persistent(float, "device", "speed"), 30.0)
+            self.assertIsNone(
+                reloaded.read_persistent(int, "operation 0001", "passes")
+            )
+
+
+class TestChannel(unittest.TestCase):
+    def test_channel_buffer_and_log(self):
+        """
+        Test channel buffers are limited by size and channel logs rotate.
+        """
+        import os
+        import tempfile
+
+        from meerk40t.kernel import Channel, ChannelLog, read_channel_log
+
+        chan = Channel("test", buffer_size=100, buffer_bytes=10)
+        for i in range(10):
+            chan(f"{i:03d}", indent=False)
+        self.assertEqual(list(chan.buffer), ["007", "008", "009"])
+        chan(b"0123456789ABCDEF")
+        self.assertEqual(list(chan.buffer), [b"0123456789ABCDEF"])
+        chan.set_buffer(buffer_size=2)
+        chan("a", indent=False)
+        chan("b", indent=False)
+        chan("c", indent=False)
+        self.assertEqual(list(chan.buffer), ["b", "c"])
+        chan.set_buffer()
+        self.assertIsNone(chan.buffer)
+        self.assertFalse(chan)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "test.log")
+            chan.log = ChannelLog(filename, max_bytes=100, backups=2)
+            self.assertTrue(chan)
+            for i in range(20):
+                chan(f"message {i}")
+            chan(b"\x00\x01")
+            chan.log.close()
+            self.assertTrue(os.path.exists(f"{filename}.1"))
+            self.assertTrue(os.path.exists(f"{filename}.2"))
+            self.assertFalse(os.path.exists(f"{filename}.3"))
+            for name in (filename, f"{filename}.1", f"{filename}.2"):
+                self.assertLessEqual(os.path.getsize(name), 100)
+            records = []
+            for name in (f"{filename}.2", f"{filename}.1", filename):
+                records.extend(read_channel_log(name))
+            self.assertEqual(records[-1][1], b"\x00\x01")
+            self.assertEqual(records[-2][1], "message 19")
+            self.assertIsInstance(records[-1][0], float)
+
+        kernel = bootstrap.bootstrap()
+        try:
+            chan = kernel.channel("test_limit", buffer_size=5)
+            kernel.console("channel limit test_limit --lines 3\n")
+            self.assertEqual((chan.buffer_size, chan.buffer_bytes), (3, 0))
+            kernel.console("channel limit test_limit --size 100\n")
+            self.assertEqual((chan.buffer_size, chan.buffer_bytes), (3, 100))
+            kernel.console("channel limit test_limit -l 0 -s 0\n")
+            self.assertIsNone(chan.buffer)
+        finally:
+            kernel()
+
+
 class TestGetSafePath(unittest.TestCase):
     def test_get_safe_path(self):
         import os
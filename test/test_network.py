@@ -0,0 +1,63 @@
+import socket
+import time
+import unittest
+from test import bootstrap
+
+
+class TestNetworkServers(unittest.TestCase):
+    def test_tcp_and_udp_servers(self):
+        """
+        Test tcp connections and udp packets are served by the network event loop.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            root = kernel.root
+            root.open_as("module/TCPServer", "ttest", port=23461)
+            received = []
+            root.channel("ttest/recv").watch(received.append)
+            root.channel("ttest/recv").watch(root.channel("ttest/send"))
+            time.sleep(0.2)
+            clients = [
+                socket.create_connection(("127.0.0.1", 23461), timeout=2)
+                for _ in range(10)
+            ]
+            clients[0].sendall(b"hello")
+            self.assertEqual(clients[0].recv(1024), b"hello")
+            for client in clients:
+                client.close()
+            self.assertEqual(received, [b"hello"])
+
+            root.open_as("module/UDPServer", "utest", port=23462)
+            packets = []
+            root.channel("utest/recv").watch(packets.append)
+            client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            client.settimeout(2)
+            try:
+                client.sendto(b"ping", ("127.0.0.1", 23462))
+                for _ in range(20):
+                    if packets:
+                        break
+                    time.sleep(0.05)
+                self.assertEqual(packets, [b"ping"])
+                root.channel("utest/send")(b"pong")
+                self.assertEqual(client.recvfrom(1024)[0], b"pong")
+
+                # Replies go to the sender of the packet, while packets of another sender are queued.
+                def reply(message):
+                    time.sleep(0.2)
+                    root.channel("utest/send")(b"re:" + message)
+
+                root.channel("utest/recv").watch(reply)
+                other = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                other.settimeout(2)
+                try:
+                    client.sendto(b"first", ("127.0.0.1", 23462))
+                    other.sendto(b"second", ("127.0.0.1", 23462))
+                    self.assertEqual(client.recvfrom(1024)[0], b"re:first")
+                    self.assertEqual(other.recvfrom(1024)[0], b"re:second")
+                finally:
+                    other.close()
+            finally:
+                client.close()
+        finally:
+            kernel()
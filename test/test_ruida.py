@@ -16,3 +16,158 @@ class TestRuida(unittest.TestCase):
         self.assertEqual(keys[b"K\x12\x96p"], 0x11)
         self.assertEqual(keys[b"-x\xf4\n"], 0x77)
         self.assertEqual(keys[b"\xb6\xefk\x91"], 0xEE)
+
+    def test_encode_moves(self):
+        """
+        Bulk encoded moves must match the commands written by individual mark and jump calls.
+        """
+        import random
+
+        from meerk40t.ruida.rdjob import RDJob, encode_moves
+
+        random.seed(3)
+        xs = []
+        ys = []
+        cuts = []
+        x = 0
+        y = 0
+        for i in range(500):
+            r = random.random()
+            if r < 0.2:
+                x += random.randint(-20000, 20000)
+            elif r < 0.4:
+                y += random.randint(-8192, 8192)
+            elif r < 0.5:
+                pass
+            else:
+                x += random.randint(-9000, 9000)
+                y += random.randint(-9000, 9000)
+            xs.append(x)
+            ys.append(y)
+            cuts.append(random.random() < 0.7)
+
+        job = RDJob(magic=0x88)
+        last_x = 100
+        last_y = -100
+        for x, y, cut in zip(xs, ys, cuts):
+            if cut:
+                job.mark(x, y, x - last_x, y - last_y)
+            else:
+                job.jump(x, y, x - last_x, y - last_y)
+            last_x = x
+            last_y = y
+        expected = job.get_contents()
+
+        blob = encode_moves(xs, ys, cuts, x0=100, y0=-100, magic=0x88)
+        self.assertEqual(blob, expected)
+
+        bulk_job = RDJob(magic=0x88)
+        bulk_job.moves(xs, ys, cuts, x0=100, y0=-100)
+        self.assertEqual(bulk_job.buffer, job.buffer)
+
+    def test_windowed_sender(self):
+        """
+        Sends a job through the controller to the emulator, over a link with latency. Every command must arrive in
+        order and the window must open past a single packet. A refused packet must be resent, a late acknowledgement
+        must not resend the packet. A packet lost within a window can't be resent in order, which must be warned about.
+        """
+        import queue
+        import struct
+        import threading
+        import time
+
+        from meerk40t.ruida.controller import RuidaController
+        from meerk40t.ruida.emulator import RuidaEmulator
+
+        class Service:
+            safe_label = "ruida"
+
+            def __init__(self, send_window):
+                self.send_window = send_window
+                self.signals = []
+                self.events = []
+
+            def channel(self, *args, **kwargs):
+                return self.events.append
+
+            def signal(self, *args):
+                self.signals.append(args)
+
+        class Spooler:
+            def send(self, *args, **kwargs):
+                pass
+
+        class Device:
+            driver = None
+            spooler = Spooler()
+
+        for send_window, fault, index, count in (
+            (8, None, None, 2000),
+            (1, "corrupt", 3, 2000),
+            (1, "late", 3, 2000),
+            (8, "drop", 40, 20000),
+        ):
+            service = Service(send_window)
+            emulator = RuidaEmulator(Device(), None)
+            link = queue.Queue()
+            sent = []
+
+            def write(data):
+                sent.append(data)
+                checksum = sum(data) & 0xFFFF
+                latency = 0.005
+                if len(sent) == index:
+                    if fault == "drop":
+                        return  # Packet lost.
+                    if fault == "corrupt":
+                        checksum ^= 1
+                    if fault == "late":
+                        latency = 1.0
+                link.put((time.time() + latency, struct.pack(">H", checksum) + data))
+
+            def run_link():
+                while True:
+                    item = link.get()
+                    if item is None:
+                        return
+                    arrival, packet = item
+                    time.sleep(max(0.0, arrival - time.time()))
+                    emulator.checksum_write(packet)
+
+            controller = RuidaController(service, write)
+            controller.job.set_magic(0x88)
+            emulator.reply = controller.recv
+            link_thread = threading.Thread(target=run_link, daemon=True)
+            link_thread.start()
+
+            job = controller.job
+            xs = [(i % 50) * 1000 for i in range(count)]
+            ys = [(i // 50) * 1000 for i in range(count)]
+            job.moves(xs, ys, True)
+            expected = list(job.buffer)
+            controller.start_sending()
+            thread = controller._send_thread
+            thread.join(30)
+            link.put(None)
+            link_thread.join(5)
+
+            self.assertFalse(thread.is_alive())
+            resent = [e for e in service.events if "resent" in e]
+            if fault is None:
+                self.assertEqual(service.signals, [])
+                self.assertEqual(emulator.job.buffer, expected)
+                self.assertGreater(controller.window, 1)
+            elif fault == "corrupt":
+                self.assertEqual(service.signals, [])
+                self.assertEqual(emulator.job.buffer, expected)
+                self.assertEqual(len(resent), 1)
+            elif fault == "late":
+                self.assertEqual(service.signals, [])
+                self.assertEqual(emulator.job.buffer, expected)
+                self.assertEqual(resent, [])
+            else:
+                self.assertEqual(
+                    [s[0] for s in service.signals if s[0] == "warning"], ["warning"]
+                )
+                self.assertTrue([e for e in service.events if "resent" in e])
+                self.assertIn("File Sent.", service.events)